@@ -0,0 +1,117 @@
+# Shared helpers for the benchmark scripts: fixtures, latency stats and result files
+import json
+import os
+import platform
+import sys
+import time
+import cv2
+import numpy as np
+from camera.sources import open_source
+
+def load_frames(source, count, rgb=False):
+    # Decode up to count frames from a camera index, video file or image directory (BGR unless rgb=True)
+    frames = []
+    frame_source = open_source(source, realtime=False)
+    if not frame_source.open():
+        return frames
+    try:
+        while len(frames) < count:
+            result = frame_source.read()
+            if result is None:
+                break
+            frames.append(cv2.cvtColor(result[0], cv2.COLOR_BGR2RGB) if rgb else result[0])
+    finally:
+        frame_source.close()
+    return frames
+
+def synthetic_frames(count, width=1280, height=720, seed=0):
+    # Deterministic office-like fixture: textured background with a few moving blobs
+    rng = np.random.default_rng(seed)
+    background = cv2.GaussianBlur(rng.integers(40, 90, (height, width, 3), dtype=np.uint8), (0, 0), 3)
+    blobs = [(rng.uniform(0.1, 0.9) * width, rng.uniform(0.2, 0.8) * height, rng.uniform(-4, 4), rng.uniform(-2, 2))
+             for _ in range(3)]
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        for (x, y, dx, dy) in blobs:
+            center = (int(x + dx * i) % width, int(y + dy * i) % height)
+            cv2.ellipse(frame, center, (60, 80), 0, 0, 360, (170, 190, 215), -1)
+            cv2.circle(frame, (center[0] - 22, center[1] - 15), 8, (40, 40, 40), -1)
+            cv2.circle(frame, (center[0] + 22, center[1] - 15), 8, (40, 40, 40), -1)
+        frames.append(frame)
+    return frames
+
+def write_fixture(path, frames, fps=30):
+    # Save frames as a replayable video fixture
+    h, w = frames[0].shape[:2]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (w, h))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+def latency_stats(samples):
+    # samples: seconds per call -> summary in milliseconds
+    if not samples:
+        return {"count": 0}
+    ms = np.asarray(samples) * 1000.0
+    total = float(np.sum(samples))
+    return {
+        "count": len(ms),
+        "fps": round(len(ms) / total, 2) if total > 0 else None,
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+        "cpus": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def write_results(path, results):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
+
+def print_table(stages):
+    print(f"{'stage':<12}{'fps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in stages.items():
+        if not stats.get("count"):
+            continue
+        print(f"{name:<12}{stats['fps'] or 0:>10.1f}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+
+def compare(baseline_path, results, key="stages"):
+    # Print p50/p95 change per stage against an earlier results file
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"Compared with {baseline_path}:")
+    print(f"{'stage':<12}{'p50 change':>12}{'p95 change':>12}")
+    for name, stats in results.get(key, {}).items():
+        old = baseline.get(key, {}).get(name)
+        if not old or not old.get("count") or not stats.get("count"):
+            continue
+        changes = []
+        for field in ("p50_ms", "p95_ms"):
+            changes.append(f"{100.0 * (stats[field] - old[field]) / old[field]:+.1f}%" if old[field] else "n/a")
+        print(f"{name:<12}{changes[0]:>12}{changes[1]:>12}")
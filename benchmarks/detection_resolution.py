@@ -0,0 +1,52 @@
+# Detection resolution benchmark: fps vs recall for each detect_width (and ROI mode)
+# Recall is measured against the full-resolution detector on the same frames.
+#   python -m benchmarks.detection_resolution --source recording.mp4 --frames 300
+import argparse
+import time
+from detection.face_detector import FaceDetector
+from detection.boxes import iou_matrix
+from benchmarks.common import load_frames
+
+def run_detector(detector, frames):
+    results = []
+    start = time.perf_counter()
+    for frame in frames:
+        results.append(detector.detect(frame)[1])
+    elapsed = time.perf_counter() - start
+    return results, len(frames) / elapsed if elapsed > 0 else 0.0
+
+def recall(reference, results, threshold=0.5):
+    total = matched = 0
+    for ref, got in zip(reference, results):
+        total += len(ref)
+        if len(ref) and len(got):
+            matched += int((iou_matrix(ref, got).max(axis=1) >= threshold).sum())
+    return matched / total if total else 1.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Face detection fps vs recall at each detection resolution")
+    parser.add_argument("--source", default="0", help="camera index or video file")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--widths", default="1280,960,640,480,320")
+    parser.add_argument("--full-scan-every", type=int, default=15)
+    args = parser.parse_args()
+    frames = load_frames(args.source, args.frames, rgb=True)
+    if not frames:
+        print("Error: Could not read any frames.")
+        return
+    h, w = frames[0].shape[:2]
+    print(f"{len(frames)} frames at {w}x{h}")
+    reference, ref_fps = run_detector(FaceDetector(), frames)
+    print(f"{'setting':<22}{'fps':>10}{'recall':>10}")
+    print(f"{'full resolution':<22}{ref_fps:>10.1f}{1.0:>10.3f}")
+    for width in [int(v) for v in args.widths.split(",")]:
+        if width >= w:
+            continue
+        for roi in (False, True):
+            detector = FaceDetector(detect_width=width, roi=roi, full_scan_every=args.full_scan_every)
+            results, fps = run_detector(detector, frames)
+            label = f"{width}px" + (" + roi" if roi else "")
+            print(f"{label:<22}{fps:>10.1f}{recall(reference, results):>10.3f}")
+
+if __name__ == "__main__":
+    main()
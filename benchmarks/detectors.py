@@ -0,0 +1,123 @@
+# Face detector benchmark: Haar cascade vs the cv2.dnn SSD backend on the same frames.
+# Throughput is measured per frame for the cascade and per batch for dnn (a batch of N
+# frames stands in for N cameras in one tick), for each input size and thread count.
+# Accuracy is precision/recall against --labels when given (a JSON list with one list of
+# [x, y, w, h] face boxes per frame), otherwise each detector's recall against the other.
+# --workers adds the cascade on a DetectionEngine process pool (headless --workers), fed
+# batches of --batches frames.
+#   python -m benchmarks.detectors --source recording.mp4 --dnn-model data/models/res10_300x300_ssd_iter_140000.caffemodel
+#   python -m benchmarks.detectors --source office.mp4 --labels office_faces.json --output detectors.json
+import argparse
+import json
+import time
+import cv2
+import numpy as np
+from detection.face_detector import FaceDetector
+from detection.engine import DetectionEngine
+from detection.models import DNN_MODEL
+from detection.boxes import as_boxes, iou_matrix
+from benchmarks.common import load_frames, synthetic_frames, latency_stats, peak_rss_mb, environment, write_results
+
+def run_detector(detector, frames, batch=1):
+    # -> (boxes per frame, latency stats per frame)
+    results, samples = [], []
+    for i in range(0, len(frames), batch):
+        group = frames[i:i + batch]
+        start = time.perf_counter()
+        found = detector.detect_batch(group, bgr=True) if batch > 1 else [detector.detect(group[0], bgr=True)]
+        elapsed = time.perf_counter() - start
+        samples.extend([elapsed / len(group)] * len(group))
+        results.extend(faces for _, faces in found)
+    return results, latency_stats(samples)
+
+def match(truth, found, threshold=0.5):
+    # -> (true positives, truth count, found count) at IoU >= threshold, each box matched once
+    tp = n_truth = n_found = 0
+    for ref, got in zip(truth, found):
+        ref, got = as_boxes(ref), as_boxes(got)
+        n_truth += len(ref)
+        n_found += len(got)
+        if len(ref) and len(got):
+            iou = iou_matrix(ref, got)
+            while iou.size and iou.max() >= threshold:
+                r, g = np.unravel_index(np.argmax(iou), iou.shape)
+                tp += 1
+                iou[r, :] = 0
+                iou[:, g] = 0
+    return tp, n_truth, n_found
+
+def accuracy(truth, found):
+    tp, n_truth, n_found = match(truth, found)
+    return {
+        "precision": round(tp / n_found, 3) if n_found else None,
+        "recall": round(tp / n_truth, 3) if n_truth else None,
+        "faces_per_frame": round(n_found / max(len(found), 1), 3),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Haar cascade vs cv2.dnn face detector: throughput and accuracy")
+    parser.add_argument("--source", default=None, help="camera index, video file or image directory (default: synthetic)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--labels", default=None, help="JSON ground truth: one list of [x, y, w, h] per frame")
+    parser.add_argument("--dnn-model", default=DNN_MODEL)
+    parser.add_argument("--sizes", default="300,200", help="dnn input sizes")
+    parser.add_argument("--threads", default="1", help="cv2 thread counts to try, e.g. 1,2,4")
+    parser.add_argument("--batches", default="1,4", help="frames per dnn batch (cameras per tick)")
+    parser.add_argument("--confidence", type=float, default=0.5)
+    parser.add_argument("--detect-width", type=int, default=640, help="cascade detection width")
+    parser.add_argument("--workers", default="", help="cascade process-pool sizes to try, e.g. 1,2,4")
+    parser.add_argument("--output", default=None, help="write results as JSON")
+    args = parser.parse_args()
+    frames = load_frames(args.source, args.frames) if args.source else synthetic_frames(args.frames)
+    if not frames:
+        print("Error: Could not read any frames.")
+        return
+    truth = None
+    if args.labels:
+        with open(args.labels) as f:
+            truth = json.load(f)[:len(frames)]
+        frames = frames[:len(truth)]
+    h, w = frames[0].shape[:2]
+    print(f"{len(frames)} frames at {w}x{h}" + (f", {sum(len(t) for t in truth)} labelled faces" if truth else ""))
+    runs = {}
+    runs[f"haar {args.detect_width}px"] = run_detector(FaceDetector(detect_width=args.detect_width, backend="haar"), frames)
+    for workers in [int(v) for v in args.workers.split(",") if v]:
+        engine = DetectionEngine(workers, detector_kwargs={"detect_width": args.detect_width, "backend": "haar"})
+        try:
+            # The pool only takes batches (a batch of 1 is run as 2)
+            for batch in sorted({max(int(v), 2) for v in args.batches.split(",")}):
+                runs[f"haar pool w{workers} b{batch}"] = run_detector(engine, frames, batch)
+        finally:
+            engine.close()
+    try:
+        for threads in [int(v) for v in args.threads.split(",")]:
+            for size in [int(v) for v in args.sizes.split(",")]:
+                detector = FaceDetector(backend="dnn", model_path=args.dnn_model, params={
+                    "input_size": size, "threads": threads, "confidence": args.confidence})
+                for batch in [int(v) for v in args.batches.split(",")]:
+                    runs[f"dnn {size}px t{threads} b{batch}"] = run_detector(detector, frames, batch)
+    except FileNotFoundError as exc:
+        print(f"Skipping dnn: {exc}")
+    finally:
+        cv2.setNumThreads(-1)
+    results = {"environment": environment(), "frames": len(frames), "size": [w, h], "detectors": {}}
+    print(f"{'detector':<24}{'fps':>9}{'p50 ms':>9}{'p95 ms':>9}{'faces/f':>9}{'prec':>7}{'recall':>8}")
+    for name, (found, stats) in runs.items():
+        # Without labels the cascade is scored against the first dnn run and vice versa
+        reference = truth if truth is not None else next(
+            (f for n, (f, _) in runs.items() if n.split()[0] != name.split()[0]), None)
+        acc = accuracy(reference, found) if reference is not None else {
+            "precision": None, "recall": None, "faces_per_frame": round(sum(map(len, found)) / len(found), 3)}
+        results["detectors"][name] = dict(stats, **acc)
+        prec = "-" if acc["precision"] is None else f"{acc['precision']:.3f}"
+        rec = "-" if acc["recall"] is None else f"{acc['recall']:.3f}"
+        print(f"{name:<24}{stats['fps'] or 0:>9.1f}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}"
+              f"{acc['faces_per_frame']:>9.2f}{prec:>7}{rec:>8}")
+    if truth is None:
+        print("No --labels: precision/recall are agreement with the other detector, not ground truth")
+    results["peak_rss_mb"] = peak_rss_mb()
+    if args.output:
+        write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
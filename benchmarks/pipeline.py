@@ -0,0 +1,152 @@
+# Vision pipeline benchmark: replays a video fixture through each stage on its own
+# (decode, detect, track, smooth, render) and then through the whole pipeline,
+# reporting fps, p50/p95/p99 latency per stage and peak RSS.
+#   python -m benchmarks.pipeline --output results.json
+#   python -m benchmarks.pipeline --source recording.mp4 --frames 600 --output results.json
+import argparse
+import os
+import tempfile
+import time
+from camera.sources import open_source
+from detection.face_detector import FaceDetector
+from detection.tracker import TrackingDetector
+from detection.smoothing import StatusSmoother
+from benchmarks.common import (synthetic_frames, write_fixture, latency_stats, peak_rss_mb, environment,
+                               write_results, print_table, compare)
+
+def replay(path, limit):
+    # Yields (decode_seconds, frame) for each frame of the fixture, as fast as it decodes
+    source = open_source(path, realtime=False)
+    if not source.open():
+        return
+    try:
+        for _ in range(limit):
+            start = time.perf_counter()
+            result = source.read()
+            elapsed = time.perf_counter() - start
+            if result is None:
+                break
+            yield elapsed, result[0]
+    finally:
+        source.close()
+
+def make_renderer(width, height):
+    # Offscreen VideoLabel, the CameraFeeds render path; None if Qt is unavailable
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt5.QtWidgets import QApplication
+        from ui.components.video_view import VideoLabel
+    except ImportError:
+        return None
+    app = QApplication.instance() or QApplication([])
+    label = VideoLabel(radius=14)
+    label.resize(width, height)
+    label.show()
+    app.processEvents()
+
+    def render(frame, overlays):
+        label.show_frame(frame, overlays)
+        label.repaint()
+    render.app = app
+    return render
+
+def timed(samples, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    samples.append(time.perf_counter() - start)
+    return result
+
+def run(path, frames, detect_width, detect_every, render_size):
+    stages = {}
+    # Stage by stage
+    decoded = []
+    samples = []
+    for elapsed, frame in replay(path, frames):
+        samples.append(elapsed)
+        decoded.append(frame)
+    stages["decode"] = latency_stats(samples)
+    detector = FaceDetector(detect_width=detect_width)
+    samples = []
+    detections = [timed(samples, detector.detect, frame, True)[1] for frame in decoded]
+    stages["detect"] = latency_stats(samples)
+    tracking = TrackingDetector(FaceDetector(detect_width=detect_width, roi=True), detect_every=detect_every)
+    samples = []
+    all_tracks = [timed(samples, tracking.process, frame, True) for frame in decoded]
+    stages["track"] = latency_stats(samples)
+    smoother = StatusSmoother(initial="IDLE")
+    samples = []
+    for faces in detections:
+        timed(samples, smoother.update, "WORKING" if len(faces) else "IDLE")
+    stages["smooth"] = latency_stats(samples)
+    render = make_renderer(*render_size) if render_size else None
+    if render:
+        samples = []
+        for frame, tracks in zip(decoded, all_tracks):
+            timed(samples, render, frame, [(t.box, (0, 212, 170), f"Person {t.id}") for t in tracks])
+        stages["render"] = latency_stats(samples)
+    # Whole pipeline, frame by frame
+    tracking = TrackingDetector(FaceDetector(detect_width=detect_width, roi=True), detect_every=detect_every)
+    smoother = StatusSmoother(initial="IDLE")
+    per_stage = {name: [] for name in ("decode", "track", "smooth", "render")}
+    totals = []
+    for elapsed, frame in replay(path, frames):
+        start = time.perf_counter()
+        per_stage["decode"].append(elapsed)
+        tracks = timed(per_stage["track"], tracking.process, frame, True)
+        timed(per_stage["smooth"], smoother.update, "WORKING" if tracks else "IDLE")
+        if render:
+            timed(per_stage["render"], render, frame, [(t.box, (0, 212, 170), f"Person {t.id}") for t in tracks])
+        totals.append(elapsed + time.perf_counter() - start)
+    pipeline = {"total": latency_stats(totals)}
+    pipeline.update({name: latency_stats(s) for name, s in per_stage.items() if s})
+    return stages, pipeline
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vision pipeline stage by stage and end to end")
+    parser.add_argument("--source", default=None, help="recorded video fixture (default: synthetic)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=1280, help="synthetic fixture width")
+    parser.add_argument("--height", type=int, default=720, help="synthetic fixture height")
+    parser.add_argument("--detect-width", type=int, default=640)
+    parser.add_argument("--detect-every", type=int, default=3)
+    parser.add_argument("--render-size", default="460x300", help="WxH of the video label, or 'none'")
+    parser.add_argument("--output", default=None, help="write machine-readable results (JSON) here")
+    parser.add_argument("--baseline", default=None, help="earlier results file to compare against")
+    args = parser.parse_args()
+    render_size = None if args.render_size == "none" else tuple(int(v) for v in args.render_size.split("x"))
+    fixture = {"source": args.source or "synthetic"}
+    tmpdir = None
+    path = args.source
+    if path is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmpdir.name, "synthetic.avi")
+        write_fixture(path, synthetic_frames(args.frames, args.width, args.height))
+    try:
+        stages, pipeline = run(path, args.frames, args.detect_width, args.detect_every, render_size)
+    finally:
+        if tmpdir:
+            tmpdir.cleanup()
+    fixture["frames"] = stages["decode"]["count"]
+    results = {
+        "benchmark": "pipeline",
+        "environment": environment(),
+        "fixture": fixture,
+        "config": {"detect_width": args.detect_width, "detect_every": args.detect_every,
+                   "render_size": args.render_size},
+        "stages": stages,
+        "pipeline": pipeline,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print("Per stage:")
+    print_table(stages)
+    print("Whole pipeline:")
+    print_table(pipeline)
+    print(f"Peak RSS: {results['peak_rss_mb']} MB")
+    if args.baseline:
+        compare(args.baseline, results)
+        compare(args.baseline, results, key="pipeline")
+    if args.output:
+        write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
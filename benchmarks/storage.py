@@ -0,0 +1,101 @@
+# SQLite storage benchmark: bulk insert rate, live append rate through the writer
+# thread, and range-query latency per employee once the table holds --rows intervals.
+#   python -m benchmarks.storage --rows 10000000 --output results.json
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from storage.sqlite_store import SQLiteStore
+from benchmarks.common import latency_stats, peak_rss_mb, environment, write_results, print_table, compare
+
+STATUSES = ("WORKING", "IDLE", "SLEEPING", "WALKING")
+INTERVAL = 300.0
+
+def history(rows, employees, start, batch=100000, seed=0):
+    # Back-to-back intervals per employee: row i belongs to employee i % employees
+    rng = np.random.default_rng(seed)
+    for first in range(0, rows, batch):
+        index = np.arange(first, min(first + batch, rows))
+        starts = start + (index // employees) * INTERVAL
+        ends = starts + INTERVAL
+        statuses = rng.integers(0, len(STATUSES), len(index))
+        yield [(f"emp{e}", 0, STATUSES[s], b, f) for e, s, b, f in
+               zip((index % employees).tolist(), statuses.tolist(), starts.tolist(), ends.tolist())]
+
+def run(path, rows, employees, appends, queries, window):
+    start = time.time() - (rows // employees) * INTERVAL
+    store = SQLiteStore(path)
+    began = time.perf_counter()
+    # Bulk path: batches queued to the same writer thread, timed until all are committed
+    for batch in history(rows, employees, start):
+        store.add_intervals(batch, wait=False)
+    store.flush(timeout=None)
+    bulk_seconds = time.perf_counter() - began
+    # Live path: status changes queued by append() and committed by the writer thread
+    began = time.perf_counter()
+    now = time.time()
+    for i in range(appends):
+        store.append(now + i * 0.001, 0, f"live{i % employees}", STATUSES[i % len(STATUSES)])
+    store.flush(timeout=600)
+    append_seconds = time.perf_counter() - began
+    rng = np.random.default_rng(1)
+    span = (rows // employees) * INTERVAL
+    samples = {"intervals": [], "status_times": []}
+    for _ in range(queries):
+        employee = f"emp{rng.integers(employees)}"
+        lo = start + rng.uniform(0, max(span - window, 0))
+        for name in samples:
+            began = time.perf_counter()
+            getattr(store, name)(employee, lo, lo + window)
+            samples[name].append(time.perf_counter() - began)
+    store.close()
+    inserts = {
+        "bulk_rows": rows,
+        "bulk_rows_per_sec": round(rows / bulk_seconds, 1) if bulk_seconds > 0 else None,
+        "append_events": appends,
+        "append_events_per_sec": round(appends / append_seconds, 1) if append_seconds > 0 else None,
+        # WAL mode: rows not checkpointed yet are still in the -wal file
+        "db_mb": round(sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p)) / (1024 * 1024), 1),
+    }
+    return inserts, {name: latency_stats(s) for name, s in samples.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite inserts and range queries")
+    parser.add_argument("--rows", type=int, default=10000000, help="intervals to bulk insert")
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--appends", type=int, default=100000, help="live status changes through append()")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--window", type=float, default=7 * 86400, help="query window in seconds")
+    parser.add_argument("--db", default=None, help="database file (default: temporary)")
+    parser.add_argument("--output", default=None, help="write machine-readable results (JSON) here")
+    parser.add_argument("--baseline", default=None, help="earlier results file to compare against")
+    args = parser.parse_args()
+    tmpdir = None
+    path = args.db
+    if path is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmpdir.name, "bench.db")
+    try:
+        inserts, queries = run(path, args.rows, args.employees, args.appends, args.queries, args.window)
+    finally:
+        if tmpdir:
+            tmpdir.cleanup()
+    results = {
+        "benchmark": "storage",
+        "environment": environment(),
+        "config": {"rows": args.rows, "employees": args.employees, "window": args.window},
+        "inserts": inserts,
+        "queries": queries,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(f"Bulk insert: {inserts['bulk_rows_per_sec']:.0f} rows/s, live append: "
+          f"{inserts['append_events_per_sec']:.0f} events/s, database {inserts['db_mb']} MB")
+    print_table(queries)
+    if args.baseline:
+        compare(args.baseline, results, key="queries")
+    if args.output:
+        write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
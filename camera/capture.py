@@ -0,0 +1,151 @@
+import atexit
+import threading
+import weakref
+from collections import namedtuple
+from camera.sources import open_source
+from metrics.timers import metrics
+
+# image: BGR numpy array; timestamp: source time of the frame (seconds since the epoch)
+Frame = namedtuple("Frame", ["frame_id", "timestamp", "image"])
+
+class LatestFrame:
+    # Single-slot handoff: the producer always overwrites the slot, so consumers
+    # only ever see the newest frame. Frames replaced before anyone took them
+    # are counted as dropped.
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._taken = True
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, frame):
+        with self._cond:
+            if not self._taken:
+                self.dropped += 1
+            self._frame = frame
+            self._taken = False
+            self.published += 1
+            self._cond.notify_all()
+
+    def get(self, after_id=-1, timeout=None):
+        # Return the newest frame with frame_id > after_id, or None on timeout.
+        # timeout=0 never blocks, timeout=None waits until a frame arrives.
+        with self._cond:
+            if timeout != 0:
+                self._cond.wait_for(
+                    lambda: self._frame is not None and self._frame.frame_id > after_id,
+                    timeout)
+            frame = self._frame
+            if frame is None or frame.frame_id <= after_id:
+                return None
+            self._taken = True
+            return frame
+
+    def peek(self):
+        return self._frame
+
+# Live capture threads, stopped at interpreter exit so no thread is still inside
+# cv2 when the runtime tears down (child widgets never get a closeEvent)
+_running = weakref.WeakSet()
+
+@atexit.register
+def _stop_all():
+    for capture in list(_running):
+        capture.stop()
+
+class CaptureThread(threading.Thread):
+    # Reads one frame source (camera index, video file, image directory or a
+    # FrameSource) on its own thread and publishes into a LatestFrame
+    def __init__(self, source=0, name=None):
+        super().__init__(name=name or f"capture-{source}", daemon=True)
+        self.source = source
+        self.frame_source = open_source(source)
+        self.frames = LatestFrame()
+        self.opened = threading.Event()
+        self.failed = False
+        self.error = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        _running.add(self)
+        source = self.frame_source
+        if not source.open():
+            self._fail("Could not open source")
+            source.close()
+            return
+        self.opened.set()
+        frame_id = 0
+        read_timer = metrics.timer("read", self.source)
+        try:
+            while not self._stop_event.is_set():
+                with read_timer:
+                    result = source.read()
+                if result is None:
+                    self._fail("Failed to capture frame" if source.live else "End of stream")
+                    break
+                image, timestamp = result
+                # Frames may be fanned out to several consumers, so nobody may draw on them
+                image.flags.writeable = False
+                self.frames.publish(Frame(frame_id, timestamp, image))
+                frame_id += 1
+        finally:
+            source.close()
+
+    def _fail(self, message):
+        self.failed = True
+        self.error = message
+        self.opened.set()
+
+    def wait_opened(self, timeout=None):
+        # True once the device is open and streaming
+        self.opened.wait(timeout)
+        return self.opened.is_set() and not self.failed
+
+    def latest(self, after_id=-1, timeout=0):
+        return self.frames.get(after_id, timeout)
+
+    @property
+    def dropped(self):
+        return self.frames.dropped
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+class SyncCapture:
+    # Same consumer interface as a registry Subscription, but reads the source on
+    # the caller's thread: every frame is delivered and none are dropped. Meant for
+    # replaying files with realtime=False, where consumers set the pace.
+    def __init__(self, source):
+        self.source = source
+        self.frame_source = open_source(source, realtime=False)
+        self.failed = False
+        self.error = None
+        self.dropped = 0
+        self._frame_id = 0
+        self._read_timer = metrics.timer("read", source)
+        if not self.frame_source.open():
+            self.failed = True
+            self.error = "Could not open source"
+
+    def wait_opened(self, timeout=None):
+        return not self.failed
+
+    def latest(self, after_id=-1, timeout=0):
+        if self.failed:
+            return None
+        with self._read_timer:
+            result = self.frame_source.read()
+        if result is None:
+            self.failed = True
+            self.error = "End of stream"
+            return None
+        image, timestamp = result
+        frame = Frame(self._frame_id, timestamp, image)
+        self._frame_id += 1
+        return frame
+
+    def close(self):
+        self.frame_source.close()
@@ -0,0 +1,102 @@
+import threading
+from camera.capture import CaptureThread
+
+class Subscription:
+    # A consumer's handle on a shared capture. Frames are shared between all
+    # subscribers and are read-only; copy before drawing on them.
+    def __init__(self, registry, entry):
+        self._registry = registry
+        self._entry = entry
+        self.closed = False
+
+    @property
+    def source(self):
+        return self._entry.source
+
+    @property
+    def capture(self):
+        return self._entry.capture
+
+    @property
+    def failed(self):
+        return self._entry.capture.failed
+
+    @property
+    def error(self):
+        return self._entry.capture.error
+
+    @property
+    def dropped(self):
+        return self._entry.capture.dropped
+
+    def wait_opened(self, timeout=None):
+        return self._entry.capture.wait_opened(timeout)
+
+    def latest(self, after_id=-1, timeout=0):
+        return self._entry.capture.latest(after_id, timeout)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._registry.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class _Entry:
+    def __init__(self, source, capture):
+        self.source = source
+        self.capture = capture
+        self.refs = 0
+
+class CaptureRegistry:
+    # Opens each physical source once and fans its frames out to every subscriber.
+    # The device is released when the last subscriber closes.
+    def __init__(self, capture_factory=CaptureThread):
+        self.capture_factory = capture_factory
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, source=0):
+        with self._lock:
+            entry = self._entries.get(source)
+            if entry is None:
+                entry = self._entries[source] = _Entry(source, self._start(source))
+            elif entry.capture.failed and not entry.capture.is_alive():
+                # Device dropped out earlier; try again for the new subscriber
+                entry.capture = self._start(source)
+            entry.refs += 1
+            return Subscription(self, entry)
+
+    def _start(self, source):
+        capture = self.capture_factory(source)
+        capture.start()
+        return capture
+
+    def release(self, subscription):
+        with self._lock:
+            entry = subscription._entry
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            if self._entries.get(entry.source) is entry:
+                del self._entries[entry.source]
+        entry.capture.stop()
+
+    def subscribers(self, source):
+        with self._lock:
+            entry = self._entries.get(source)
+            return entry.refs if entry else 0
+
+    def sources(self):
+        with self._lock:
+            return list(self._entries)
+
+# Process-wide registry shared by the UI, detection and recording
+registry = CaptureRegistry()
+
+def acquire(source=0):
+    return registry.acquire(source)
@@ -0,0 +1,157 @@
+import os
+import time
+import cv2
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+class FrameSource:
+    # Common interface for everything that yields frames: open(), read(), close().
+    # read() returns (image, timestamp) with a BGR image and the frame's source time
+    # (seconds since the epoch), or None at the end of the stream or on error.
+    live = False
+
+    def open(self):
+        raise NotImplementedError
+
+    def read(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class DeviceSource(FrameSource):
+    live = True
+
+    def __init__(self, index=0):
+        self.index = index
+        self.cap = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.index)
+        if not self.cap.isOpened():
+            return False
+        # Keep the driver queue short so we are never reading old frames
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return True
+
+    def read(self):
+        ret, image = self.cap.read()
+        return (image, time.time()) if ret else None
+
+    def close(self):
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+
+class _PacedSource(FrameSource):
+    # File-backed source. With realtime=True frames are released at their recorded
+    # pace; with realtime=False they come as fast as they can be decoded.
+    def __init__(self, realtime=True, start_time=None):
+        self.realtime = realtime
+        self.start_time = start_time
+        self._wall_start = None
+
+    def _pace(self, offset):
+        if not self.realtime:
+            return
+        now = time.perf_counter()
+        if self._wall_start is None:
+            self._wall_start = now - offset
+        delay = offset - (now - self._wall_start)
+        if delay > 0:
+            time.sleep(delay)
+
+class VideoFileSource(_PacedSource):
+    def __init__(self, path, realtime=True, start_time=None):
+        super().__init__(realtime, start_time)
+        self.path = path
+        self.cap = None
+        self.fps = 0.0
+
+    def open(self):
+        if not os.path.isfile(self.path):
+            return False
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            return False
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        if self.start_time is None:
+            # The file is finished writing when recording stops, so back off by its duration
+            frames = self.cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+            self.start_time = os.path.getmtime(self.path) - frames / self.fps
+        return True
+
+    @property
+    def frame_count(self):
+        return int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)) if self.cap else 0
+
+    def seek(self, index):
+        # Position so the next read() returns frame index
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        self._wall_start = None
+
+    def read(self):
+        ret, image = self.cap.read()
+        if not ret:
+            return None
+        offset = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        self._pace(offset)
+        return image, self.start_time + offset
+
+    def close(self):
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+
+class ImageDirSource(_PacedSource):
+    # Image sequence in file-name order, spaced 1/fps seconds apart
+    def __init__(self, directory, fps=30.0, realtime=True, start_time=None):
+        super().__init__(realtime, start_time)
+        self.directory = directory
+        self.fps = fps
+        self.paths = []
+        self._index = 0
+
+    def open(self):
+        if not os.path.isdir(self.directory):
+            return False
+        self.paths = [os.path.join(self.directory, n) for n in sorted(os.listdir(self.directory))
+                      if n.lower().endswith(IMAGE_EXTENSIONS)]
+        if not self.paths:
+            return False
+        if self.start_time is None:
+            self.start_time = os.path.getmtime(self.paths[0])
+        self._index = 0
+        return True
+
+    @property
+    def frame_count(self):
+        return len(self.paths)
+
+    def seek(self, index):
+        self._index = index
+        self._wall_start = None
+
+    def read(self):
+        while self._index < len(self.paths):
+            index = self._index
+            self._index += 1
+            image = cv2.imread(self.paths[index])
+            if image is None:
+                # Unreadable file; skip it
+                continue
+            offset = index / self.fps
+            self._pace(offset)
+            return image, self.start_time + offset
+        return None
+
+def open_source(spec, realtime=True, start_time=None):
+    # Build a source from a camera index, video file path or image directory.
+    # realtime/start_time only apply to file sources.
+    if isinstance(spec, FrameSource):
+        return spec
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return DeviceSource(int(spec))
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, realtime=realtime, start_time=start_time)
+    return VideoFileSource(spec, realtime=realtime, start_time=start_time)
@@ -1,18 +1,21 @@
 import cv2
+from camera.registry import acquire
 
-def show_webcam_feed(window_name="Webcam Feed"):
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        print("Error: Could not open webcam.")
-        return
-    
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("Error: Failed to capture frame.")
-            break
-        cv2.imshow(window_name, frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-    cap.release()
-    cv2.destroyAllWindows() 
\ No newline at end of file
+def show_webcam_feed(window_name="Webcam Feed", source=0):
+    with acquire(source) as capture:
+        if not capture.wait_opened(5):
+            print("Error: Could not open webcam.")
+            return
+        last_id = -1
+        while True:
+            frame = capture.latest(last_id, timeout=1.0)
+            if frame is None:
+                if capture.failed:
+                    print("Error: Failed to capture frame.")
+                    break
+                continue
+            last_id = frame.frame_id
+            cv2.imshow(window_name, frame.image)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    cv2.destroyAllWindows()
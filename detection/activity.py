@@ -0,0 +1,166 @@
+import cv2
+import numpy as np
+from metrics.timers import metrics
+
+# Activities a tracked face can be classified as (IDLE is the absence of a face)
+ACTIVITIES = ("WORKING", "SLEEPING", "EATING", "WALKING")
+
+# Columns of one observation in a track's ring buffer
+CX, CY, SIZE, MOUTH = range(4)
+_FEATURES = 4
+
+def desk_track(tracks):
+    # One desk per camera: the largest face is taken as the person at it (None if empty)
+    return max(tracks, key=lambda t: t.box[2] * t.box[3]) if tracks else None
+
+def desk_status(tracks):
+    track = desk_track(tracks)
+    if track is None:
+        return "IDLE"
+    return track.activity or "WORKING"
+
+class ActivityClassifier:
+    # Sliding-window activity for every track at once. Each track owns a row of ring
+    # buffers with its last window observations (box center and size, whether the mouth
+    # area below the face moved more than the face) and running sums that are updated as
+    # observations enter and leave the window, so one tick is a handful of array
+    # operations for all tracks together. Motion comes from a single downscaled gray
+    # frame difference per tick via an integral image: each box sum is O(1).
+    #   WALKING:  the face moved more than walk_distance face sizes, or changed size by
+    #             more than walk_scale (log ratio), across the window
+    #   EATING:   the mouth area moved on at least eat_fraction of the window while the
+    #             head itself did not move as much (hand to mouth, chewing)
+    #   SLEEPING: the eyes have been closed for sleep_eyes_closed seconds (see
+    #             detection.drowsiness). Head posture is not used: a tilt estimate from the
+    #             face box reads well over 30 degrees on upright faces looking down, and the
+    #             face cascade rarely finds a head rolled that far anyway.
+    #   WORKING:  anything else, and every track until min_fill of its window is seen
+    def __init__(self, window=60, width=320, min_fill=0.5, walk_distance=1.0, walk_scale=0.35,
+                 sleep_eyes_closed=5.0, eat_motion=2.5, eat_fraction=0.3,
+                 capacity=16, camera=None):
+        self.window = window
+        # Width of the gray frame motion is measured on
+        self.width = width
+        self.min_fill = min_fill
+        self.walk_distance = walk_distance
+        self.walk_scale = walk_scale
+        self.sleep_eyes_closed = sleep_eyes_closed
+        self.eat_motion = eat_motion
+        self.eat_fraction = eat_fraction
+        self.camera = camera
+        self.previous = None
+        self._keys = {}
+        self._free = []
+        self.history = np.zeros((capacity, window, _FEATURES))
+        self.position = np.zeros(capacity, dtype=np.int32)
+        self.count = np.zeros(capacity, dtype=np.int32)
+        self.sums = np.zeros((capacity, _FEATURES))
+
+    def row(self, key):
+        # Slot of key, allocated (and cleared) on first use
+        row = self._keys.get(key)
+        if row is None:
+            row = self._free.pop() if self._free else len(self._keys)
+            if row >= len(self.count):
+                self._grow(2 * len(self.count))
+            self._keys[key] = row
+            self.position[row] = 0
+            self.count[row] = 0
+            self.sums[row] = 0.0
+        return row
+
+    def _grow(self, capacity):
+        extra = capacity - len(self.count)
+        self.history = np.concatenate([self.history, np.zeros((extra, self.window, _FEATURES))])
+        self.position = np.concatenate([self.position, np.zeros(extra, dtype=np.int32)])
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int32)])
+        self.sums = np.concatenate([self.sums, np.zeros((extra, _FEATURES))])
+
+    def release(self, key):
+        row = self._keys.pop(key, None)
+        if row is not None:
+            self._free.append(row)
+
+    def _measure(self, frame, boxes, bgr):
+        # -> [n, 2] mean motion on the face and in the mouth area for each box
+        h, w = frame.shape[:2]
+        scale = self.width / w
+        small = cv2.resize(frame, (self.width, max(round(h * scale), 1)), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY if bgr else cv2.COLOR_RGB2GRAY)
+        gray = small.astype(np.float32)
+        diff = np.zeros_like(gray) if self.previous is None or self.previous.shape != gray.shape \
+            else cv2.absdiff(gray, self.previous)
+        self.previous = gray
+        if not len(boxes):
+            return np.zeros((0, 2))
+        integral = cv2.integral(diff, sdepth=cv2.CV_64F)[:, :, None]
+        rows, cols = gray.shape
+        x, y, bw, bh = (boxes * scale).T
+        face = self._sums(integral, x, y, x + bw, y + bh, cols, rows)
+        mouth = self._sums(integral, x + bw / 2 - 0.8 * bw, y + 0.65 * bh, x + bw / 2 + 0.8 * bw, y + 1.4 * bh,
+                           cols, rows)
+        return np.concatenate([face, mouth], axis=1)
+
+    def _sums(self, integral, x0, y0, x1, y1, cols, rows):
+        # Mean of every integral channel over each (clipped) box
+        x0 = np.clip(np.round(x0).astype(np.intp), 0, cols)
+        x1 = np.clip(np.round(x1).astype(np.intp), 0, cols)
+        y0 = np.clip(np.round(y0).astype(np.intp), 0, rows)
+        y1 = np.clip(np.round(y1).astype(np.intp), 0, rows)
+        total = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+        area = np.maximum((x1 - x0) * (y1 - y0), 1)
+        return total / area[:, None]
+
+    def update(self, frame, keys, boxes, bgr=False, eyes_closed=None):
+        # keys: one per face (e.g. track ids), boxes: their (x, y, w, h) -> activity per key.
+        # eyes_closed: optional seconds each face has had its eyes closed.
+        # Keys missing from this call are forgotten.
+        live = set(keys)
+        for key in [key for key in self._keys if key not in live]:
+            self.release(key)
+        with metrics.timer("activity", self.camera):
+            boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+            measured = self._measure(frame, boxes, bgr)
+            if not len(keys):
+                return []
+            rows = np.array([self.row(key) for key in keys], dtype=np.intp)
+            obs = np.empty((len(rows), _FEATURES))
+            obs[:, CX] = boxes[:, 0] + boxes[:, 2] / 2
+            obs[:, CY] = boxes[:, 1] + boxes[:, 3] / 2
+            obs[:, SIZE] = np.sqrt(boxes[:, 2] * boxes[:, 3])
+            obs[:, MOUTH] = (measured[:, 1] >= self.eat_motion) & (measured[:, 1] >= 1.5 * measured[:, 0])
+            position = self.position[rows]
+            full = self.count[rows] >= self.window
+            self.sums[rows] += obs - np.where(full[:, None], self.history[rows, position], 0.0)
+            self.history[rows, position] = obs
+            self.position[rows] = (position + 1) % self.window
+            self.count[rows] = np.minimum(self.count[rows] + 1, self.window)
+            closed = np.zeros(len(rows)) if eyes_closed is None else np.asarray(eyes_closed, dtype=np.float64)
+            return self._classify(rows, obs, closed)
+
+    def _classify(self, rows, newest, eyes_closed):
+        n = self.count[rows]
+        oldest = self.history[rows, np.where(n >= self.window, self.position[rows], 0)]
+        mean = self.sums[rows] / n[:, None]
+        distance = np.hypot(newest[:, CX] - oldest[:, CX], newest[:, CY] - oldest[:, CY]) / np.maximum(mean[:, SIZE], 1)
+        rescale = np.abs(np.log(np.maximum(newest[:, SIZE], 1) / np.maximum(oldest[:, SIZE], 1)))
+        walking = (distance > self.walk_distance) | (rescale > self.walk_scale)
+        eating = mean[:, MOUTH] >= self.eat_fraction
+        sleeping = eyes_closed >= self.sleep_eyes_closed
+        codes = np.select([walking, eating, sleeping], [3, 2, 1], 0)
+        codes[n < self.min_fill * self.window] = 0
+        return [ACTIVITIES[c] for c in codes]
+
+    def classify(self, frame, tracks, bgr=False):
+        # Sets track.activity on every track; returns {track id: activity}
+        activities = self.update(frame, [track.id for track in tracks], [track.box for track in tracks], bgr,
+                                 [track.eyes_closed for track in tracks])
+        for track, activity in zip(tracks, activities):
+            track.activity = activity
+        return {track.id: track.activity for track in tracks}
+
+    def reset(self):
+        self.previous = None
+        for key in list(self._keys):
+            self.release(key)
@@ -0,0 +1,30 @@
+import numpy as np
+
+# Boxes are (x, y, w, h) rows, as returned by detectMultiScale
+
+def as_boxes(faces):
+    return np.asarray(faces, dtype=np.int32).reshape(-1, 4)
+
+def iou_matrix(a, b):
+    # Pairwise IoU between two box arrays, shape (len(a), len(b))
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    ax2, ay2 = a[:, 0] + a[:, 2], a[:, 1] + a[:, 3]
+    bx2, by2 = b[:, 0] + b[:, 2], b[:, 1] + b[:, 3]
+    iw = np.minimum(ax2[:, None], bx2[None, :]) - np.maximum(a[:, 0][:, None], b[:, 0][None, :])
+    ih = np.minimum(ay2[:, None], by2[None, :]) - np.maximum(a[:, 1][:, None], b[:, 1][None, :])
+    inter = np.clip(iw, 0, None) * np.clip(ih, 0, None)
+    union = (a[:, 2] * a[:, 3])[:, None] + (b[:, 2] * b[:, 3])[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-6), 0.0)
+
+def dedupe(boxes, threshold=0.5):
+    # Drop boxes that overlap an earlier box by more than threshold
+    boxes = as_boxes(boxes)
+    if len(boxes) < 2:
+        return boxes
+    overlap = iou_matrix(boxes, boxes)
+    keep = []
+    for i in range(len(boxes)):
+        if all(overlap[i, j] <= threshold for j in keep):
+            keep.append(i)
+    return boxes[keep]
@@ -0,0 +1,78 @@
+import cv2
+from detection.models import registry
+from metrics.timers import metrics
+
+# OpenCV's open-eye cascade; it rarely fires on closed eyes
+EYE_CASCADE = cv2.data.haarcascades + "haarcascade_eye.xml"
+
+class EyeStateChecker:
+    # Eyes open/closed for tracked faces, searched only in the eye band of each face box
+    # (never the full frame). Each track is sampled every `every` frames, at most
+    # per_frame tracks per call, on the grayscale image the face detector already made
+    # for this frame when there is one; otherwise only the band itself is converted.
+    # A sample with no eye found counts as closed, but only once the track's eyes have
+    # been seen open min_open times: faces turned away, looking down or false detections
+    # never show eyes and stay unknown. The result is kept on the track:
+    #   track.eyes_open:   last sample, None while unknown
+    #   track.eyes_closed: seconds the eyes have been closed in a row (0 while open)
+    def __init__(self, every=5, per_frame=1, min_open=2, face_width=200, min_neighbors=2,
+                 cascade_path=EYE_CASCADE, models=registry, camera=None):
+        self.every = every
+        self.per_frame = per_frame
+        self.min_open = min_open
+        # Bands are resized to this face width: the cascade's 20px window misses the eyes
+        # of much smaller faces, and larger ones only cost more scales
+        self.face_width = face_width
+        self.min_neighbors = min_neighbors
+        self.handle = models.get("haar", cascade_path)
+        self.camera = camera
+        self.checked = 0
+
+    def _due(self, track):
+        return not track.misses and track.age - track.eyes_checked_at >= self.every
+
+    def _band(self, frame, box, gray, scale, bgr):
+        # Eye band of the face (upper middle part) as a grayscale crop, or None if cut off
+        x, y, w, h = [v * scale for v in box] if gray is not None else box
+        x0, x1 = int(x + 0.1 * w), int(x + 0.9 * w)
+        y0, y1 = int(y + 0.15 * h), int(y + 0.6 * h)
+        source = gray if gray is not None else frame
+        if x0 < 0 or y0 < 0 or x1 > source.shape[1] or y1 > source.shape[0] or x1 - x0 < 8 or y1 - y0 < 4:
+            return None
+        band = source[y0:y1, x0:x1]
+        if band.ndim == 3:
+            band = cv2.cvtColor(band, cv2.COLOR_BGR2GRAY if bgr else cv2.COLOR_RGB2GRAY)
+        factor = self.face_width / w
+        if factor != 1.0:
+            band = cv2.resize(band, None, fx=factor, fy=factor,
+                              interpolation=cv2.INTER_LINEAR if factor > 1 else cv2.INTER_AREA)
+        return band
+
+    def check(self, frame, tracks, now, bgr=False, gray=None):
+        # gray: (gray, scale) from FaceDetector.gray_for(frame). Returns the tracks sampled.
+        pending = sorted((t for t in tracks if self._due(t)), key=lambda t: t.eyes_checked_at)[:self.per_frame]
+        if pending:
+            image, scale = gray if gray is not None else (None, 1.0)
+            # Eye boxes (eye and lids) span about 12-40% of the face width; bounding the
+            # search scales keeps a check well under a full face scan
+            smallest, largest = self.face_width * 3 // 25, self.face_width * 2 // 5
+            with metrics.timer("eyes", self.camera):
+                for track in pending:
+                    track.eyes_checked_at = track.age
+                    band = self._band(frame, track.box, image, scale, bgr)
+                    if band is None:
+                        continue
+                    found = self.handle.detect(band, (smallest, smallest), scale_factor=1.1,
+                                               min_neighbors=self.min_neighbors, max_size=(largest, largest))
+                    if len(found):
+                        track.eyes_seen += 1
+                        track.eyes_open = True
+                        track.eyes_closed_since = None
+                    elif track.eyes_seen >= self.min_open:
+                        track.eyes_open = False
+                        if track.eyes_closed_since is None:
+                            track.eyes_closed_since = now
+            self.checked += len(pending)
+        for track in tracks:
+            track.eyes_closed = 0.0 if track.eyes_closed_since is None else now - track.eyes_closed_since
+        return pending
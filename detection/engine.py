@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+import multiprocessing as mp
+from collections import deque, namedtuple
+from multiprocessing import shared_memory
+import numpy as np
+from detection.models import registry
+
+DetectionResult = namedtuple("DetectionResult", ["frame_id", "camera", "found", "faces", "elapsed"])
+
+# Per-process state for pool workers
+_worker_detector = None
+_worker_buffers = {}  # slot -> attached SharedMemory
+
+def _init_worker(detector_kwargs, config):
+    global _worker_detector
+    from detection.face_detector import FaceDetector
+    # Spawned workers start from the default model; follow the parent's configuration
+    if config != registry.config:
+        registry.configure(**config)
+    _worker_detector = FaceDetector(**detector_kwargs)
+
+def _detect_slot(shm_name, shape, frame_id, camera, slot, bgr):
+    # Attach once per buffer and detect straight out of shared memory (no pickled frame).
+    # A grown slot gets a new segment: the old mapping is closed rather than kept forever.
+    shm = _worker_buffers.get(slot)
+    if shm is None or shm.name != shm_name:
+        if shm is not None:
+            shm.close()
+        shm = _worker_buffers[slot] = shared_memory.SharedMemory(name=shm_name)
+    frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    start = time.perf_counter()
+    found, faces = _worker_detector.detect(frame, bgr=bgr)
+    return frame_id, camera, found, np.asarray(faces, dtype=np.int32).reshape(-1, 4), time.perf_counter() - start
+
+class DetectionEngine:
+    # Runs FaceDetector in a pool of worker processes. Frames are copied once into
+    # a free shared-memory slot; results arrive asynchronously and are collected with poll().
+    # When every slot is busy submit() refuses the frame, which is the backpressure signal.
+    # detect_batch() is the blocking form, so the engine can stand in for a FaceDetector
+    # in a BatchScheduler (headless --workers).
+    # Workers use the registry configuration (backend, model) active when the engine starts.
+    def __init__(self, workers=None, slots=None, detector_kwargs=None, config=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.slots = slots or self.workers * 2
+        self._buffers = [None] * self.slots
+        self._free = deque(range(self.slots))
+        self._lock = threading.Lock()
+        self._freed = threading.Condition(self._lock)
+        self._results = deque()
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.errors = 0
+        self.last_error = None
+        # spawn keeps workers independent of the Qt/capture threads in the parent
+        ctx = mp.get_context("spawn")
+        self._pool = ctx.Pool(self.workers, initializer=_init_worker,
+                              initargs=(detector_kwargs or {}, dict(config or registry.config)))
+
+    def _slot_buffer(self, slot, nbytes):
+        shm = self._buffers[slot]
+        if shm is None or shm.size < nbytes:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self._buffers[slot] = shm
+        return shm
+
+    def _dispatch(self, slot, frame_id, frame, camera, bgr, keep=True):
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        shm = self._slot_buffer(slot, frame.nbytes)
+        np.ndarray(frame.shape, dtype=np.uint8, buffer=shm.buf)[...] = frame
+        self.submitted += 1
+        return self._pool.apply_async(
+            _detect_slot, (shm.name, frame.shape, frame_id, camera, slot, bgr),
+            callback=lambda result, slot=slot: self._on_result(slot, result, keep),
+            error_callback=lambda exc, slot=slot: self._on_error(slot, exc))
+
+    def submit(self, frame_id, frame, camera=None, bgr=False):
+        # frame: RGB uint8 numpy array (BGR with bgr=True). Returns False if the workers are saturated.
+        with self._lock:
+            if not self._free:
+                self.rejected += 1
+                return False
+            slot = self._free.popleft()
+        self._dispatch(slot, frame_id, frame, camera, bgr)
+        return True
+
+    def detect_batch(self, frames, bgr=False):
+        # Spreads the frames over the workers and waits for all of them; same result format
+        # as FaceDetector.detect_batch. Waits for a free slot rather than refusing frames.
+        calls = []
+        for frame in frames:
+            with self._freed:
+                while not self._free:
+                    self._freed.wait()
+                slot = self._free.popleft()
+            calls.append(self._dispatch(slot, None, frame, None, bgr, keep=False))
+        results = []
+        for call in calls:
+            _, _, found, faces, _ = call.get()
+            results.append((found, faces))
+        return results
+
+    def _release(self, slot):
+        self._free.append(slot)
+        self._freed.notify()
+
+    def _on_result(self, slot, result, keep=True):
+        with self._lock:
+            self._release(slot)
+            self.completed += 1
+        if keep:
+            self._results.append(DetectionResult(*result))
+
+    def _on_error(self, slot, exc):
+        with self._lock:
+            self._release(slot)
+            self.errors += 1
+        self.last_error = exc
+
+    def poll(self):
+        # Drain finished results, oldest first
+        results = []
+        while self._results:
+            results.append(self._results.popleft())
+        return results
+
+    @property
+    def pending(self):
+        with self._lock:
+            return self.slots - len(self._free)
+
+    @property
+    def backpressure(self):
+        # Fraction of slots in flight; 1.0 means the next submit will be refused
+        return self.pending / self.slots
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "pending": self.pending,
+            "backpressure": round(self.backpressure, 3),
+        }
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+        for shm in self._buffers:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._buffers = [None] * self.slots
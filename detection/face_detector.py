@@ -1,17 +1,190 @@
+import sys
 import cv2
-import os
+import numpy as np
+from detection.boxes import as_boxes, dedupe
+from detection.models import registry
+from metrics.timers import metrics
 
 class FaceDetector:
-    def __init__(self, cascade_path=None):
-        # Use OpenCV's default haarcascade if not provided
-        if cascade_path is None:
-            cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        if not os.path.exists(cascade_path):
-            raise FileNotFoundError(f"Cascade file not found: {cascade_path}")
-        self.face_cascade = cv2.CascadeClassifier(cascade_path)
-
-    def detect(self, frame):
-        # frame: RGB numpy array
-        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(60, 60))
-        return (len(faces) > 0, faces) 
\ No newline at end of file
+    def __init__(self, cascade_path=None, detect_width=None, scale_factor=None, min_neighbors=None,
+                 min_size=(60, 60), roi=False, roi_margin=0.5, full_scan_every=15, camera=None,
+                 backend=None, model_path=None, params=None, instance=None, models=registry):
+        # The model comes from the shared registry (detection.models): loaded once, warmed up,
+        # and shared with every other detector. Settings left as None follow the registry's
+        # active configuration, so a registry.configure() swap is picked up on the next frame.
+        # backend/model_path/params (e.g. {"input_size": 200}) pin those settings for this detector.
+        # Detectors on threads that should not wait on each other pass distinct instances.
+        self.models = models
+        self.instance = instance
+        self._pinned = dict(params or {})
+        if cascade_path is not None:
+            self._pinned.update(backend="haar", path=cascade_path)
+        elif backend is not None:
+            self._pinned["backend"] = backend
+        if model_path is not None:
+            self._pinned["path"] = model_path
+        if scale_factor is not None:
+            self._pinned["scale_factor"] = scale_factor
+        if min_neighbors is not None:
+            self._pinned["min_neighbors"] = min_neighbors
+        self._handle = None
+        self._params = {}
+        self._version = None
+        # detect_width: frames wider than this are downsampled before detection (None = full resolution).
+        # Like ROI mode it only applies to grayscale backends; dnn models take the frame as is.
+        self.detect_width = detect_width
+        self.min_size = min_size
+        # ROI mode searches only around the last faces, with a full scan every full_scan_every frames.
+        # It keeps per-stream state, so use one detector per camera when it is enabled.
+        self.roi = roi
+        self.roi_margin = roi_margin
+        self.full_scan_every = full_scan_every
+        self._last_faces = as_boxes([])
+        self._frames_since_full = 0
+        # Scratch buffers reused across calls, keyed by (shape, kind)
+        self._buffers = {}
+        # (frame, gray, scale) of the last detect(), for sub-detectors working inside the faces
+        self._gray = None
+        # Label for the stage timers (see metrics.timers)
+        self.camera = camera
+        # Load (or share) the model now so a missing file fails here, not on the first frame
+        self._sync()
+
+    def _sync(self):
+        # Switch to the registry's active model once it is ready (blocks only for the first one)
+        version = self.models.version
+        if version == self._version:
+            return
+        handle, params = self.models.active(self.instance, **self._pinned)
+        if self._handle is not None and not handle.ready.is_set():
+            return
+        try:
+            handle.wait()
+        except Exception as exc:
+            if self._handle is None:
+                raise
+            print(f"Detector swap to {handle.backend} failed ({exc}); keeping the previous model", file=sys.stderr)
+        else:
+            if self._handle is not None and handle is not self._handle:
+                self.reset()
+            self._handle, self._params = handle, params
+        self._version = version
+
+    @property
+    def backend(self):
+        return self._handle.backend
+
+    @property
+    def batched(self):
+        # True when detect_batch runs the frames as one batch rather than one by one
+        return self._handle.batched
+
+    @property
+    def scale_factor(self):
+        return self._params.get("scale_factor")
+
+    @property
+    def min_neighbors(self):
+        return self._params.get("min_neighbors")
+
+    def _buffer(self, shape, kind):
+        key = (shape, kind)
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = self._buffers[key] = np.empty(shape, dtype=np.uint8)
+        return buf
+
+    def _prepare(self, frame, code):
+        # Grayscale (and downsample) into reused buffers; returns (gray, scale)
+        with metrics.timer("convert", self.camera):
+            gray = cv2.cvtColor(frame, code, dst=self._buffer(frame.shape[:2], "gray"))
+            scale = 1.0
+            if self.detect_width and gray.shape[1] > self.detect_width:
+                scale = self.detect_width / gray.shape[1]
+                size = (round(gray.shape[0] * scale), self.detect_width)
+                gray = cv2.resize(gray, size[::-1], dst=self._buffer(size, "small"), interpolation=cv2.INTER_AREA)
+        return gray, scale
+
+    def _min_size(self, scale):
+        return (max(int(self.min_size[0] * scale), 24), max(int(self.min_size[1] * scale), 24))
+
+    def _scan(self, gray, min_size):
+        with metrics.timer("detect", self.camera):
+            return as_boxes(self._handle.detect(gray, min_size, **self._params))
+
+    def _detect_color(self, frames, bgr):
+        # Colour backends (dnn) resize inside the network, so frames go in as they are;
+        # several frames are one batched forward pass
+        with metrics.timer("detect", self.camera):
+            found = self._handle.detect_batch(frames, self._min_size(1.0), swap_rb=not bgr, **self._params)
+        return [as_boxes(faces) for faces in found]
+
+    def detect(self, frame, bgr=False):
+        # frame: RGB numpy array (BGR with bgr=True)
+        self._sync()
+        if self._handle.color:
+            self._gray = None
+            faces = self._last_faces = self._detect_color([frame], bgr)[0]
+            return (len(faces) > 0, faces)
+        gray, scale = self._prepare(frame, cv2.COLOR_BGR2GRAY if bgr else cv2.COLOR_RGB2GRAY)
+        self._gray = (frame, gray, scale)
+        min_size = self._min_size(scale)
+        faces = None
+        if self.roi and len(self._last_faces) and self._frames_since_full < self.full_scan_every:
+            faces = self._detect_rois(gray, min_size)
+            self._frames_since_full += 1
+        if faces is None:
+            faces = self._scan(gray, min_size)
+            self._frames_since_full = 0
+        self._last_faces = faces
+        return (len(faces) > 0, _rescale(faces, scale))
+
+    def detect_batch(self, frames, bgr=False):
+        # One full scan per frame (ROI state is per stream and is left untouched).
+        # frames: list of RGB (or BGR with bgr=True) numpy arrays from any number of cameras.
+        self._sync()
+        # The scratch gray buffers are overwritten below
+        self._gray = None
+        if self._handle.color:
+            return [(len(faces) > 0, faces) for faces in self._detect_color(frames, bgr)] if frames else []
+        code = cv2.COLOR_BGR2GRAY if bgr else cv2.COLOR_RGB2GRAY
+        results = []
+        for frame in frames:
+            gray, scale = self._prepare(frame, code)
+            faces = _rescale(self._scan(gray, self._min_size(scale)), scale)
+            results.append((len(faces) > 0, faces))
+        return results
+
+    def gray_for(self, frame):
+        # (gray, scale) detect() computed for this very frame, or None (other frame, colour
+        # backend). Boxes map into it as box * scale. Only valid until the next detect().
+        if self._gray is None or self._gray[0] is not frame:
+            return None
+        return self._gray[1:]
+
+    def _detect_rois(self, gray, min_size):
+        # Search a window around each previous face; None means fall back to a full scan
+        height, width = gray.shape[:2]
+        found = []
+        with metrics.timer("detect", self.camera):
+            for (x, y, w, h) in self._last_faces:
+                mx, my = int(w * self.roi_margin), int(h * self.roi_margin)
+                x0, y0 = max(x - mx, 0), max(y - my, 0)
+                x1, y1 = min(x + w + mx, width), min(y + h + my, height)
+                hits = self._handle.detect(gray[y0:y1, x0:x1], min_size, **self._params)
+                for (fx, fy, fw, fh) in hits:
+                    found.append((fx + x0, fy + y0, fw, fh))
+        if not found:
+            return None
+        return dedupe(found)
+
+    def reset(self):
+        self._gray = None
+        self._last_faces = as_boxes([])
+        self._frames_since_full = 0
+
+def _rescale(faces, scale):
+    # Map boxes from detection resolution back to source coordinates
+    if scale == 1.0:
+        return faces
+    return (faces / scale).round().astype(faces.dtype)
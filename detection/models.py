@@ -0,0 +1,228 @@
+import os
+import threading
+import cv2
+import numpy as np
+
+# Default weights for the "dnn" backend: OpenCV's res10 300x300 SSD face model, with
+# deploy.prototxt next to it (see README). Any SSD-style detector readNet() can load works.
+DNN_MODEL = os.path.join("data", "models", "res10_300x300_ssd_iter_140000.caffemodel")
+
+class HaarModel:
+    # OpenCV Haar cascade, run on grayscale images
+    color = False
+    batched = False
+
+    def __init__(self, path=None):
+        if path is None:
+            path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Cascade file not found: {path}")
+        self.path = path
+        self.cascade = cv2.CascadeClassifier(path)
+
+    def detect(self, image, min_size, scale_factor=1.1, min_neighbors=5, max_size=None, **_):
+        return self.cascade.detectMultiScale(image, scaleFactor=scale_factor, minNeighbors=min_neighbors,
+                                             minSize=min_size, maxSize=max_size or (0, 0))
+
+    def detect_batch(self, images, min_size, **params):
+        return [self.detect(image, min_size, **params) for image in images]
+
+    def warm_up(self):
+        # The first call allocates the cascade's internal buffers
+        self.detect(np.zeros((240, 320), dtype=np.uint8), (24, 24))
+
+def _dnn_config(path):
+    # Network description that goes with a weights file, if the format needs one
+    stem, ext = os.path.splitext(path)
+    if ext == ".caffemodel":
+        candidates = [stem + ".prototxt", os.path.join(os.path.dirname(path), "deploy.prototxt")]
+    elif ext == ".pb":
+        candidates = [stem + ".pbtxt"]
+    else:
+        return ""
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            return candidate
+    raise FileNotFoundError(f"No network config for {path} (tried {', '.join(candidates)})")
+
+class DnnModel:
+    # SSD-style face detector on cv2.dnn, CPU only. Takes colour frames (BGR, or RGB with
+    # swap_rb=True); a list of frames, e.g. one per camera, runs as one blobFromImages batch.
+    # Output rows are (image, class, confidence, x0, y0, x1, y1) with normalized corners.
+    color = True
+    batched = True
+
+    def __init__(self, path=None):
+        path = path or DNN_MODEL
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Face model not found: {path}")
+        self.path = path
+        self.net = cv2.dnn.readNet(path, _dnn_config(path))
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.threads = None
+
+    def detect(self, image, min_size, **params):
+        return self.detect_batch([image], min_size, **params)[0]
+
+    def detect_batch(self, images, min_size, input_size=300, confidence=0.5, threads=None, swap_rb=False,
+                     mean=(104.0, 177.0, 123.0), **_):
+        if threads is not None and threads != self.threads:
+            # cv2's thread pool is process-wide; this also applies to every other cv2 call
+            cv2.setNumThreads(threads)
+            self.threads = threads
+        size = (input_size, input_size) if isinstance(input_size, int) else tuple(input_size)
+        blob = cv2.dnn.blobFromImages(images, 1.0, size, mean, swapRB=swap_rb, crop=False)
+        self.net.setInput(blob)
+        rows = self.net.forward().reshape(-1, 7)
+        # Unused output rows are zero-filled (or carry image -1)
+        rows = rows[(rows[:, 2] >= confidence) & (rows[:, 2] > 0) & (rows[:, 0] >= 0)]
+        results = []
+        for i, image in enumerate(images):
+            h, w = image.shape[:2]
+            found = rows[rows[:, 0] == i]
+            x0 = np.clip(found[:, 3] * w, 0, w)
+            y0 = np.clip(found[:, 4] * h, 0, h)
+            x1 = np.clip(found[:, 5] * w, 0, w)
+            y1 = np.clip(found[:, 6] * h, 0, h)
+            boxes = np.stack([x0, y0, x1 - x0, y1 - y0], axis=1).round().astype(np.int32)
+            results.append(boxes[(boxes[:, 2] >= min_size[0]) & (boxes[:, 3] >= min_size[1])])
+        return results
+
+    def warm_up(self):
+        # The first forward pass allocates the layer buffers
+        self.detect(np.zeros((300, 300, 3), dtype=np.uint8), (24, 24))
+
+# Backend name -> factory(path) returning a model with detect(), detect_batch() and warm_up()
+BACKENDS = {"haar": HaarModel, "dnn": DnnModel}
+
+# Active backend and its detection parameters; path None is the backend's default model.
+# Each backend only reads the parameters it knows (haar: scale_factor, min_neighbors;
+# dnn: input_size, confidence, threads).
+DEFAULT_CONFIG = {"backend": "haar", "path": None, "scale_factor": 1.1, "min_neighbors": 5,
+                  "input_size": 300, "confidence": 0.5, "threads": None}
+
+class ModelHandle:
+    # One loaded model, shared by every detector asking for the same (backend, path, instance).
+    # Calls are serialized: cascades keep per-call state and must not run concurrently.
+    def __init__(self, key):
+        self.key = key
+        self.model = None
+        self.error = None
+        self.ready = threading.Event()
+        self.lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return self.key[0]
+
+    def wait(self, timeout=None):
+        # The model once loaded and warmed up; re-raises a load error
+        if not self.ready.wait(timeout):
+            raise TimeoutError(f"Model {self.key[0]} not loaded after {timeout}s")
+        if self.error is not None:
+            raise self.error
+        return self.model
+
+    @property
+    def color(self):
+        return self.model.color
+
+    @property
+    def batched(self):
+        return self.model.batched
+
+    def detect(self, image, min_size, **params):
+        with self.lock:
+            return self.model.detect(image, min_size, **params)
+
+    def detect_batch(self, images, min_size, **params):
+        with self.lock:
+            return self.model.detect_batch(images, min_size, **params)
+
+class ModelRegistry:
+    # Loads each detector model once per process and hands out shared handles.
+    # Loading and warm-up can run in the background (preload); configure() swaps the
+    # active backend or parameters, and detectors following the registry switch over
+    # on their next frame once the new model is ready.
+    def __init__(self, backends=BACKENDS, config=None):
+        self.backends = dict(backends)
+        self.config = dict(DEFAULT_CONFIG, **(config or {}))
+        # Bumped on every configure(); detectors compare it to notice a swap
+        self.version = 0
+        self._handles = {}
+        self._lock = threading.Lock()
+
+    def register_backend(self, name, factory):
+        self.backends[name] = factory
+
+    def _handle(self, backend, path, instance, retry=False):
+        # (handle, True) when the caller is the one who has to load it. A handle that failed
+        # to load keeps its error until an explicit get()/configure() retries it.
+        if backend not in self.backends:
+            raise ValueError(f"Unknown detector backend {backend!r} (have {', '.join(sorted(self.backends))})")
+        key = (backend, path, instance)
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is not None and not (retry and handle.error is not None):
+                return handle, False
+            handle = self._handles[key] = ModelHandle(key)
+            return handle, True
+
+    def _load(self, handle):
+        backend, path, _ = handle.key
+        try:
+            model = self.backends[backend](path)
+            model.warm_up()
+            handle.model = model
+        except Exception as exc:
+            handle.error = exc
+        finally:
+            handle.ready.set()
+
+    def get(self, backend="haar", path=None, instance=None, timeout=None):
+        # Loaded, warmed-up handle; loads on the calling thread unless someone already is
+        handle, new = self._handle(backend, path, instance, retry=True)
+        if new:
+            self._load(handle)
+        handle.wait(timeout)
+        return handle
+
+    def preload(self, backend="haar", path=None, instance=None, retry=False):
+        # Starts loading and warming up on a background thread; returns the handle right away
+        handle, new = self._handle(backend, path, instance, retry)
+        if new:
+            threading.Thread(target=self._load, args=(handle,), name=f"model-{backend}", daemon=True).start()
+        return handle
+
+    def active(self, instance=None, **pinned):
+        # (handle, params) for the active configuration, with any pinned settings
+        # (backend, path, parameters) overriding it. The handle may still be loading.
+        config = dict(self.config)
+        if pinned.get("backend", config["backend"]) != config["backend"] and "path" not in pinned:
+            config["path"] = None
+        config.update(pinned)
+        handle = self.preload(config.pop("backend"), config.pop("path"), instance)
+        return handle, config
+
+    def configure(self, **changes):
+        # Swap the active backend and/or its parameters; the new model loads in the background
+        config = dict(self.config)
+        if "backend" in changes and "path" not in changes:
+            config["path"] = None
+        config.update(changes)
+        handle = self.preload(config["backend"], config["path"], retry=True)
+        self.config = config
+        self.version += 1
+        return handle
+
+    def loaded(self):
+        return [key for key, handle in list(self._handles.items()) if handle.model is not None]
+
+    def unload(self, backend="haar", path=None, instance=None):
+        # Drop the registry's reference; detectors still holding the handle keep working
+        with self._lock:
+            self._handles.pop((backend, path, instance), None)
+
+# Process-wide model registry
+registry = ModelRegistry()
@@ -0,0 +1,102 @@
+import time
+import cv2
+from metrics.timers import metrics
+
+class MotionGate:
+    # Cheap change detector in front of the face detector. Each frame is shrunk to a
+    # tiny grayscale thumbnail and compared with the thumbnail of the last frame that
+    # was actually detected on; detection only runs when enough of it changed, while
+    # motion was seen in the last hold seconds, or at least every min_refresh seconds.
+    def __init__(self, width=64, threshold=12, min_changed=0.004, min_refresh=2.0, hold=1.0,
+                 clock=time.monotonic, camera=None):
+        self.width = width
+        # Per-pixel difference (0-255) that counts as changed, and the changed fraction that counts as motion
+        self.threshold = threshold
+        self.min_changed = min_changed
+        self.min_refresh = min_refresh
+        self.hold = hold
+        self.clock = clock
+        self.camera = camera
+        self.reference = None
+        self.last_detect = None
+        self.last_motion = None
+        self.changed = 0.0
+        self.checked = 0
+        self.passed = 0
+
+    def _thumbnail(self, frame, bgr):
+        h, w = frame.shape[:2]
+        # Subsample rows/columns first so the area resize only touches a few pixels
+        step = max(w // (self.width * 2), 1)
+        frame = frame[::step, ::step]
+        h, w = frame.shape[:2]
+        small = cv2.resize(frame, (self.width, max(round(h * self.width / w), 1)), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY if bgr else cv2.COLOR_RGB2GRAY)
+        return cv2.GaussianBlur(small, (3, 3), 0)
+
+    def should_detect(self, frame, bgr=False, now=None):
+        now = self.clock() if now is None else now
+        self.checked += 1
+        with metrics.timer("motion", self.camera):
+            thumb = self._thumbnail(frame, bgr)
+            if self.reference is None or self.reference.shape != thumb.shape:
+                motion = True
+                self.changed = 1.0
+            else:
+                diff = cv2.absdiff(thumb, self.reference)
+                self.changed = cv2.countNonZero(cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)[1]) / diff.size
+                motion = self.changed >= self.min_changed
+        if motion:
+            self.last_motion = now
+        due = (motion or self.last_detect is None or now - self.last_detect >= self.min_refresh
+               or (self.last_motion is not None and now - self.last_motion < self.hold))
+        if due:
+            self.reference = thumb
+            self.last_detect = now
+            self.passed += 1
+        return due
+
+    def reset(self):
+        self.reference = None
+        self.last_detect = None
+        self.last_motion = None
+
+class GatedDetector:
+    # Drop-in for FaceDetector.detect that reuses the previous result while the scene is static
+    def __init__(self, detector, gate=None):
+        self.detector = detector
+        self.gate = gate or MotionGate(camera=getattr(detector, "camera", None))
+        self._last = (False, None)
+        self.skipped = 0
+
+    def detect(self, frame, bgr=False):
+        if self.needs_detection(frame, bgr):
+            self._last = self.detector.detect(frame, bgr=bgr)
+        return self._last
+
+    def needs_detection(self, frame, bgr=False):
+        # For callers that run the detector themselves (e.g. batched across cameras):
+        # False means last still stands for this frame; pass a fresh result to remember()
+        if self.gate.should_detect(frame, bgr) or self._last[1] is None:
+            return True
+        self.skipped += 1
+        return False
+
+    @property
+    def last(self):
+        return self._last
+
+    def remember(self, result):
+        self._last = result
+
+    def reset(self):
+        self.detector.reset()
+        self.gate.reset()
+        self._last = (False, None)
+
+    def __getattr__(self, name):
+        # Everything else (detect_batch, camera, ...) goes to the wrapped detector
+        if name == "detector":
+            raise AttributeError(name)
+        return getattr(self.detector, name)
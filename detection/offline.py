@@ -0,0 +1,205 @@
+# Offline analysis of recorded footage. The recording is cut into time chunks that are
+# processed in parallel worker processes; each chunk first replays a short overlap
+# before its own range so the tracker and smoother are warmed up, then the per-chunk
+# intervals are stitched (track ids matched across boundaries) into one timeline.
+#   python main.py analyze recording.mp4 --workers 8 --output timeline.json
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from collections import namedtuple
+import numpy as np
+from camera.sources import open_source
+from detection.activity import ActivityClassifier, desk_status
+from detection.boxes import iou_matrix
+from detection.drowsiness import EyeStateChecker
+from detection.face_detector import FaceDetector
+from detection.smoothing import StatusSmoother
+from detection.tracker import TrackingDetector
+
+Chunk = namedtuple("Chunk", ["index", "warmup_start", "start", "end"])
+
+def plan_chunks(frame_count, fps, chunk_seconds=300.0, overlap_seconds=10.0):
+    # Frame ranges [start, end) per chunk, each with warmup_start = start - overlap.
+    # The warm-up is capped at a quarter of the chunk, so replaying it never costs more
+    # than 25% on top of the chunk's own frames.
+    size = max(int(chunk_seconds * fps), 1)
+    overlap = min(int(overlap_seconds * fps), size // 4)
+    chunks = []
+    for index, start in enumerate(range(0, frame_count, size)):
+        chunks.append(Chunk(index, max(start - overlap, 0), start, min(start + size, frame_count)))
+    return chunks
+
+def analyze_chunk(source, chunk, detect_width=640, detect_every=3, start_time=None):
+    # Runs in a worker process. Returns desk status intervals, per-track presence
+    # intervals (chunk-local track ids) and the tracks seen on the chunk's edge frames.
+    frame_source = open_source(source, realtime=False, start_time=start_time)
+    if not frame_source.open():
+        raise RuntimeError(f"Could not open {source}")
+    frame_gap = 1.0 / (getattr(frame_source, "fps", 0) or 30.0)
+    tracking = TrackingDetector(FaceDetector(detect_width=detect_width, roi=True), detect_every=detect_every)
+    eyes = EyeStateChecker()
+    activity = ActivityClassifier()
+    smoother = StatusSmoother(initial="IDLE")
+    statuses = []
+    track_intervals = []
+    open_tracks = {}
+    first_tracks = last_tracks = None
+    current = None
+    ts = None
+    frames = 0
+    try:
+        frame_source.seek(chunk.warmup_start)
+        for index in range(chunk.warmup_start, chunk.end):
+            result = frame_source.read()
+            if result is None:
+                break
+            image, ts = result
+            tracks = tracking.process(image, bgr=True)
+            eyes.check(image, tracks, ts, bgr=True, gray=tracking.detector.gray_for(image))
+            activity.classify(image, tracks, bgr=True)
+            status = smoother.update(desk_status(tracks), ts)
+            if index < chunk.start:
+                continue
+            frames += 1
+            boxes = {track.id: track.box for track in tracks}
+            if first_tracks is None:
+                first_tracks = boxes
+            last_tracks = boxes
+            if current is None or current[1] != status:
+                if current is not None:
+                    statuses.append((current[0], ts, current[1]))
+                current = (ts, status)
+            for track_id in list(open_tracks):
+                if track_id not in boxes:
+                    first, last = open_tracks.pop(track_id)
+                    track_intervals.append((track_id, first, last + frame_gap))
+            for track_id in boxes:
+                first, _ = open_tracks.get(track_id, (ts, ts))
+                open_tracks[track_id] = (first, ts)
+    finally:
+        frame_source.close()
+    if current is not None:
+        statuses.append((current[0], ts + frame_gap, current[1]))
+    for track_id, (first, last) in open_tracks.items():
+        track_intervals.append((track_id, first, last + frame_gap))
+    return {
+        "index": chunk.index,
+        "frames": frames,
+        "statuses": statuses,
+        "tracks": track_intervals,
+        "first_tracks": first_tracks or {},
+        "last_tracks": last_tracks or {},
+    }
+
+def _analyze_chunk_task(args):
+    return analyze_chunk(*args)
+
+def merge_chunks(results, iou_threshold=0.3, max_gap=0.5):
+    # Concatenate chunk results in order, joining intervals that continue across a
+    # boundary (at most max_gap seconds apart) and mapping chunk-local track ids onto global ids
+    statuses = []
+    tracks = {}
+    next_id = 1
+    previous = None
+    for result in sorted(results, key=lambda r: r["index"]):
+        mapping = {}
+        if previous is not None and result["first_tracks"] and previous["last_tracks"]:
+            prev_ids = list(previous["last_tracks"])
+            cur_ids = list(result["first_tracks"])
+            overlap = iou_matrix([previous["last_tracks"][i] for i in prev_ids],
+                                 [result["first_tracks"][i] for i in cur_ids])
+            # Best pairs first, each id used once
+            for flat in np.argsort(-overlap, axis=None):
+                i, j = np.unravel_index(flat, overlap.shape)
+                if overlap[i, j] < iou_threshold:
+                    break
+                prev_global = previous["mapping"][prev_ids[i]]
+                if cur_ids[j] not in mapping and prev_global not in mapping.values():
+                    mapping[cur_ids[j]] = prev_global
+        for local_id, first, last in sorted(result["tracks"], key=lambda t: t[1]):
+            if local_id not in mapping:
+                mapping[local_id] = next_id
+                next_id += 1
+            intervals = tracks.setdefault(mapping[local_id], [])
+            if intervals and first - intervals[-1][1] <= max_gap:
+                intervals[-1] = (intervals[-1][0], max(last, intervals[-1][1]))
+            else:
+                intervals.append((first, last))
+        for start, end, status in result["statuses"]:
+            if statuses and statuses[-1][2] == status and start - statuses[-1][1] <= max_gap:
+                statuses[-1] = (statuses[-1][0], end, status)
+            else:
+                statuses.append((start, end, status))
+        result["mapping"] = mapping
+        previous = result
+    return statuses, tracks
+
+def status_totals(statuses):
+    totals = {}
+    for start, end, status in statuses:
+        totals[status] = totals.get(status, 0.0) + (end - start)
+    return totals
+
+def analyze(source, workers=None, chunk_seconds=300.0, overlap_seconds=10.0, detect_width=640, detect_every=3):
+    probe = open_source(source, realtime=False)
+    if probe.live:
+        raise ValueError("Offline analysis needs a recording, not a live camera")
+    if not probe.open():
+        raise RuntimeError(f"Could not open {source}")
+    frame_count, fps, start_time = probe.frame_count, getattr(probe, "fps", 30.0) or 30.0, probe.start_time
+    probe.close()
+    workers = workers or os.cpu_count() or 1
+    # Keep every worker busy even for short recordings, but not with chunks so short
+    # that the warm-up would have to be cut below overlap_seconds
+    chunk_seconds = min(chunk_seconds, max(frame_count / fps / workers, 4 * overlap_seconds, 1.0))
+    chunks = plan_chunks(frame_count, fps, chunk_seconds, overlap_seconds)
+    tasks = [(source, chunk, detect_width, detect_every, start_time) for chunk in chunks]
+    started = time.perf_counter()
+    if workers == 1:
+        results = [_analyze_chunk_task(task) for task in tasks]
+    else:
+        with mp.get_context("spawn").Pool(workers) as pool:
+            results = pool.map(_analyze_chunk_task, tasks, chunksize=1)
+    elapsed = time.perf_counter() - started
+    statuses, tracks = merge_chunks(results)
+    frames = sum(r["frames"] for r in results)
+    return {
+        "source": str(source),
+        "start": start_time,
+        "frames": frames,
+        "chunks": len(chunks),
+        "workers": workers,
+        "elapsed": round(elapsed, 3),
+        "fps": round(frames / elapsed, 1) if elapsed > 0 else None,
+        "statuses": statuses,
+        "tracks": {str(track_id): intervals for track_id, intervals in tracks.items()},
+        "totals": status_totals(statuses),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="analyze", description="Reprocess a recording in parallel")
+    parser.add_argument("source", help="video file or image directory")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-seconds", type=float, default=300.0)
+    parser.add_argument("--overlap-seconds", type=float, default=10.0)
+    parser.add_argument("--detect-width", type=int, default=640)
+    parser.add_argument("--detect-every", type=int, default=3)
+    parser.add_argument("--output", default=None, help="write the timeline as JSON here")
+    args = parser.parse_args(argv)
+    timeline = analyze(args.source, args.workers, args.chunk_seconds, args.overlap_seconds,
+                       args.detect_width, args.detect_every)
+    print(f"{timeline['frames']} frames in {timeline['chunks']} chunks on {timeline['workers']} workers: "
+          f"{timeline['elapsed']}s ({timeline['fps']} fps)")
+    for status, seconds in sorted(timeline["totals"].items()):
+        print(f"{status.title()}: {int(seconds)}s")
+    print(f"{len(timeline['tracks'])} tracks")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(timeline, f, indent=2)
+        print(f"Timeline written to {args.output}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import namedtuple
+from detection.face_detector import FaceDetector
+
+CameraResult = namedtuple("CameraResult", ["camera", "frame_id", "timestamp", "found", "faces"])
+BatchResult = namedtuple("BatchResult", ["results", "size", "elapsed", "per_frame"])
+
+class BatchScheduler:
+    # Collects the newest frame from every active camera and runs them through
+    # one detect_batch call per tick. Cameras are either pulled (add_source with
+    # anything that has latest(after_id), e.g. CaptureThread) or pushed with offer().
+    # The owner decides the tick rate by calling tick(), e.g. from a QTimer.
+    # Several owners may add the same camera (two cards on one device); it is pulled
+    # until the last of them removes its source.
+    def __init__(self, detector=None, bgr=True):
+        self.detector = detector or FaceDetector()
+        # Frames handed to the scheduler are BGR as read from cv2 unless bgr=False
+        self.bgr = bgr
+        self._sources = {}  # camera -> [source per owner]
+        self._last_ids = {}
+        self._offered = {}
+        self._lock = threading.Lock()
+        self.results = {}
+        self.last_batch = None
+        self.batches = 0
+
+    def add_source(self, camera, source):
+        self._sources.setdefault(camera, []).append(source)
+        self._last_ids.setdefault(camera, -1)
+
+    def remove_camera(self, camera, source=None):
+        # With source, only that owner's reference is dropped
+        sources = self._sources.get(camera, [])
+        if source is not None and source in sources:
+            sources.remove(source)
+            if sources:
+                return
+        self._sources.pop(camera, None)
+        self._last_ids.pop(camera, None)
+        with self._lock:
+            self._offered.pop(camera, None)
+        self.results.pop(camera, None)
+
+    def offer(self, camera, frame, frame_id=None, timestamp=None):
+        # Replace any frame this camera offered since the last tick
+        with self._lock:
+            self._offered[camera] = (frame_id, timestamp or time.time(), frame)
+
+    def _collect(self):
+        batch = []
+        for camera, sources in list(self._sources.items()):
+            # Owners share the camera's frames, so the newest owner's source stands for all
+            frame = sources[-1].latest(self._last_ids[camera])
+            if frame is not None:
+                self._last_ids[camera] = frame.frame_id
+                batch.append((camera, frame.frame_id, frame.timestamp, frame.image))
+        with self._lock:
+            offered, self._offered = self._offered, {}
+        for camera, (frame_id, timestamp, image) in offered.items():
+            batch.append((camera, frame_id, timestamp, image))
+        return batch
+
+    def tick(self):
+        # Returns a BatchResult, or None when no camera had a new frame
+        batch = self._collect()
+        if not batch:
+            return None
+        start = time.perf_counter()
+        detections = self.detector.detect_batch([item[3] for item in batch], bgr=self.bgr)
+        elapsed = time.perf_counter() - start
+        results = {}
+        for (camera, frame_id, timestamp, _), (found, faces) in zip(batch, detections):
+            results[camera] = CameraResult(camera, frame_id, timestamp, found, faces)
+        self.results.update(results)
+        self.batches += 1
+        self.last_batch = BatchResult(results, len(batch), elapsed, elapsed / len(batch))
+        return self.last_batch
+
+    def result(self, camera):
+        # Latest result for a camera (may lag its newest frame by one tick)
+        return self.results.get(camera)
@@ -0,0 +1,157 @@
+import time
+import numpy as np
+
+def _per_state(value, states, default):
+    # int/float for every state, or {state: value} with default for the rest
+    if isinstance(value, dict):
+        return [value.get(s, default) for s in states]
+    return [default if value is None else value] * len(states)
+
+class HysteresisSmoother:
+    # Status smoothing for many slots (tracks, cameras, employees) at once. Each slot keeps
+    # a ring buffer of its last window observations plus running per-state counts, so an
+    # update is O(1) per slot and a batch of slots is a handful of array operations.
+    #   enter[s]:     a slot switches to s once s fills at least this many of the window
+    #   exit[s]:      while in s the slot holds on as long as s keeps at least this many
+    #   min_dwell[s]: seconds a slot stays in s before it may switch away
+    # With the defaults (enter=7, exit=window-enter+1, no dwell) this is the 7-of-10 vote.
+    def __init__(self, states=("WORKING", "IDLE"), window=10, enter=7, exit=None, min_dwell=0.0,
+                 initial=None, capacity=16, clock=time.time):
+        self.window = window
+        self.states = []
+        self._codes = {}
+        self._enter_cfg, self._exit_cfg, self._dwell_cfg = enter, exit, min_dwell
+        self.enter = np.zeros(0, dtype=np.int32)
+        self.exit = np.zeros(0, dtype=np.int32)
+        self.min_dwell = np.zeros(0)
+        self.initial = initial
+        self.clock = clock
+        self._keys = {}
+        self._free = []
+        self.history = np.full((capacity, window), -1, dtype=np.int16)
+        self.position = np.zeros(capacity, dtype=np.int32)
+        self.counts = np.zeros((capacity, 0), dtype=np.int32)
+        self.current = np.full(capacity, -1, dtype=np.int16)
+        # When each slot entered its state, NaN until its first update: callers may pass
+        # source timestamps (recordings), so the wall clock is no starting point
+        self.since = np.full(capacity, np.nan)
+        for state in states:
+            self.code(state)
+
+    def code(self, state):
+        # Column of state, added (with its configured thresholds) on first sight
+        code = self._codes.get(state)
+        if code is None:
+            code = self._codes[state] = len(self.states)
+            self.states.append(state)
+            enter = _per_state(self._enter_cfg, [state], 7)[0]
+            exit = _per_state(self._exit_cfg, [state], None)[0]
+            self.enter = np.append(self.enter, enter)
+            self.exit = np.append(self.exit, self.window - enter + 1 if exit is None else exit)
+            self.min_dwell = np.append(self.min_dwell, _per_state(self._dwell_cfg, [state], 0.0)[0])
+            self.counts = np.hstack([self.counts, np.zeros((len(self.counts), 1), dtype=np.int32)])
+        return code
+
+    def row(self, key):
+        # Slot of key, allocated on first use
+        row = self._keys.get(key)
+        if row is None:
+            row = self._free.pop() if self._free else len(self._keys)
+            if row >= len(self.current):
+                self._grow(2 * len(self.current))
+            self._keys[key] = row
+            self._clear(row)
+        return row
+
+    def _grow(self, capacity):
+        extra = capacity - len(self.current)
+        self.history = np.vstack([self.history, np.full((extra, self.window), -1, dtype=np.int16)])
+        self.position = np.concatenate([self.position, np.zeros(extra, dtype=np.int32)])
+        self.counts = np.vstack([self.counts, np.zeros((extra, self.counts.shape[1]), dtype=np.int32)])
+        self.current = np.concatenate([self.current, np.full(extra, -1, dtype=np.int16)])
+        self.since = np.concatenate([self.since, np.full(extra, np.nan)])
+
+    def _clear(self, row):
+        self.history[row] = -1
+        self.position[row] = 0
+        self.counts[row] = 0
+        self.current[row] = -1 if self.initial is None else self.code(self.initial)
+        self.since[row] = np.nan
+
+    def release(self, key):
+        # Forget a slot (e.g. the track ended); its row is reused
+        row = self._keys.pop(key, None)
+        if row is not None:
+            self._free.append(row)
+
+    def update_rows(self, rows, codes, now=None):
+        # rows: distinct slot rows, codes: observed state codes -> smoothed state codes (-1 = none yet)
+        now = self.clock() if now is None else now
+        rows = np.asarray(rows, dtype=np.intp)
+        codes = np.asarray(codes, dtype=np.int16)
+        position = self.position[rows]
+        old = self.history[rows, position]
+        seen = old >= 0
+        self.counts[rows[seen], old[seen]] -= 1
+        self.history[rows, position] = codes
+        self.counts[rows, codes] += 1
+        self.position[rows] = (position + 1) % self.window
+        counts = self.counts[rows]
+        current = self.current[rows]
+        has_current = current >= 0
+        held = np.where(has_current, current, 0)
+        # Candidates: other states with enough support; the best supported one wins
+        candidates = counts >= self.enter
+        candidates[np.flatnonzero(has_current), current[has_current]] = False
+        best = np.argmax(np.where(candidates, counts, -1), axis=1)
+        since = self.since[rows]
+        unset = np.isnan(since)
+        # A slot's first update starts its dwell clock and counts as having dwelt long enough
+        self.since[rows[unset]] = now
+        may_leave = ~has_current | ((counts[np.arange(len(rows)), held] < self.exit[held])
+                                    & (unset | (now - since >= self.min_dwell[held])))
+        switch = candidates.any(axis=1) & may_leave
+        switched = rows[switch]
+        self.current[switched] = best[switch]
+        self.since[switched] = now
+        return self.current[rows]
+
+    def update(self, observations, now=None):
+        # observations: {key: status} -> {key: smoothed status or None}
+        if not observations:
+            return {}
+        keys = list(observations)
+        rows = [self.row(key) for key in keys]
+        codes = [self.code(observations[key]) for key in keys]
+        result = self.update_rows(rows, codes, now).tolist()
+        return {key: self.states[c] if c >= 0 else None for key, c in zip(keys, result)}
+
+    def status(self, key):
+        row = self._keys.get(key)
+        if row is None or self.current[row] < 0:
+            return None
+        return self.states[self.current[row]]
+
+    def reset(self):
+        for row in self._keys.values():
+            self._clear(row)
+
+class StatusSmoother:
+    # A single stream (one camera or widget): one slot of HysteresisSmoother, so both
+    # apply exactly the same rule. threshold is HysteresisSmoother's enter.
+    def __init__(self, window=10, threshold=7, initial=None, exit=None, min_dwell=0.0, clock=time.time):
+        self._slots = HysteresisSmoother((), window, threshold, exit, min_dwell, initial, capacity=1, clock=clock)
+        self._row = self._slots.row(None)
+
+    def update(self, status, now=None):
+        slots = self._slots
+        code = slots.update_rows([self._row], [slots.code(status)], now)[0]
+        return slots.states[code] if code >= 0 else None
+
+    @property
+    def status(self):
+        return self._slots.status(None)
+
+    def reset(self, initial=None):
+        self._slots.initial = initial
+        self._slots.reset()
@@ -0,0 +1,139 @@
+import itertools
+import numpy as np
+from detection.boxes import as_boxes, iou_matrix
+
+# Constant-velocity model over (cx, cy, w, h); one step per frame
+_F = np.eye(8)
+_F[:4, 4:] = np.eye(4)
+_H = np.eye(4, 8)
+_Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.5, 0.5, 0.25, 0.25])
+_R = np.diag([16.0, 16.0, 25.0, 25.0])
+
+class Track:
+    def __init__(self, track_id, box):
+        x, y, w, h = [float(v) for v in box]
+        self.id = track_id
+        self.state = np.array([x + w / 2, y + h / 2, w, h, 0, 0, 0, 0], dtype=np.float64)
+        self.cov = np.diag([10.0, 10.0, 10.0, 10.0, 1000.0, 1000.0, 1000.0, 1000.0])
+        self.hits = 1
+        self.misses = 0
+        self.age = 0
+        # Set by detection.identity.Recognizer, once per appearance
+        self.identity = None
+        self.identity_attempts = 0
+        self.identified_at = 0
+        # Set by detection.activity.ActivityClassifier every frame
+        self.activity = None
+        # Set by detection.drowsiness.EyeStateChecker on the frames it samples this track
+        self.eyes_open = None
+        self.eyes_seen = 0
+        self.eyes_closed = 0.0
+        self.eyes_closed_since = None
+        self.eyes_checked_at = float("-inf")
+
+    def predict(self):
+        self.state = _F @ self.state
+        self.state[2:4] = np.maximum(self.state[2:4], 1.0)
+        self.cov = _F @ self.cov @ _F.T + _Q
+        self.age += 1
+
+    def correct(self, box):
+        x, y, w, h = [float(v) for v in box]
+        z = np.array([x + w / 2, y + h / 2, w, h])
+        s = _H @ self.cov @ _H.T + _R
+        gain = self.cov @ _H.T @ np.linalg.inv(s)
+        self.state = self.state + gain @ (z - _H @ self.state)
+        self.cov = (np.eye(8) - gain @ _H) @ self.cov
+        self.hits += 1
+        self.misses = 0
+
+    @property
+    def box(self):
+        cx, cy, w, h = self.state[:4]
+        return (int(round(cx - w / 2)), int(round(cy - h / 2)), int(round(w)), int(round(h)))
+
+class Tracker:
+    # Associates detections with existing tracks (IoU first, then centroid distance)
+    # so each person keeps the same track id between detections.
+    def __init__(self, iou_threshold=0.3, centroid_threshold=0.6, max_misses=3, min_hits=2):
+        self.iou_threshold = iou_threshold
+        # Max centroid distance, as a fraction of the track width, for the fallback match
+        self.centroid_threshold = centroid_threshold
+        # Detection rounds a track survives without a match
+        self.max_misses = max_misses
+        self.min_hits = min_hits
+        self._tracks = []
+        self._ids = itertools.count(1)
+
+    def predict(self):
+        # Advance every track one frame without a detection
+        for track in self._tracks:
+            track.predict()
+        return self.tracks
+
+    def update(self, detections):
+        # Advance one frame and fold in a fresh set of detections
+        for track in self._tracks:
+            track.predict()
+        detections = as_boxes(detections)
+        unmatched_tracks = list(range(len(self._tracks)))
+        unmatched_dets = list(range(len(detections)))
+        if self._tracks and len(detections):
+            predicted = np.array([t.box for t in self._tracks])
+            self._match(iou_matrix(predicted, detections), self.iou_threshold,
+                        detections, unmatched_tracks, unmatched_dets)
+            self._match(self._centroid_scores(predicted, detections), 1.0 - self.centroid_threshold,
+                        detections, unmatched_tracks, unmatched_dets)
+        for i in unmatched_tracks:
+            self._tracks[i].misses += 1
+        self._tracks = [t for t in self._tracks if t.misses <= self.max_misses]
+        for j in unmatched_dets:
+            self._tracks.append(Track(next(self._ids), detections[j]))
+        return self.tracks
+
+    def _match(self, scores, threshold, detections, unmatched_tracks, unmatched_dets):
+        # Greedy assignment, best score first
+        pairs = sorted(((scores[i, j], i, j) for i in unmatched_tracks for j in unmatched_dets), reverse=True)
+        for score, i, j in pairs:
+            if score < threshold:
+                break
+            if i in unmatched_tracks and j in unmatched_dets:
+                self._tracks[i].correct(detections[j])
+                unmatched_tracks.remove(i)
+                unmatched_dets.remove(j)
+
+    def _centroid_scores(self, predicted, detections):
+        pc = predicted[:, :2] + predicted[:, 2:] / 2
+        dc = detections[:, :2] + detections[:, 2:] / 2
+        dist = np.linalg.norm(pc[:, None, :] - dc[None, :, :], axis=2)
+        return 1.0 - dist / np.maximum(predicted[:, 2:3], 1)
+
+    @property
+    def tracks(self):
+        # Confirmed tracks only, so one-off false positives never get an id downstream
+        return [t for t in self._tracks if t.hits >= self.min_hits]
+
+    def reset(self):
+        self._tracks = []
+
+class TrackingDetector:
+    # Runs the full detector every detect_every frames and only predicts in between
+    def __init__(self, detector, tracker=None, detect_every=5):
+        self.detector = detector
+        self.tracker = tracker or Tracker()
+        self.detect_every = detect_every
+        self._frame_count = 0
+
+    def due(self):
+        # True when the next frame is a detection frame
+        return self._frame_count % self.detect_every == 0
+
+    def process(self, frame, bgr=False, detection=None):
+        # detection: (found, faces) for this frame when it was detected elsewhere (batched)
+        if self.due():
+            _, faces = detection if detection is not None else self.detector.detect(frame, bgr=bgr)
+            tracks = self.tracker.update(faces)
+        else:
+            tracks = self.tracker.predict()
+        self._frame_count += 1
+        return tracks
@@ -0,0 +1,304 @@
+# Headless recognition runner: capture, detection, status smoothing and event output
+# without importing Qt. Events and periodic throughput stats are printed as JSON lines.
+#   python main.py headless --source 0 --source 1
+#   python main.py headless --source 0 --source 1 --detector dnn   (one batched forward pass per tick)
+#   python main.py headless --source 0 --source 1 --source 2 --workers 3   (detection on a process pool)
+#   python -m headless --source 0
+import argparse
+import json
+import os
+import sys
+import time
+from camera.registry import acquire
+from camera.capture import SyncCapture
+from detection.face_detector import FaceDetector
+from detection.models import registry
+from detection.identity import IdentityIndex, Recognizer
+from detection.motion import GatedDetector, MotionGate
+from detection.tracker import TrackingDetector
+from detection.scheduler import BatchScheduler
+from detection.engine import DetectionEngine
+from detection.activity import ActivityClassifier, desk_status, desk_track
+from detection.drowsiness import EyeStateChecker
+from detection.smoothing import StatusSmoother
+from storage.event_log import EventLog
+from storage.sqlite_store import SQLiteStore
+from metrics.timers import metrics
+from metrics.export import start_exporters
+
+def print_event(event):
+    print(json.dumps(event), flush=True)
+
+class CameraWorker:
+    # One camera's pipeline: newest frame -> tracked faces -> smoothed desk status
+    def __init__(self, source, detect_width=640, detect_every=3, window=10, threshold=7, fast=False,
+                 min_refresh=2.0, recognizer=None):
+        self.source = source
+        # Optional: names tracks once per appearance (status events then list employees)
+        self.recognizer = recognizer
+        # fast: read files on this thread as quickly as they decode, processing every frame
+        self.capture = SyncCapture(source) if fast and not is_device(source) else acquire(source)
+        detector = FaceDetector(detect_width=detect_width, roi=True, camera=source)
+        self.frame_time = 0.0
+        if min_refresh is not None:
+            # Static scene: reuse the last detection, refreshing at least every min_refresh seconds
+            # of source time (so replays at --fast speed gate the same way as live cameras)
+            detector = GatedDetector(detector, MotionGate(min_refresh=min_refresh, clock=lambda: self.frame_time,
+                                                          camera=source))
+        self.tracking = TrackingDetector(detector, detect_every=detect_every)
+        self.eyes = EyeStateChecker(camera=source)
+        self.activity = ActivityClassifier(camera=source)
+        self.smoother = StatusSmoother(window, threshold)
+        self.track_timer = metrics.timer("track", source)
+        self.smooth_timer = metrics.timer("smooth", source)
+        self.status = None
+        # Recognized employee at the desk; kept while the desk is empty or the face unknown
+        self.employee = None
+        self.tracks = []
+        self.last_frame_id = -1
+        self.frames = 0
+        self.busy = 0.0
+
+    def pull(self):
+        # Newest unseen frame, or None
+        frame = self.capture.latest(self.last_frame_id)
+        if frame is not None:
+            self.last_frame_id = frame.frame_id
+            self.frame_time = frame.timestamp
+        return frame
+
+    def plan(self, frame):
+        # Batched mode: (True, None) when frame should join this tick's detection batch,
+        # else (False, detection): the gate's cached result, or None on a prediction frame
+        if not self.tracking.due():
+            return False, None
+        detector = self.tracking.detector
+        if isinstance(detector, GatedDetector) and not detector.needs_detection(frame.image, bgr=True):
+            return False, detector.last
+        return True, None
+
+    def step(self, frame=None, detection=None):
+        # Returns (frame, previous_status, previous_employee) when a new frame was processed, else None.
+        # In batched mode run() passes the pulled frame and its detection; otherwise
+        # the newest frame is pulled and detected here.
+        if frame is None:
+            frame = self.pull()
+            if frame is None:
+                return None
+        start = time.perf_counter()
+        with self.track_timer:
+            tracks = self.tracking.process(frame.image, bgr=True, detection=detection)
+        if self.recognizer is not None:
+            self.recognizer.identify(frame.image, tracks, bgr=True)
+        # Reuses the detector's grayscale frame when it ran on this frame (not in batched mode)
+        self.eyes.check(frame.image, tracks, frame.timestamp, bgr=True,
+                        gray=self.tracking.detector.gray_for(frame.image))
+        self.activity.classify(frame.image, tracks, bgr=True)
+        if detection is not None and isinstance(self.tracking.detector, GatedDetector):
+            self.tracking.detector.remember(detection)
+        previous, previous_employee = self.status, self.employee
+        desk = desk_track(tracks)
+        if desk is not None and desk.identity is not None and desk.identity.employee is not None:
+            self.employee = desk.identity.employee
+        with self.smooth_timer:
+            self.status = self.smoother.update(desk_status(tracks), frame.timestamp)
+        self.busy += time.perf_counter() - start
+        self.frames += 1
+        self.tracks = tracks
+        return frame, previous, previous_employee
+
+    def close(self):
+        self.capture.close()
+
+def step_batched(workers, scheduler):
+    # Every camera whose frame needs a detection this tick is offered to the scheduler,
+    # which runs them through one detect_batch call
+    pulled = [(w, f) for w, f in ((w, w.pull()) for w in workers) if f is not None]
+    plans = [worker.plan(frame) for worker, frame in pulled]
+    for (worker, frame), (wanted, _) in zip(pulled, plans):
+        if wanted:
+            scheduler.offer(worker.source, frame.image, frame.frame_id, frame.timestamp)
+    batch = scheduler.tick()
+    detections = {}
+    if batch is not None:
+        for worker, _ in pulled:
+            result = batch.results.get(worker.source)
+            if result is not None:
+                worker.busy += batch.per_frame
+                detections[worker] = (result.found, result.faces)
+    return [(worker, worker.step(frame, detections.get(worker, detection)))
+            for (worker, frame), (_, detection) in zip(pulled, plans)]
+
+def run(sources, detect_width=640, detect_every=3, stats_interval=10.0, duration=None, emit=print_event, fast=False,
+        min_refresh=2.0, batch=None, identities=None, pool_workers=None):
+    if pool_workers and batch is False:
+        # The pool only ever sees batches
+        raise ValueError("pool_workers needs batched detection")
+    index = IdentityIndex.load(identities) if identities else None
+    workers = [CameraWorker(source, detect_width, detect_every, fast=fast, min_refresh=min_refresh,
+                            recognizer=Recognizer(index, camera=source) if index is not None else None)
+               for source in sources]
+    # batch: detect every camera's frame in one call per tick; by default whenever the
+    # active backend runs batches natively (dnn), since the cascade gains nothing from it
+    if pool_workers:
+        # Each tick's detections are spread over worker processes (one core per camera)
+        scheduler = BatchScheduler(DetectionEngine(pool_workers, detector_kwargs={"detect_width": detect_width}))
+        batch = True
+    else:
+        scheduler = BatchScheduler(FaceDetector(camera="batch"))
+    if batch is None:
+        batch = scheduler.detector.batched and len(workers) > 1
+    started = last_stats = time.time()
+    last_frames = {w.source: 0 for w in workers}
+    stopped = set()
+    try:
+        while True:
+            for w in workers:
+                if w.capture.failed and w.source not in stopped:
+                    # Reported as soon as each camera fails, at its last frame, so its desk's
+                    # interval ends there instead of running on while the others keep going
+                    stopped.add(w.source)
+                    emit({"event": "stopped", "ts": w.frame_time or time.time(), "camera": w.source,
+                          "reason": w.capture.error, "previous": w.status,
+                          **({"employee": w.employee} if w.recognizer else {})})
+            active = [w for w in workers if w.source not in stopped]
+            if not active:
+                break
+            processed = False
+            steps = step_batched(active, scheduler) if batch else [(w, w.step()) for w in active]
+            for worker, result in steps:
+                if result is None:
+                    continue
+                processed = True
+                frame, previous, previous_employee = result
+                if worker.status != previous or (worker.status is not None and worker.employee != previous_employee):
+                    emit({"event": "status", "ts": frame.timestamp, "camera": worker.source,
+                          "status": worker.status, "previous": previous,
+                          "tracks": [track.id for track in worker.tracks],
+                          **({"employee": worker.employee, "previous_employee": previous_employee,
+                              "employees": [track.identity.employee if track.identity else None
+                                            for track in worker.tracks]} if worker.recognizer else {})})
+            if not processed:
+                # Nothing new on any camera yet
+                time.sleep(0.005)
+            now = time.time()
+            if now - last_stats >= stats_interval:
+                elapsed = now - last_stats
+                for w in workers:
+                    emit({"event": "stats", "ts": now, "camera": w.source,
+                          "fps": round((w.frames - last_frames[w.source]) / elapsed, 1),
+                          "busy_ms_per_frame": round(1000 * w.busy / max(w.frames, 1), 2),
+                          "dropped": w.capture.dropped,
+                          "detect_skipped": getattr(w.tracking.detector, "skipped", 0),
+                          "p95_ms": {stage: s["p95_ms"] for stage, s in metrics.summary(w.source).items()
+                                     if s.get("count")}})
+                    last_frames[w.source] = w.frames
+                last_stats = now
+            if duration is not None and now - started >= duration:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for w in workers:
+            w.close()
+        if pool_workers:
+            scheduler.detector.close()
+
+def parse_source(value):
+    return int(value) if value.isdigit() else value
+
+def is_device(source):
+    return isinstance(source, int)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="headless", description="Run recognition without the GUI")
+    parser.add_argument("--source", action="append", type=parse_source,
+                        help="camera index, video file or image directory (repeat for several, default 0)")
+    parser.add_argument("--fast", action="store_true",
+                        help="replay file sources as fast as possible instead of at recorded speed")
+    parser.add_argument("--detect-width", type=int, default=640)
+    parser.add_argument("--detect-every", type=int, default=3, help="run the full detector every N frames")
+    parser.add_argument("--min-refresh", type=float, default=2.0,
+                        help="seconds between detections while the scene is static")
+    parser.add_argument("--no-motion-gate", action="store_true", help="run the detector regardless of motion")
+    parser.add_argument("--detector", default="haar", choices=sorted(registry.backends),
+                        help="face detector backend (dnn: SSD on cv2.dnn, batched across cameras)")
+    parser.add_argument("--model", default=None, help="model file for the backend (default: its bundled/standard model)")
+    parser.add_argument("--dnn-size", type=int, default=300, help="dnn input size in pixels")
+    parser.add_argument("--dnn-threads", type=int, default=None, help="cv2 worker threads for the dnn backend")
+    parser.add_argument("--confidence", type=float, default=0.5, help="dnn detection threshold")
+    parser.add_argument("--no-batch", action="store_true", help="detect each camera separately")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="detect in this many worker processes (batched across cameras)")
+    parser.add_argument("--identities", default=None,
+                        help="enrolled face index (data/identities) to name the people in view")
+    parser.add_argument("--stats-interval", type=float, default=10.0, help="seconds between stats lines")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    parser.add_argument("--log-dir", default=None, help="also append status events to an event log here")
+    parser.add_argument("--fsync", default="interval", choices=["always", "interval", "never"])
+    parser.add_argument("--db", default=None, help="also record status intervals in this SQLite database")
+    parser.add_argument("--metrics-port", type=int, default=None, help="serve Prometheus metrics on 127.0.0.1")
+    parser.add_argument("--metrics-file", default=None, help="write Prometheus metrics to this file")
+    args = parser.parse_args(argv)
+    registry.configure(backend=args.detector, path=args.model, input_size=args.dnn_size,
+                       threads=args.dnn_threads, confidence=args.confidence)
+    try:
+        registry.get(args.detector, args.model)
+    except FileNotFoundError as exc:
+        parser.error(str(exc))
+    if args.workers and args.no_batch:
+        parser.error("--workers detects in batches and cannot be combined with --no-batch")
+    if args.identities and not os.path.exists(os.path.join(args.identities, "meta.json")):
+        parser.error(f"No enrolled identities in {args.identities} (see python main.py enroll)")
+    exporters = start_exporters(args.metrics_port, args.metrics_file)
+    sinks = []
+    if args.log_dir:
+        sinks.append(EventLog(args.log_dir, fsync=args.fsync))
+    if args.db:
+        sinks.append(SQLiteStore(args.db))
+    emit = log_and_print(*sinks) if sinks else print_event
+    try:
+        run(args.source or [0], args.detect_width, args.detect_every, args.stats_interval, args.duration, emit,
+            args.fast, None if args.no_motion_gate else args.min_refresh, False if args.no_batch else None,
+            args.identities, args.workers)
+    finally:
+        for sink in sinks + exporters:
+            sink.close()
+
+def desk_key(camera):
+    # Stands in for the employee of a desk nobody was recognized at; a separate namespace,
+    # so it never adds up with an enrolled employee whose id happens to equal the camera
+    return f"camera:{camera}"
+
+def log_and_print(*sinks):
+    # sinks: EventLog / SQLiteStore, anything with append(ts, camera, employee, status, **extra)
+    # One desk per camera: intervals go to the employee recognized at it (--identities),
+    # otherwise to desk_key(camera)
+    # employee -> camera of their open interval
+    open_at = {}
+    def emit(event):
+        camera = event.get("camera")
+        if event["event"] == "status":
+            employee = desk_key(camera) if event.get("employee") is None else event["employee"]
+            previous = desk_key(camera) if event.get("previous_employee") is None else event["previous_employee"]
+            for sink in sinks:
+                if previous != employee and event.get("previous") is not None:
+                    # Someone else took the desk: the previous occupant is away from it
+                    sink.append(event["ts"], camera, previous, "IDLE", tracks=[])
+                sink.append(event["ts"], camera, employee, event["status"], tracks=event["tracks"])
+            if previous != employee and event.get("previous") is not None:
+                open_at[previous] = camera
+            open_at[employee] = camera
+        elif event["event"] == "stopped":
+            # The camera is gone: a None status ends the intervals it opened (the desk's and
+            # any previous occupant's away time) without opening others
+            ended = [e for e, c in open_at.items() if c == camera]
+            for employee in ended:
+                del open_at[employee]
+                for sink in sinks:
+                    sink.append(event["ts"], camera, employee, None, reason=event["reason"])
+        print_event(event)
+    return emit
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,6 +1,23 @@
-from ui.app import run_app
+import sys
  
 if __name__ == "__main__":
-    print("Starting Employee Work Time Recognizer (GUI)...")
-    run_app()
-    # For CLI mode, import and call camera.webcam.show_webcam_feed() here 
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "headless":
+        # No Qt import on this path
+        from headless import main as run_headless
+        print("Starting Employee Work Time Recognizer (headless)...", file=sys.stderr)
+        run_headless(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "analyze":
+        from detection.offline import main as run_analysis
+        run_analysis(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "report":
+        from reporting.reports import main as run_report
+        run_report(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "enroll":
+        from detection.identity import main as run_enroll
+        run_enroll(sys.argv[2:])
+    else:
+        # Starts the clock for the startup report (see metrics.startup)
+        import metrics.startup
+        from ui.app import run_app
+        print("Starting Employee Work Time Recognizer (GUI)...")
+        run_app()
@@ -0,0 +1,108 @@
+# Prometheus text exposition of the stage metrics, written to a file (for the
+# node_exporter textfile collector) or served on a localhost-only HTTP endpoint.
+import ipaddress
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from metrics.timers import metrics as shared_metrics
+
+PREFIX = "ewr_stage"
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def prometheus_text(metrics=shared_metrics):
+    lines = [
+        f"# HELP {PREFIX}_seconds Time spent in each pipeline stage",
+        f"# TYPE {PREFIX}_seconds histogram",
+    ]
+    summaries = []
+    for (stage, camera), histogram in metrics.items():
+        labels = f'stage="{_escape(stage)}",camera="{_escape(camera)}"'
+        cumulative = 0
+        for bound, count in zip(histogram.bounds + (float("inf"),), histogram.buckets):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{PREFIX}_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"{PREFIX}_seconds_sum{{{labels}}} {histogram.sum!r}")
+        lines.append(f"{PREFIX}_seconds_count{{{labels}}} {histogram.count}")
+        summaries.append((labels, histogram.summary()))
+    # Rolling values over the last window of samples, as shown in the overlay
+    for name, field, scale, help_text in (("rate", "rate", 1.0, "Calls per second over the recent window"),
+                                          ("p95_seconds", "p95_ms", 0.001, "95th percentile over the recent window")):
+        lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PREFIX}_{name} gauge")
+        for labels, summary in summaries:
+            if summary.get(field) is not None:
+                lines.append(f"{PREFIX}_{name}{{{labels}}} {float(summary[field]) * scale!r}")
+    return "\n".join(lines) + "\n"
+
+def write_textfile(path, metrics=shared_metrics):
+    # Atomic replace, so a scraper never reads a half-written file
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(prometheus_text(metrics))
+    os.replace(tmp, path)
+
+class TextfileExporter:
+    # Rewrites path every interval seconds on a background thread
+    def __init__(self, path, interval=5.0, metrics=shared_metrics):
+        self.path = path
+        self.interval = interval
+        self.metrics = metrics
+        self._stop = threading.Event()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="metrics-textfile", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            write_textfile(self.path, self.metrics)
+        write_textfile(self.path, self.metrics)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(self.interval + 1.0)
+
+class MetricsServer:
+    # GET /metrics on a loopback address only; anything else is refused at construction
+    def __init__(self, port=9108, host="127.0.0.1", metrics=shared_metrics):
+        if not ipaddress.ip_address(host).is_loopback:
+            raise ValueError(f"Metrics endpoint must bind to a loopback address, got {host}")
+        registry = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = prometheus_text(registry).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def start_exporters(port=None, path=None, interval=5.0, metrics=shared_metrics):
+    # Starts whichever exporters were asked for; returns them so the caller can close them
+    exporters = []
+    if port is not None:
+        exporters.append(MetricsServer(port, metrics=metrics))
+        print(f"Metrics at http://127.0.0.1:{exporters[-1].port}/metrics", file=sys.stderr)
+    if path:
+        exporters.append(TextfileExporter(path, interval, metrics))
+    return exporters
@@ -0,0 +1,36 @@
+import sys
+import time
+
+# Milestones of a GUI cold start, in the order they are reached
+MILESTONES = ("imports", "window", "first_paint", "icons", "dashboard", "first_frame")
+
+class StartupTimer:
+    # Seconds from process start (this module is imported first thing in main.py)
+    # to each startup milestone; the report is printed once the first frame is shown
+    def __init__(self, clock=time.perf_counter, stream=sys.stderr):
+        self.clock = clock
+        self.stream = stream
+        self.start = clock()
+        self.marks = {}
+        self.reported = False
+
+    def mark(self, name):
+        # Only the first time each milestone is reached counts
+        if name not in self.marks:
+            self.marks[name] = self.clock() - self.start
+            if name == "first_frame":
+                self.report()
+        return self.marks[name]
+
+    def elapsed(self, name):
+        return self.marks.get(name)
+
+    def report(self):
+        if self.reported:
+            return
+        self.reported = True
+        parts = [f"{name} {self.marks[name] * 1000:.0f} ms" for name in MILESTONES if name in self.marks]
+        print("Startup: " + ", ".join(parts), file=self.stream)
+
+# Process-wide startup clock
+startup = StartupTimer()
@@ -0,0 +1,111 @@
+import bisect
+import threading
+import time
+import numpy as np
+
+# Upper bounds (seconds) of the cumulative histogram buckets used for export
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+class StageHistogram:
+    # Cumulative bucket counts since start (exported) plus a ring of the last window
+    # samples with their times, for live rate and percentiles. observe() is O(1).
+    def __init__(self, window=256, buckets=BUCKETS):
+        self.bounds = buckets
+        self.buckets = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = np.zeros(window)
+        self.stamps = np.zeros(window)
+        self._next = 0
+
+    def observe(self, seconds, now):
+        self.buckets[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        i = self._next % len(self.recent)
+        self.recent[i] = seconds
+        self.stamps[i] = now
+        self._next += 1
+
+    def summary(self):
+        n = min(self._next, len(self.recent))
+        if not n:
+            return {"count": 0}
+        samples = self.recent[:n] * 1000.0
+        stamps = self.stamps[:n]
+        span = stamps.max() - stamps.min()
+        p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+        return {
+            "count": self.count,
+            "rate": round(float((n - 1) / span), 2) if span > 0 else None,
+            "mean_ms": round(float(samples.mean()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+        }
+
+class _Timer:
+    # Reusable context manager for one (stage, camera); not reentrant
+    def __init__(self, metrics, histogram):
+        self._metrics = metrics
+        self._histogram = histogram
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._metrics.enabled:
+            end = time.perf_counter()
+            self._histogram.observe(end - self._start, end)
+
+class Metrics:
+    # Stage timings keyed by (stage, camera). Each key is expected to have a single
+    # writer (the thread running that stage for that camera), so observing takes no lock.
+    #   with metrics.timer("detect", camera): ...
+    def __init__(self, window=256, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self._histograms = {}
+        self._timers = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage, camera=""):
+        key = (stage, "" if camera is None else str(camera))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, StageHistogram(self.window))
+        return histogram
+
+    def timer(self, stage, camera=""):
+        key = (stage, camera)
+        timer = self._timers.get(key)
+        if timer is None:
+            timer = self._timers[key] = _Timer(self, self.histogram(stage, camera))
+        return timer
+
+    def observe(self, stage, seconds, camera=""):
+        if self.enabled:
+            self.histogram(stage, camera).observe(seconds, time.perf_counter())
+
+    def items(self):
+        # [((stage, camera), histogram)] sorted by camera, then stage
+        with self._lock:
+            return sorted(self._histograms.items(), key=lambda item: (item[0][1], item[0][0]))
+
+    def summary(self, camera=None):
+        # {stage: stats} for one camera, or {(stage, camera): stats} for all
+        if camera is None:
+            return {key: histogram.summary() for key, histogram in self.items()}
+        camera = str(camera)
+        return {stage: histogram.summary() for (stage, cam), histogram in self.items() if cam == camera}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._timers.clear()
+
+# Process-wide metrics shared by capture, detection and the UI
+metrics = Metrics()
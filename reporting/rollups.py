@@ -0,0 +1,241 @@
+import datetime
+import json
+import os
+import time
+import numpy as np
+from storage.event_log import tail_events
+from storage.ledger import STATUSES
+
+MINUTE = 60
+HOUR = 3600
+
+def day_of(ts):
+    # Local calendar day of a timestamp, as a datetime.date
+    return datetime.date.fromtimestamp(ts)
+
+def day_start(day):
+    return time.mktime(day.timetuple())
+
+class RollupEngine:
+    # Pre-aggregated time per (employee, status) in minute, hour and day buckets.
+    # Status transitions are folded in as they arrive (observe / add_interval), so
+    # reports only ever sum a handful of buckets instead of rescanning raw events.
+    # Day buckets are dense arrays [employee, status]; minute and hour buckets are
+    # sparse and pruned after minute_retention / hour_retention seconds.
+    def __init__(self, statuses=STATUSES,
+                 minute_retention=2 * 86400, hour_retention=90 * 86400):
+        self.statuses = list(statuses)
+        self._status_index = {s: i for i, s in enumerate(self.statuses)}
+        self.employees = []
+        self._employee_index = {}
+        self.days = {}
+        self.hours = {}
+        self.minutes = {}
+        self.minute_retention = minute_retention
+        self.hour_retention = hour_retention
+        # employee -> (status, credited_until) for intervals still open
+        self._open = {}
+        # Timestamp of the newest event folded in; catch_up() resumes from here
+        self.last_ts = None
+        # Position in the event log just past the last event read (see tail_events)
+        self.cursor = None
+        self._day_cache = None
+
+    def _employee_row(self, employee):
+        row = self._employee_index.get(employee)
+        if row is None:
+            row = self._employee_index[employee] = len(self.employees)
+            self.employees.append(employee)
+        return row
+
+    def _status_col(self, status):
+        col = self._status_index.get(status)
+        if col is None:
+            col = self._status_index[status] = len(self.statuses)
+            self.statuses.append(status)
+        return col
+
+    def _day_array(self, day):
+        array = self.days.get(day)
+        shape = (len(self.employees), len(self.statuses))
+        if array is None:
+            array = self.days[day] = np.zeros(shape)
+        elif array.shape != shape:
+            grown = np.zeros(shape)
+            grown[:array.shape[0], :array.shape[1]] = array
+            array = self.days[day] = grown
+        return array
+
+    def add_interval(self, employee, status, start, end):
+        # Credit [start, end) to every bucket it overlaps
+        if end <= start:
+            return
+        key = (self._employee_row(employee), self._status_col(status))
+        self._add_sparse(self.minutes, MINUTE, self.minute_retention, key, start, end)
+        self._add_sparse(self.hours, HOUR, self.hour_retention, key, start, end)
+        t = start
+        while t < end:
+            day, day_end = self._day_bounds(t)
+            stop = min(end, day_end)
+            self._day_array(day)[key] += stop - t
+            t = stop
+
+    def _day_bounds(self, ts):
+        # (day, end of day) for ts; local-time conversions are cached for the current day
+        cached = self._day_cache
+        if cached is None or not cached[1] <= ts < cached[2]:
+            day = day_of(ts)
+            cached = self._day_cache = (day, day_start(day), day_start(day + datetime.timedelta(days=1)))
+        return cached[0], cached[2]
+
+    def _add_sparse(self, buckets, size, retention, key, start, end):
+        # Buckets already past retention at end would be pruned straight away; skip them
+        bucket = int(max(start, end - retention) // size)
+        last = int((end - 1e-9) // size)
+        while bucket <= last:
+            lo = bucket * size
+            seconds = min(end, lo + size) - max(start, lo)
+            cell = buckets.get(bucket)
+            if cell is None:
+                cell = buckets[bucket] = {}
+            cell[key] = cell.get(key, 0.0) + seconds
+            bucket += 1
+
+    def observe(self, ts, employee, status):
+        # Status transition: close the employee's previous status at ts, open the new one
+        # (None: nothing is open any more, e.g. the camera stopped)
+        current = self._open.get(employee)
+        if current is not None:
+            previous, credited = current
+            if ts > credited:
+                self.add_interval(employee, previous, credited, ts)
+        if status is None:
+            self._open.pop(employee, None)
+        else:
+            self._open[employee] = (status, max(ts, current[1]) if current else ts)
+        if self.last_ts is None or ts > self.last_ts:
+            self.last_ts = ts
+
+    def observe_event(self, event):
+        # Accepts records written by storage.event_log.EventLog
+        if event.get("employee") is None:
+            return
+        self.observe(event["ts"], event["employee"], event["status"])
+
+    def catch_up(self, events_dir):
+        # Fold in events logged since the last one read; returns how many were read.
+        # Only segments from the cursor on are opened, so the cost follows the new events.
+        count = 0
+        # Snapshots from before the cursor was kept resume by timestamp instead
+        start = None if self.cursor is not None or self.last_ts is None else self.last_ts + 1e-6
+        for event, cursor in tail_events(events_dir, self.cursor):
+            self.cursor = cursor
+            if start is not None and event["ts"] < start:
+                continue
+            self.observe_event(event)
+            count += 1
+        if self.last_ts is not None:
+            self.prune(self.last_ts)
+        return count
+
+    def advance(self, now=None):
+        # Credit still-open statuses up to now, so live reports include them
+        now = time.time() if now is None else now
+        for employee, (status, credited) in list(self._open.items()):
+            if now > credited:
+                self.add_interval(employee, status, credited, now)
+                self._open[employee] = (status, now)
+        self.prune(now)
+
+    def prune(self, now=None):
+        now = time.time() if now is None else now
+        for buckets, size, retention in ((self.minutes, MINUTE, self.minute_retention),
+                                         (self.hours, HOUR, self.hour_retention)):
+            oldest = int((now - retention) // size)
+            for bucket in [b for b in buckets if b < oldest]:
+                del buckets[bucket]
+
+    def totals(self, first_day, days=1):
+        # [employee, status] seconds summed over days starting at first_day
+        total = np.zeros((len(self.employees), len(self.statuses)))
+        for offset in range(days):
+            array = self.days.get(first_day + datetime.timedelta(days=offset))
+            if array is not None:
+                total[:array.shape[0], :array.shape[1]] += array
+        return total
+
+    def report(self, first_day, days=1, employees=None):
+        # {employee: {status: seconds}} over a range of days
+        total = self.totals(first_day, days)
+        rows = range(len(self.employees)) if employees is None else \
+            [self._employee_index[e] for e in employees if e in self._employee_index]
+        return {self.employees[r]: dict(zip(self.statuses, total[r].tolist())) for r in rows}
+
+    def daily_report(self, day, employees=None):
+        return self.report(day, 1, employees)
+
+    def weekly_report(self, week_start, employees=None):
+        return self.report(week_start, 7, employees)
+
+    def series(self, employee, status, start, end, granularity=HOUR):
+        # Seconds per bucket for one employee and status, from the minute or hour rollup
+        buckets = self.minutes if granularity == MINUTE else self.hours
+        key = (self._employee_index.get(employee), self._status_index.get(status))
+        first, last = int(start // granularity), int((end - 1e-9) // granularity)
+        return [(b * granularity, buckets.get(b, {}).get(key, 0.0)) for b in range(first, last + 1)]
+
+    def save(self, path):
+        # Snapshot of every rollup, so history never has to be re-read from the event log
+        day_keys = sorted(self.days)
+        shape = (len(day_keys), len(self.employees), len(self.statuses))
+        days = np.zeros(shape)
+        for i, day in enumerate(day_keys):
+            days[i] = self._day_array(day)
+        meta = {
+            "employees": self.employees,
+            "statuses": self.statuses,
+            # Rows rather than an object: JSON keys would turn integer employee ids into strings
+            "open": [[e, status, credited] for e, (status, credited) in self._open.items()],
+            "last_ts": self.last_ts,
+            "cursor": self.cursor,
+            "minute_retention": self.minute_retention,
+            "hour_retention": self.hour_retention,
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)),
+                     day_keys=np.array([d.toordinal() for d in day_keys], dtype=np.int64), days=days,
+                     hours=_flatten(self.hours), minutes=_flatten(self.minutes))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            engine = cls(meta["statuses"], meta["minute_retention"], meta["hour_retention"])
+            for employee in meta["employees"]:
+                engine._employee_row(employee)
+            engine._open = {e: (status, credited) for e, status, credited in meta["open"]}
+            engine.last_ts = meta["last_ts"]
+            engine.cursor = tuple(meta["cursor"]) if meta.get("cursor") else None
+            for ordinal, array in zip(data["day_keys"].tolist(), data["days"]):
+                engine.days[datetime.date.fromordinal(ordinal)] = array.copy()
+            engine.hours = _unflatten(data["hours"])
+            engine.minutes = _unflatten(data["minutes"])
+        return engine
+
+def _flatten(buckets):
+    rows = [(bucket, row, col, seconds) for bucket, cell in buckets.items()
+            for (row, col), seconds in cell.items()]
+    return np.array(rows, dtype=np.float64).reshape(-1, 4)
+
+def _unflatten(array):
+    buckets = {}
+    if not len(array):
+        return buckets
+    array = array[np.argsort(array[:, 0], kind="stable")]
+    starts = np.flatnonzero(np.diff(array[:, 0])) + 1
+    for group in np.split(array, starts):
+        keys = zip(group[:, 1].astype(np.int64).tolist(), group[:, 2].astype(np.int64).tolist())
+        buckets[int(group[0, 0])] = dict(zip(keys, group[:, 3].tolist()))
+    return buckets
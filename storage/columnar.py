@@ -0,0 +1,190 @@
+import itertools
+import json
+import os
+import sqlite3
+import numpy as np
+
+# One raw file per column, fixed width; meta.json holds the row count and the
+# dictionaries that map employee / status / camera codes back to their values
+COLUMNS = {
+    "start": np.float64,
+    "end": np.float64,
+    "employee": np.int32,
+    "status": np.uint8,
+    "camera": np.int32,
+}
+
+def _meta_path(directory):
+    return os.path.join(directory, "meta.json")
+
+def _column_path(directory, name):
+    return os.path.join(directory, f"{name}.bin")
+
+def _read_meta(directory):
+    with open(_meta_path(directory)) as f:
+        return json.load(f)
+
+class ColumnarWriter:
+    # Appends status intervals to a columnar timeline directory. Rows are buffered and
+    # written column by column on flush(); meta.json is replaced last, so readers only
+    # ever see complete rows.
+    def __init__(self, directory, buffer_rows=65536):
+        self.directory = directory
+        self.buffer_rows = buffer_rows
+        os.makedirs(directory, exist_ok=True)
+        if os.path.isfile(_meta_path(directory)):
+            meta = _read_meta(directory)
+        else:
+            meta = {"count": 0, "employees": [], "statuses": [], "cameras": [],
+                    "max_duration": 0.0, "last_start": None, "sorted": True}
+        self.meta = meta
+        self._codes = {key: {value: i for i, value in enumerate(meta[key])}
+                       for key in ("employees", "statuses", "cameras")}
+        self._rows = []
+        # Drop anything written after the last committed meta (interrupted flush)
+        for name, dtype in COLUMNS.items():
+            path = _column_path(directory, name)
+            with open(path, "ab") as f:
+                f.truncate(meta["count"] * np.dtype(dtype).itemsize)
+
+    def _code(self, key, value):
+        codes = self._codes[key]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.meta[key])
+            self.meta[key].append(value)
+            if key == "statuses" and code > np.iinfo(np.uint8).max:
+                raise ValueError("Too many distinct statuses for the status column")
+        return code
+
+    def append(self, employee, camera, status, start, end):
+        self._rows.append((start, end, self._code("employees", employee), self._code("statuses", status),
+                           self._code("cameras", camera)))
+        if len(self._rows) >= self.buffer_rows:
+            self.flush()
+
+    def extend(self, rows):
+        # rows: (employee, camera, status, start, end); encoded a buffer at a time
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, self.buffer_rows))
+            if not chunk:
+                break
+            employees, cameras, statuses, starts, ends = zip(*chunk)
+            self.flush()
+            self._write({
+                "start": np.asarray(starts, dtype=np.float64),
+                "end": np.asarray(ends, dtype=np.float64),
+                "employee": self._encode("employees", employees, COLUMNS["employee"]),
+                "status": self._encode("statuses", statuses, COLUMNS["status"]),
+                "camera": self._encode("cameras", cameras, COLUMNS["camera"]),
+            })
+
+    def _encode(self, key, values, dtype):
+        codes = self._codes[key]
+        for value in set(values) - codes.keys():
+            self._code(key, value)
+        return np.asarray([codes[v] for v in values], dtype=dtype)
+
+    def flush(self):
+        if not self._rows:
+            return
+        columns = list(zip(*self._rows))
+        self._rows = []
+        self._write({name: np.asarray(values, dtype=dtype) for (name, dtype), values in zip(COLUMNS.items(), columns)})
+
+    def _write(self, arrays):
+        order = np.argsort(arrays["start"], kind="stable")
+        for name in COLUMNS:
+            with open(_column_path(self.directory, name), "ab") as f:
+                f.write(arrays[name][order].tobytes())
+        meta = self.meta
+        starts = arrays["start"][order]
+        if meta["last_start"] is not None and starts[0] < meta["last_start"]:
+            meta["sorted"] = False
+        meta["last_start"] = float(starts[-1])
+        meta["max_duration"] = max(meta["max_duration"], float(np.max(arrays["end"] - arrays["start"])))
+        meta["count"] += len(starts)
+        tmp = _meta_path(self.directory) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, _meta_path(self.directory))
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ColumnarTimeline:
+    # Read-only view of a timeline directory. Columns are np.memmap arrays, so opening
+    # is instant and a query only pages in the rows of its window.
+    def __init__(self, directory):
+        self.directory = directory
+        meta = _read_meta(directory)
+        self.count = meta["count"]
+        self.employees = meta["employees"]
+        self.statuses = meta["statuses"]
+        self.cameras = meta["cameras"]
+        self.max_duration = meta["max_duration"]
+        self.sorted = meta["sorted"]
+        self._employee_codes = {e: i for i, e in enumerate(self.employees)}
+        for name, dtype in COLUMNS.items():
+            if self.count:
+                column = np.memmap(_column_path(directory, name), dtype=dtype, mode="r", shape=(self.count,))
+            else:
+                column = np.zeros(0, dtype=dtype)
+            setattr(self, name, column)
+
+    def __len__(self):
+        return self.count
+
+    def window(self, start, end):
+        # Row indices (a slice when sorted) of intervals overlapping [start, end)
+        if self.sorted:
+            # Only intervals starting at most max_duration before the window can reach into it
+            lo = int(np.searchsorted(self.start, start - self.max_duration, side="left"))
+            hi = int(np.searchsorted(self.start, end, side="left"))
+            return slice(lo, hi)
+        return np.flatnonzero((self.start < end) & (self.end > start))
+
+    def status_times(self, start, end):
+        # Seconds per [employee, status] within [start, end), in one vectorized pass
+        rows = self.window(start, end)
+        overlap = np.clip(np.minimum(self.end[rows], end) - np.maximum(self.start[rows], start), 0.0, None)
+        codes = self.employee[rows].astype(np.int64) * len(self.statuses) + self.status[rows]
+        totals = np.bincount(codes, weights=overlap, minlength=len(self.employees) * len(self.statuses))
+        return totals.reshape(len(self.employees), len(self.statuses))
+
+    def employee_status_times(self, employee, start, end):
+        # {status: seconds} for one employee, like EmployeeStatusItem.status_times
+        code = self._employee_codes.get(employee)
+        if code is None:
+            return {s: 0.0 for s in self.statuses}
+        rows = self.window(start, end)
+        mask = self.employee[rows] == code
+        overlap = np.clip(np.minimum(self.end[rows][mask], end) - np.maximum(self.start[rows][mask], start), 0.0, None)
+        totals = np.bincount(self.status[rows][mask], weights=overlap, minlength=len(self.statuses))
+        return dict(zip(self.statuses, totals.tolist()))
+
+    def totals(self, start, end):
+        # {employee: {status: seconds}} for everyone
+        totals = self.status_times(start, end)
+        return {e: dict(zip(self.statuses, row)) for e, row in zip(self.employees, totals.tolist())}
+
+def export_sqlite(db_path, directory, since=None):
+    # Copy closed intervals from a SQLiteStore database into a columnar timeline, in start order
+    db = sqlite3.connect(db_path)
+    try:
+        query = "SELECT employee_id, camera, status, start_ts, end_ts FROM intervals WHERE end_ts IS NOT NULL"
+        params = ()
+        if since is not None:
+            query += " AND start_ts >= ?"
+            params = (since,)
+        with ColumnarWriter(directory) as writer:
+            writer.extend(db.execute(query + " ORDER BY start_ts", params))
+    finally:
+        db.close()
@@ -0,0 +1,180 @@
+import atexit
+import json
+import os
+import threading
+import time
+import weakref
+from collections import deque
+
+DEFAULT_LOG_DIR = os.path.join("data", "events")
+
+# fsync policies: "always" after every batch, "interval" at most every fsync_interval
+# seconds, "never" leaves it to the OS
+FSYNC_POLICIES = ("always", "interval", "never")
+
+_open_logs = weakref.WeakSet()
+
+@atexit.register
+def _close_all():
+    for log in list(_open_logs):
+        log.close()
+
+class EventLog:
+    # Append-only log of status transitions, one JSON object per line.
+    # append() only queues the event; a background thread writes batches and
+    # rotates segment files by size and age, so callers never wait on disk.
+    def __init__(self, directory=DEFAULT_LOG_DIR, fsync="interval", fsync_interval=1.0, batch_size=512,
+                 flush_interval=0.25, max_segment_bytes=64 * 1024 * 1024, max_segment_age=3600.0,
+                 max_pending=100000):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.directory = directory
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.max_pending = max_pending
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.segments = 0
+        self._pending = deque()
+        self._wake = threading.Event()
+        self._closing = False
+        self._file = None
+        self._segment_bytes = 0
+        self._segment_opened = 0.0
+        self._last_fsync = 0.0
+        os.makedirs(directory, exist_ok=True)
+        # Sequence numbers carry on from earlier runs, so a segment opened within the same
+        # second as an existing one still sorts after it (tail_events relies on the order)
+        existing = segment_paths(directory)
+        self._sequence = int(os.path.basename(existing[-1])[:-len(".jsonl")].rsplit("-", 1)[1]) + 1 if existing else 0
+        self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+        _open_logs.add(self)
+
+    def append(self, ts, camera, employee, status, **extra):
+        # employee: employee id, or a track id when the person is not identified
+        event = {"ts": ts, "camera": camera, "employee": employee, "status": status}
+        if extra:
+            event.update(extra)
+        self.log(event)
+
+    def log(self, event):
+        if self._closing or len(self._pending) >= self.max_pending:
+            # Writer is far behind or shutting down; never block the caller
+            self.dropped += 1
+            return
+        self._pending.append(event)
+        self.queued += 1
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            closing = self._closing
+            self._write_pending()
+            if closing:
+                break
+        if self._file:
+            self._sync(force=True)
+            self._file.close()
+            self._file = None
+
+    def _write_pending(self):
+        while self._pending:
+            batch = []
+            while self._pending and len(batch) < self.batch_size:
+                batch.append(self._pending.popleft())
+            data = "".join(json.dumps(event, separators=(",", ":")) + "\n" for event in batch).encode("utf-8")
+            self._segment_for(len(data)).write(data)
+            self._segment_bytes += len(data)
+            self.written += len(batch)
+            self._file.flush()
+            self._sync()
+
+    def _segment_for(self, size):
+        now = time.time()
+        if self._file and (self._segment_bytes + size > self.max_segment_bytes
+                           or now - self._segment_opened >= self.max_segment_age):
+            self._sync(force=True)
+            self._file.close()
+            self._file = None
+        if self._file is None:
+            name = time.strftime("events-%Y%m%d-%H%M%S", time.localtime(now)) + f"-{self._sequence:04d}.jsonl"
+            self._sequence += 1
+            self._file = open(os.path.join(self.directory, name), "ab")
+            self._segment_bytes = 0
+            self._segment_opened = now
+            self.segments += 1
+        return self._file
+
+    def _sync(self, force=False):
+        if self.fsync == "never" and not force:
+            return
+        now = time.time()
+        if force or self.fsync == "always" or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    def flush(self, timeout=5.0):
+        # Wait until everything queued so far has been written out (or timeout)
+        target = self.queued
+        deadline = time.time() + timeout
+        self._wake.set()
+        while self.written < target and self._thread.is_alive() and time.time() < deadline:
+            time.sleep(0.005)
+
+    def close(self, timeout=5.0):
+        if self._closing:
+            return
+        self._closing = True
+        self._wake.set()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+
+def segment_paths(directory=DEFAULT_LOG_DIR):
+    # Segments in write order (names sort by open time, then sequence)
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(n for n in os.listdir(directory) if n.startswith("events-") and n.endswith(".jsonl"))
+    return [os.path.join(directory, n) for n in names]
+
+def read_events(directory=DEFAULT_LOG_DIR, start=None, end=None):
+    # Iterate logged events, optionally restricted to start <= ts < end
+    for path in segment_paths(directory):
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Partial line from an interrupted write
+                    break
+                event = json.loads(line)
+                if start is not None and event["ts"] < start:
+                    continue
+                if end is not None and event["ts"] >= end:
+                    continue
+                yield event
+
+def tail_events(directory=DEFAULT_LOG_DIR, cursor=None):
+    # Events appended after cursor, as (event, cursor) pairs. A cursor is the (segment
+    # name, byte offset) just past an event; segments before it are never opened.
+    name, offset = cursor if cursor is not None else ("", 0)
+    for path in segment_paths(directory):
+        segment = os.path.basename(path)
+        if segment < name:
+            continue
+        with open(path, "rb") as f:
+            if segment == name:
+                f.seek(offset)
+            position = f.tell()
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Partial line from a write in progress; picked up next time
+                    break
+                position += len(line)
+                yield json.loads(line), (segment, position)
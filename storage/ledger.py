@@ -0,0 +1,119 @@
+import threading
+import time
+import numpy as np
+
+STATUSES = ("WORKING", "IDLE", "SLEEPING", "EATING", "WALKING")
+
+class StatusLedger:
+    # Current status and accumulated time per status for every employee, in arrays
+    # indexed by employee row. A status change costs O(1); totals for everyone are
+    # one vectorized expression. Widgets read from here instead of keeping their own clocks.
+    def __init__(self, statuses=STATUSES, capacity=64, clock=time.time):
+        self.statuses = list(statuses)
+        self._status_index = {s: i for i, s in enumerate(self.statuses)}
+        self.clock = clock
+        self.employees = []
+        self._rows = {}
+        self._lock = threading.Lock()
+        self.current = np.full(capacity, -1, dtype=np.int16)
+        self.since = np.zeros(capacity)
+        self.accumulated = np.zeros((capacity, len(self.statuses)))
+
+    def __len__(self):
+        return len(self.employees)
+
+    def _status_col(self, status):
+        col = self._status_index.get(status)
+        if col is None:
+            col = self._status_index[status] = len(self.statuses)
+            self.statuses.append(status)
+            self.accumulated = np.hstack([self.accumulated, np.zeros((len(self.accumulated), 1))])
+        return col
+
+    def row(self, employee):
+        # Row of employee, added on first use
+        row = self._rows.get(employee)
+        if row is None:
+            with self._lock:
+                row = self._rows.get(employee)
+                if row is None:
+                    row = len(self.employees)
+                    if row == len(self.current):
+                        self._grow(2 * row)
+                    self.employees.append(employee)
+                    self._rows[employee] = row
+        return row
+
+    def _grow(self, capacity):
+        current = np.full(capacity, -1, dtype=np.int16)
+        current[:len(self.current)] = self.current
+        since = np.zeros(capacity)
+        since[:len(self.since)] = self.since
+        accumulated = np.zeros((capacity, self.accumulated.shape[1]))
+        accumulated[:len(self.accumulated)] = self.accumulated
+        self.current, self.since, self.accumulated = current, since, accumulated
+
+    def set_status(self, employee, status, now=None):
+        # Returns True when the status changed; time in the previous status is banked
+        row = self.row(employee)
+        col = self._status_col(status)
+        previous = self.current[row]
+        if previous == col:
+            return False
+        now = self.clock() if now is None else now
+        if previous >= 0:
+            self.accumulated[row, previous] += now - self.since[row]
+        self.current[row] = col
+        self.since[row] = now
+        return True
+
+    def apply(self, changes, now=None):
+        # changes: (employee, status) pairs; returns the employees whose status changed
+        now = self.clock() if now is None else now
+        return [employee for employee, status in changes if self.set_status(employee, status, now)]
+
+    def status(self, employee):
+        row = self._rows.get(employee)
+        if row is None or self.current[row] < 0:
+            return None
+        return self.statuses[self.current[row]]
+
+    def changed_at(self, employee):
+        row = self._rows.get(employee)
+        return None if row is None else float(self.since[row])
+
+    def totals_array(self, now=None):
+        # Seconds per [employee row, status], including the time in each current status
+        now = self.clock() if now is None else now
+        count = len(self.employees)
+        totals = self.accumulated[:count].copy()
+        current = self.current[:count]
+        active = np.flatnonzero(current >= 0)
+        totals[active, current[active]] += now - self.since[active]
+        return totals
+
+    def totals(self, employee, now=None):
+        # {status: seconds} for one employee
+        row = self._rows.get(employee)
+        if row is None:
+            return {s: 0.0 for s in self.statuses}
+        totals = self.accumulated[row].copy()
+        if self.current[row] >= 0:
+            totals[self.current[row]] += (self.clock() if now is None else now) - self.since[row]
+        return dict(zip(self.statuses, totals.tolist()))
+
+    def all_totals(self, now=None):
+        # {employee: {status: seconds}} for everyone
+        totals = self.totals_array(now)
+        return {e: dict(zip(self.statuses, row)) for e, row in zip(self.employees, totals.tolist())}
+
+    def reset(self, employee, status=None, now=None):
+        # Clear an employee's accumulated time, optionally starting over in status
+        row = self.row(employee)
+        self.accumulated[row] = 0.0
+        self.current[row] = -1
+        if status is not None:
+            self.set_status(employee, status, now)
+
+# Process-wide ledger shared by the dashboard widgets
+ledger = StatusLedger()
@@ -0,0 +1,237 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from storage.event_log import _open_logs
+
+DEFAULT_DB_PATH = os.path.join("data", "worktime.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS intervals (
+    id INTEGER PRIMARY KEY,
+    employee_id TEXT NOT NULL,
+    camera INTEGER,
+    status TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    end_ts REAL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS intervals_employee_start ON intervals (employee_id, start_ts);
+CREATE INDEX IF NOT EXISTS intervals_open ON intervals (employee_id, start_ts) WHERE end_ts IS NULL;
+CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value REAL);
+"""
+
+# Rows overlapping [start, end) for one employee (?5: the longest closed interval).
+# Only closed rows starting at most max_duration before the window can reach into it,
+# so the index range scan starts there; open rows come from their own partial index.
+# Nothing assumes an employee's intervals never overlap (bulk imports may).
+WINDOW = """
+SELECT employee_id, camera, status, start_ts, end_ts FROM intervals
+WHERE employee_id = ?1 AND start_ts >= ?2 - ?5 AND start_ts < ?3 AND COALESCE(end_ts, ?4) > ?2
+UNION ALL
+SELECT employee_id, camera, status, start_ts, end_ts FROM intervals INDEXED BY intervals_open
+WHERE employee_id = ?1 AND end_ts IS NULL AND start_ts < ?2 - ?5 AND ?4 > ?2
+"""
+
+RANGE_QUERY = f"SELECT * FROM ({WINDOW}) ORDER BY start_ts"
+
+TOTALS_QUERY = f"""
+SELECT status, SUM(MIN(COALESCE(end_ts, ?4), ?3) - MAX(start_ts, ?2)) FROM ({WINDOW})
+GROUP BY status
+"""
+
+# store_meta keeps running maxima: max_duration (longest closed interval) and last_ts
+# (newest timestamp written)
+NOTE_MAX = """
+INSERT INTO store_meta (key, value) VALUES (?, ?)
+ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)
+"""
+
+def connect(path, readonly=False):
+    db = sqlite3.connect(path, timeout=30.0, cached_statements=256, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    # WAL makes NORMAL safe against corruption; at worst the last commits are lost on power failure
+    db.execute("PRAGMA synchronous=NORMAL")
+    if readonly:
+        db.execute("PRAGMA query_only=ON")
+    return db
+
+class SQLiteStore:
+    # Status intervals in SQLite, one row per (employee, status, start_ts, end_ts).
+    # Takes the same append() calls as EventLog: each status change opens a row for
+    # the employee and closes the previous one (a None status only closes it). Only the background writer thread
+    # touches the database for writes, committing queued changes in one transaction
+    # per batch (bulk imports from add_intervals go through the same queue); queries
+    # use their own per-thread connections and run concurrently (WAL).
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=5000, flush_interval=0.5, max_pending=100000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self._pending = deque()
+        self._wake = threading.Event()
+        self._closing = False
+        self._readers = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        db = connect(path)
+        db.executescript(SCHEMA)
+        db.commit()
+        self._db = db
+        meta = dict(db.execute("SELECT key, value FROM store_meta"))
+        self.max_duration = meta.get("max_duration", 0.0)
+        # Rows left open by a run that did not close() (a crash) end at the last timestamp
+        # the store had written, not whenever that employee next changes status
+        if "last_ts" in meta:
+            self._close_open(meta["last_ts"])
+        # employee -> start_ts of the open interval
+        self._open = {}
+        self._thread = threading.Thread(target=self._run, name="sqlite-store", daemon=True)
+        self._thread.start()
+        _open_logs.add(self)
+
+    def append(self, ts, camera, employee, status, **extra):
+        self.log({"ts": ts, "camera": camera, "employee": employee, "status": status, **extra})
+
+    def log(self, event):
+        if self._closing or len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending.append(event)
+        self.queued += 1
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            closing = self._closing
+            self._write_pending()
+            if closing:
+                break
+        self._close_open(self._closed_at)
+        self._db.close()
+
+    def _close_open(self, ts):
+        # End every open row at ts (never before its start)
+        with self._db:
+            longest = self._db.execute("SELECT MAX(?1 - start_ts) FROM intervals WHERE end_ts IS NULL",
+                                       (ts,)).fetchone()[0]
+            self._db.execute("UPDATE intervals SET end_ts = MAX(start_ts, ?1) WHERE end_ts IS NULL", (ts,))
+            if longest is not None:
+                self._db.executemany(NOTE_MAX, [("max_duration", max(longest, 0.0)), ("last_ts", ts)])
+        if longest is not None:
+            self.max_duration = max(self.max_duration, longest)
+
+    def _write_pending(self):
+        while self._pending:
+            if isinstance(self._pending[0], list):
+                # Bulk rows from add_intervals, one transaction each
+                rows = self._pending.popleft()
+                longest = max((end - start for _, _, _, start, end in rows), default=0.0)
+                with self._db:
+                    self._db.executemany("INSERT INTO intervals (employee_id, camera, status, start_ts, end_ts) "
+                                         "VALUES (?, ?, ?, ?, ?)", rows)
+                    self._db.executemany(NOTE_MAX, [("max_duration", longest),
+                                                    ("last_ts", max(end for *_, end in rows))])
+                self.max_duration = max(self.max_duration, longest)
+                self.written += len(rows)
+                continue
+            inserts = []
+            closes = []
+            # employee -> index in inserts of the row opened in this batch
+            opened = {}
+            latest = None
+            count = 0
+            while self._pending and count < self.batch_size and not isinstance(self._pending[0], list):
+                event = dict(self._pending.popleft())
+                count += 1
+                employee = str(event.pop("employee"))
+                ts = event.pop("ts")
+                latest = ts if latest is None else max(latest, ts)
+                if employee in opened:
+                    inserts[opened.pop(employee)][4] = ts
+                elif employee in self._open:
+                    closes.append((ts, employee, self._open[employee]))
+                camera, status = event.pop("camera", None), event.pop("status")
+                if status is None:
+                    self._open.pop(employee, None)
+                    continue
+                self._open[employee] = ts
+                opened[employee] = len(inserts)
+                inserts.append([employee, camera, status, ts, None,
+                                json.dumps(event, separators=(",", ":")) if event else None])
+            longest = max([ts - start for ts, _, start in closes] +
+                          [row[4] - row[3] for row in inserts if row[4] is not None], default=0.0)
+            with self._db:
+                self._db.executemany("UPDATE intervals SET end_ts = ?1 WHERE employee_id = ?2 AND start_ts = ?3 "
+                                     "AND end_ts IS NULL", closes)
+                self._db.executemany("INSERT INTO intervals (employee_id, camera, status, start_ts, end_ts, extra) "
+                                     "VALUES (?, ?, ?, ?, ?, ?)", inserts)
+                self._db.executemany(NOTE_MAX, [("max_duration", longest), ("last_ts", latest)])
+            self.max_duration = max(self.max_duration, longest)
+            self.written += count
+
+    def add_intervals(self, rows, wait=True):
+        # Bulk import of closed intervals (employee, camera, status, start_ts, end_ts), e.g.
+        # an offline analysis timeline. The writer thread inserts them in one transaction;
+        # wait=False returns once they are queued (flush() waits for them).
+        rows = [(str(e), c, s, start, end) for e, c, s, start, end in rows]
+        if not rows:
+            return
+        if self._closing:
+            self.dropped += len(rows)
+            return
+        # Bulk rows are never dropped; the caller waits while max_pending rows are queued
+        while self.queued - self.written >= self.max_pending and self._thread.is_alive():
+            self._wake.set()
+            time.sleep(0.005)
+        self._pending.append(rows)
+        self.queued += len(rows)
+        self._wake.set()
+        if wait:
+            self.flush(timeout=None)
+
+    def _reader(self):
+        db = getattr(self._readers, "db", None)
+        if db is None:
+            db = self._readers.db = connect(self.path, readonly=True)
+        return db
+
+    def intervals(self, employee, start, end, now=None):
+        # [(employee, camera, status, start_ts, end_ts)] overlapping [start, end); end_ts is None while
+        # open (open rows count as running until now)
+        now = time.time() if now is None else now
+        return self._reader().execute(RANGE_QUERY, (str(employee), start, end, now, self.max_duration)).fetchall()
+
+    def status_times(self, employee, start, end, now=None):
+        # {status: seconds} within [start, end); open intervals count up to now
+        now = time.time() if now is None else now
+        return dict(self._reader().execute(TOTALS_QUERY,
+                                           (str(employee), start, end, now, self.max_duration)).fetchall())
+
+    def employees(self):
+        return [row[0] for row in self._reader().execute("SELECT DISTINCT employee_id FROM intervals")]
+
+    def flush(self, timeout=5.0):
+        # timeout=None waits for as long as the writer is alive
+        target = self.queued
+        deadline = None if timeout is None else time.time() + timeout
+        self._wake.set()
+        while self.written < target and self._thread.is_alive() and (deadline is None or time.time() < deadline):
+            time.sleep(0.005)
+
+    def close(self, timeout=5.0, now=None):
+        # Writes what is queued, then ends every open interval at now (default: the wall clock)
+        if self._closing:
+            return
+        self._closed_at = time.time() if now is None else now
+        self._closing = True
+        self._wake.set()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
@@ -0,0 +1,92 @@
+import unittest
+from types import SimpleNamespace
+import numpy as np
+from detection.activity import ActivityClassifier, desk_status, desk_track
+
+SIZE = 60
+
+def frame(boxes, chewing=False):
+    # Flat background with a bright square per face; chewing flickers a patch just below them
+    image = np.full((240, 320), 100, dtype=np.uint8)
+    for x, y, w, h in boxes:
+        image[y:y + h, x:x + w] = 180
+        if chewing:
+            image[y + h:y + h + h // 3, x:x + w] = 40 if chewing % 2 else 220
+    return image
+
+def run(classifier, boxes_per_frame, eyes_closed=None, chewing=False, keys=(1,)):
+    activities = []
+    for i, boxes in enumerate(boxes_per_frame):
+        activities = classifier.update(frame(boxes, chewing and i + 1), list(keys), boxes, eyes_closed=eyes_closed)
+    return activities
+
+def still(count, x=100):
+    return [[(x, 40, SIZE, SIZE)]] * count
+
+def walking(count, step=6):
+    return [[(10 + step * i, 40, SIZE, SIZE)] for i in range(count)]
+
+class ActivityClassifierTest(unittest.TestCase):
+    def setUp(self):
+        self.classifier = ActivityClassifier(window=30)
+
+    def test_still_face_is_working(self):
+        self.assertEqual(run(self.classifier, still(40)), ["WORKING"])
+
+    def test_moving_face_is_walking(self):
+        self.assertEqual(run(self.classifier, walking(30)), ["WALKING"])
+
+    def test_approaching_face_is_walking(self):
+        growing = [[(100, 40, 40 + 2 * i, 40 + 2 * i)] for i in range(30)]
+        self.assertEqual(run(self.classifier, growing), ["WALKING"])
+
+    def test_nothing_is_decided_before_min_fill(self):
+        boxes = walking(15)
+        self.assertEqual(run(self.classifier, boxes[:14]), ["WORKING"])
+        self.assertEqual(run(self.classifier, boxes[14:]), ["WALKING"])
+
+    def test_mouth_motion_under_a_still_head_is_eating(self):
+        self.assertEqual(run(self.classifier, still(30), chewing=True), ["EATING"])
+
+    def test_sleeping_needs_eyes_closed_long_enough(self):
+        self.assertEqual(run(self.classifier, still(30), eyes_closed=[4.9]), ["WORKING"])
+        self.assertEqual(run(self.classifier, still(1), eyes_closed=[5.0]), ["SLEEPING"])
+
+    def test_walking_wins_over_eyes_closed(self):
+        self.assertEqual(run(self.classifier, walking(30), eyes_closed=[10.0]), ["WALKING"])
+
+    def test_tracks_are_classified_independently(self):
+        boxes = [[(10 + 6 * i, 40, SIZE, SIZE), (200, 150, SIZE, SIZE)] for i in range(30)]
+        self.assertEqual(run(self.classifier, boxes, keys=("a", "b")), ["WALKING", "WORKING"])
+
+    def test_dropped_keys_start_over(self):
+        run(self.classifier, walking(30))
+        self.classifier.update(frame([]), [], [])
+        # Slot reused for another key: no history carried over
+        self.assertEqual(run(self.classifier, walking(5), keys=(2,)), ["WORKING"])
+        self.assertEqual(len(self.classifier._keys), 1)
+
+    def test_more_tracks_than_capacity(self):
+        classifier = ActivityClassifier(window=30, capacity=2)
+        boxes = [[(10 + 60 * k, 40, 40, 40) for k in range(5)]] * 20
+        self.assertEqual(run(classifier, boxes, keys=range(5)), ["WORKING"] * 5)
+
+    def test_classify_sets_track_activity(self):
+        tracks = [SimpleNamespace(id=1, box=(100, 40, SIZE, SIZE), eyes_closed=6.0, activity=None)]
+        for _ in range(20):
+            result = self.classifier.classify(frame([tracks[0].box]), tracks)
+        self.assertEqual(result, {1: "SLEEPING"})
+        self.assertEqual(tracks[0].activity, "SLEEPING")
+
+class DeskTest(unittest.TestCase):
+    def test_largest_face_sets_the_desk_status(self):
+        small = SimpleNamespace(box=(0, 0, 40, 40), activity="WALKING")
+        large = SimpleNamespace(box=(100, 0, 80, 80), activity=None)
+        self.assertIs(desk_track([small, large]), large)
+        self.assertEqual(desk_status([small, large]), "WORKING")
+        large.activity = "EATING"
+        self.assertEqual(desk_status([small, large]), "EATING")
+        self.assertEqual(desk_status([]), "IDLE")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import random
+import tempfile
+import unittest
+import numpy as np
+from storage.columnar import ColumnarTimeline, ColumnarWriter, export_sqlite
+from storage.sqlite_store import SQLiteStore
+
+STATUSES = ("WORKING", "IDLE", "EATING")
+
+def random_rows(seed, count, span=10000.0):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        start = rng.uniform(0.0, span)
+        rows.append((rng.randrange(5), rng.randrange(2), rng.choice(STATUSES), start,
+                     start + rng.expovariate(1 / 120.0)))
+    return rows
+
+def brute_force(rows, start, end):
+    totals = {}
+    for employee, _, status, s, e in rows:
+        overlap = min(e, end) - max(s, start)
+        if overlap > 0:
+            key = (employee, status)
+            totals[key] = totals.get(key, 0.0) + overlap
+    return totals
+
+class ColumnarTimelineTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self._tmp.name, "timeline")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def assertMatchesBruteForce(self, rows, timeline):
+        rng = random.Random(1)
+        for _ in range(50):
+            start = rng.uniform(-500.0, 10500.0)
+            end = start + rng.choice([1.0, 60.0, 3600.0, 20000.0])
+            expected = brute_force(rows, start, end)
+            totals = timeline.status_times(start, end)
+            for e, employee in enumerate(timeline.employees):
+                for s, status in enumerate(timeline.statuses):
+                    self.assertAlmostEqual(totals[e, s], expected.get((employee, status), 0.0), places=6)
+            self.assertAlmostEqual(totals.sum(), sum(expected.values()), places=6)
+
+    def test_status_times_match_brute_force(self):
+        rows = sorted(random_rows(0, 2000), key=lambda row: row[3])
+        with ColumnarWriter(self.directory, buffer_rows=300) as writer:
+            writer.extend(rows)
+        timeline = ColumnarTimeline(self.directory)
+        self.assertTrue(timeline.sorted)
+        self.assertEqual(len(timeline), 2000)
+        self.assertMatchesBruteForce(rows, timeline)
+
+    def test_unsorted_appends_fall_back_to_a_scan(self):
+        rows = random_rows(2, 1000)
+        with ColumnarWriter(self.directory, buffer_rows=128) as writer:
+            for row in rows:
+                writer.append(*row)
+        timeline = ColumnarTimeline(self.directory)
+        self.assertFalse(timeline.sorted)
+        self.assertMatchesBruteForce(rows, timeline)
+
+    def test_employee_status_times(self):
+        rows = random_rows(3, 500)
+        with ColumnarWriter(self.directory) as writer:
+            writer.extend(rows)
+        timeline = ColumnarTimeline(self.directory)
+        expected = brute_force(rows, 2000.0, 5000.0)
+        times = timeline.employee_status_times(4, 2000.0, 5000.0)
+        for status in STATUSES:
+            self.assertAlmostEqual(times[status], expected.get((4, status), 0.0), places=6)
+        self.assertEqual(timeline.employee_status_times("nobody", 0.0, 1.0), {s: 0.0 for s in timeline.statuses})
+
+    def test_reopened_writer_appends_and_drops_partial_rows(self):
+        with ColumnarWriter(self.directory) as writer:
+            writer.append(1, 0, "WORKING", 0.0, 100.0)
+        # A flush that died after writing column bytes but before meta.json
+        with open(os.path.join(self.directory, "start.bin"), "ab") as f:
+            f.write(np.float64(5.0).tobytes())
+        with ColumnarWriter(self.directory) as writer:
+            writer.append(2, 0, "IDLE", 50.0, 80.0)
+        timeline = ColumnarTimeline(self.directory)
+        self.assertEqual(len(timeline), 2)
+        self.assertEqual(timeline.totals(0.0, 100.0), {1: {"WORKING": 100.0, "IDLE": 0.0},
+                                                      2: {"WORKING": 0.0, "IDLE": 30.0}})
+
+    def test_export_sqlite_copies_closed_intervals(self):
+        db = os.path.join(self._tmp.name, "worktime.db")
+        store = SQLiteStore(db)
+        store.add_intervals([(1, 0, "WORKING", 0.0, 60.0), (2, 1, "IDLE", 30.0, 90.0)])
+        store.append(100.0, 0, 1, "EATING")
+        store.close(now=120.0)
+        export_sqlite(db, self.directory, since=10.0)
+        timeline = ColumnarTimeline(self.directory)
+        self.assertEqual(len(timeline), 2)
+        self.assertEqual(timeline.totals(0.0, 200.0), {"2": {"IDLE": 60.0, "EATING": 0.0},
+                                                      "1": {"IDLE": 0.0, "EATING": 20.0}})
+
+if __name__ == "__main__":
+    unittest.main()
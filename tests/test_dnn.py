@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from detection.face_detector import FaceDetector
+from detection.models import DnnModel, ModelRegistry
+
+# Weight-free stand-in for an SSD face model: the network averages the input over its
+# four quadrants and feeds those means straight into DetectionOutput. The box is always
+# the centre half of the frame (the single prior); its confidence is
+# sigmoid((G top-right - G top-left) / 100) after mean subtraction.
+PROTOTXT = """\
+name: "fake"
+input: "data"
+input_shape { dim: 1 dim: 3 dim: 300 dim: 300 }
+layer { name: "pool" type: "Pooling" bottom: "data" top: "pool" pooling_param { pool: AVE kernel_size: 150 stride: 150 } }
+layer { name: "scale" type: "Power" bottom: "pool" top: "scaled" power_param { scale: 0.01 } }
+layer { name: "flat" type: "Flatten" bottom: "scaled" top: "flat" }
+layer { name: "slice" type: "Slice" bottom: "flat" top: "loc" top: "conf" top: "rest" slice_param { axis: 1 slice_point: 4 slice_point: 6 } }
+layer { name: "pool1" type: "Pooling" bottom: "data" top: "feat" pooling_param { pool: AVE kernel_size: 300 stride: 300 } }
+layer { name: "prior" type: "PriorBox" bottom: "feat" bottom: "data" top: "prior"
+  prior_box_param { min_size: 150 flip: false clip: false variance: 0.1 variance: 0.1 variance: 0.2 variance: 0.2 offset: 0.5 } }
+layer { name: "reshape" type: "Reshape" bottom: "conf" top: "conf_r" reshape_param { shape { dim: 0 dim: -1 dim: 2 } } }
+layer { name: "softmax" type: "Softmax" bottom: "conf_r" top: "conf_s" softmax_param { axis: 2 } }
+layer { name: "cflat" type: "Flatten" bottom: "conf_s" top: "conf_f" }
+layer { name: "detection_out" type: "DetectionOutput" bottom: "loc" bottom: "conf_f" bottom: "prior" top: "detection_out"
+  detection_output_param { num_classes: 2 share_location: true background_label_id: 0
+    nms_param { nms_threshold: 0.45 top_k: 400 } code_type: CENTER_SIZE keep_top_k: 200 confidence_threshold: 0.01 } }
+"""
+# A serialized NetParameter with only its name set ("fake"): the layers have no weights
+CAFFEMODEL = b"\n\x04fake"
+
+def frame(h, w, face=True):
+    image = np.empty((h, w, 3), dtype=np.uint8)
+    image[:] = (104, 177, 123)
+    image[:h // 2, :w // 2, 1] = 0 if face else 255
+    image[:h // 2, w // 2:, 1] = 255 if face else 0
+    return image
+
+class DnnModelTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls._tmp.name, "fake.caffemodel")
+        with open(cls.path, "wb") as f:
+            f.write(CAFFEMODEL)
+        with open(os.path.join(cls._tmp.name, "deploy.prototxt"), "w") as f:
+            f.write(PROTOTXT)
+        cls.model = DnnModel(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    def test_boxes_in_frame_pixels(self):
+        self.assertEqual(self.model.detect(frame(300, 300), (24, 24)).tolist(), [[75, 75, 150, 150]])
+        self.assertEqual(self.model.detect(frame(300, 300, face=False), (24, 24)).tolist(), [])
+
+    def test_batch_keeps_each_frame_apart(self):
+        results = self.model.detect_batch([frame(300, 300), frame(300, 300, face=False), frame(400, 600)], (24, 24))
+        self.assertEqual([r.tolist() for r in results], [[[75, 75, 150, 150]], [], [[150, 100, 300, 200]]])
+
+    def test_confidence_and_min_size(self):
+        # The face frame scores about 0.93
+        self.assertEqual(len(self.model.detect(frame(300, 300), (24, 24), confidence=0.95)), 0)
+        self.assertEqual(len(self.model.detect(frame(300, 300), (151, 24))), 0)
+
+    def test_missing_files(self):
+        with self.assertRaises(FileNotFoundError):
+            DnnModel(os.path.join(self._tmp.name, "missing.caffemodel"))
+        with tempfile.TemporaryDirectory() as directory:
+            lone = os.path.join(directory, "lone.caffemodel")
+            with open(lone, "wb") as f:
+                f.write(CAFFEMODEL)
+            with self.assertRaises(FileNotFoundError):
+                DnnModel(lone)
+
+    def test_face_detector_batches_through_the_registry(self):
+        detector = FaceDetector(backend="dnn", model_path=self.path, models=ModelRegistry())
+        self.assertTrue(detector.batched)
+        found, faces = detector.detect(frame(480, 640), bgr=True)
+        self.assertTrue(found)
+        self.assertEqual(faces.tolist(), [[160, 120, 320, 240]])
+        results = detector.detect_batch([frame(300, 300, face=False), frame(300, 300)], bgr=True)
+        self.assertEqual([(found, faces.tolist()) for found, faces in results],
+                         [(False, []), (True, [[75, 75, 150, 150]])])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import unittest
+import cv2
+import numpy as np
+from detection.drowsiness import EyeStateChecker
+from detection.face_detector import FaceDetector
+from detection.tracker import Track
+
+PUBLIC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "public")
+
+class FakeCascade:
+    # Finds an eye whenever open is set; records the bands it was given
+    def __init__(self):
+        self.open = True
+        self.bands = []
+
+    def detect(self, band, min_size, **params):
+        self.bands.append(band.shape)
+        return np.array([[10, 10, 30, 30]]) if self.open else np.zeros((0, 4))
+
+class FakeModels:
+    def __init__(self):
+        self.cascade = FakeCascade()
+
+    def get(self, backend, path=None):
+        return self.cascade
+
+FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+
+def track(track_id=1, box=(100, 100, 100, 100)):
+    return Track(track_id, box)
+
+class EyeStateCheckerTest(unittest.TestCase):
+    def setUp(self):
+        self.models = FakeModels()
+        self.cascade = self.models.cascade
+        self.checker = EyeStateChecker(every=1, models=self.models)
+
+    def sample(self, tracks, now, open=True, **kwargs):
+        self.cascade.open = open
+        for t in tracks:
+            t.age += 1
+        return self.checker.check(FRAME, tracks, now, bgr=True, **kwargs)
+
+    def test_closed_only_after_eyes_were_seen_open(self):
+        t = track()
+        self.sample([t], 0.0, open=False)
+        self.assertIsNone(t.eyes_open)
+        self.sample([t], 1.0)
+        self.sample([t], 2.0, open=False)
+        # Seen open only once: a miss is not taken as closed yet
+        self.assertEqual((t.eyes_open, t.eyes_closed), (True, 0.0))
+        self.sample([t], 3.0)
+        self.sample([t], 4.0, open=False)
+        self.sample([t], 6.5, open=False)
+        self.assertEqual((t.eyes_open, t.eyes_closed), (False, 2.5))
+        self.sample([t], 7.0)
+        self.assertEqual((t.eyes_open, t.eyes_closed), (True, 0.0))
+
+    def test_closed_time_advances_between_samples(self):
+        checker = EyeStateChecker(every=5, models=self.models)
+        t = track()
+        t.eyes_seen, t.eyes_closed_since = 2, 10.0
+        t.eyes_checked_at = t.age = 7
+        self.assertEqual(checker.check(FRAME, [t], 12.0, bgr=True), [])
+        self.assertEqual(t.eyes_closed, 2.0)
+
+    def test_samples_every_n_frames_and_per_frame_limit(self):
+        checker = EyeStateChecker(every=3, per_frame=2, models=self.models)
+        tracks = [track(i) for i in range(3)]
+        checked = []
+        for frame in range(6):
+            for t in tracks:
+                t.age = frame
+            checked.append([t.id for t in checker.check(FRAME, tracks, float(frame), bgr=True)])
+        # At most two per frame; the track waiting longest goes first
+        self.assertEqual(checked, [[0, 1], [2], [], [0, 1], [2], []])
+
+    def test_missed_tracks_are_not_sampled(self):
+        t = track()
+        t.misses = 1
+        self.assertEqual(self.sample([t], 0.0), [])
+
+    def test_band_is_cut_from_the_detector_gray_and_resized(self):
+        gray = np.zeros((240, 320), dtype=np.uint8)
+        self.sample([track(box=(100, 100, 100, 100))], 0.0, gray=(gray, 0.5))
+        # Eye band of a 50px face in the half-size gray frame, scaled to face_width 200
+        self.assertEqual(self.cascade.bands, [(92, 160)])
+
+    def test_faces_cut_off_by_the_frame_edge_are_skipped(self):
+        t = track(box=(600, 100, 100, 100))
+        self.assertEqual(self.sample([t], 0.0), [t])
+        self.assertEqual(self.cascade.bands, [])
+        self.assertEqual(t.eyes_checked_at, t.age)
+
+class EyeCascadeTest(unittest.TestCase):
+    def test_open_and_covered_eyes(self):
+        image = cv2.imread(os.path.join(PUBLIC, "Office Monitoring.png"))
+        faces = FaceDetector(min_neighbors=6).detect(image, bgr=True)[1]
+        x, y, w, h = max(faces, key=lambda box: box[2] * box[3])
+        covered = image.copy()
+        covered[int(y + 0.15 * h):int(y + 0.6 * h), int(x + 0.1 * w):int(x + 0.9 * w)] = \
+            cv2.mean(image[y:y + h, x:x + w])[:3]
+        checker = EyeStateChecker(every=1)
+        t = track(box=(x, y, w, h))
+        for i, frame in enumerate([image, image, covered, covered]):
+            t.age += 1
+            checker.check(frame, [t], float(i), bgr=True)
+        self.assertEqual(t.eyes_seen, 2)
+        self.assertEqual((t.eyes_open, t.eyes_closed), (False, 1.0))
+
+if __name__ == "__main__":
+    unittest.main()
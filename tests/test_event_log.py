@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from storage.event_log import EventLog, read_events, segment_paths, tail_events
+
+class EventLogTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, count, first=0, **options):
+        log = EventLog(self.directory, fsync="never", **options)
+        for i in range(first, first + count):
+            log.append(float(i), 0, i % 3, "WORKING" if i % 2 else "IDLE", track=i)
+        log.close()
+        return log
+
+    def test_round_trip(self):
+        log = self.write(10)
+        self.assertEqual((log.written, log.dropped), (10, 0))
+        events = list(read_events(self.directory))
+        self.assertEqual([e["ts"] for e in events], [float(i) for i in range(10)])
+        self.assertEqual(events[3], {"ts": 3.0, "camera": 0, "employee": 0, "status": "WORKING", "track": 3})
+        self.assertEqual([e["ts"] for e in read_events(self.directory, start=2.0, end=5.0)], [2.0, 3.0, 4.0])
+
+    def test_rotates_by_size_and_keeps_order(self):
+        log = self.write(200, batch_size=10, max_segment_bytes=1024)
+        self.assertGreater(log.segments, 1)
+        self.assertEqual(len(segment_paths(self.directory)), log.segments)
+        self.assertTrue(all(os.path.getsize(p) <= 1024 for p in segment_paths(self.directory)))
+        self.assertEqual([e["ts"] for e in read_events(self.directory)], [float(i) for i in range(200)])
+
+    def test_tail_resumes_from_cursor(self):
+        self.write(50, batch_size=10, max_segment_bytes=1024)
+        cursor = None
+        for event, cursor in tail_events(self.directory):
+            if event["ts"] == 29.0:
+                break
+        self.write(50, first=50, batch_size=10, max_segment_bytes=1024)
+        self.assertEqual([e["ts"] for e, _ in tail_events(self.directory, cursor)], [float(i) for i in range(30, 100)])
+
+    def test_partial_line_waits_for_the_rest(self):
+        self.write(3)
+        path = segment_paths(self.directory)[-1]
+        with open(path, "ab") as f:
+            f.write(b'{"ts": 3.0, "camera": 0, "emp')
+        events = list(tail_events(self.directory))
+        self.assertEqual(len(events), 3)
+        with open(path, "ab") as f:
+            f.write(b'loyee": 1, "status": "IDLE"}\n')
+        self.assertEqual([e["ts"] for e, _ in tail_events(self.directory, events[-1][1])], [3.0])
+
+    def test_closed_log_drops_instead_of_blocking(self):
+        log = self.write(1)
+        log.append(1.0, 0, 0, "IDLE")
+        self.assertEqual(log.dropped, 1)
+
+    def test_rejects_unknown_fsync_policy(self):
+        with self.assertRaises(ValueError):
+            EventLog(self.directory, fsync="sometimes")
+
+if __name__ == "__main__":
+    unittest.main()
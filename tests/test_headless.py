@@ -0,0 +1,57 @@
+import contextlib
+import io
+import unittest
+from headless import log_and_print, run
+
+class Sink:
+    def __init__(self):
+        self.rows = []
+
+    def append(self, ts, camera, employee, status, **extra):
+        self.rows.append((ts, employee, status))
+
+def status_event(ts, status, previous, **employees):
+    return {"event": "status", "ts": ts, "camera": 0, "status": status, "previous": previous, "tracks": [1],
+            **employees}
+
+class LogAndPrintTest(unittest.TestCase):
+    def emit(self, *events):
+        sink = Sink()
+        emit = log_and_print(sink)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for event in events:
+                emit(event)
+        return sink.rows
+
+    def test_desk_key_stands_in_without_identities(self):
+        self.assertEqual(self.emit(status_event(1.0, "WORKING", None)), [(1.0, "camera:0", "WORKING")])
+
+    def test_recognized_employee_is_recorded(self):
+        rows = self.emit(status_event(1.0, "WORKING", None, employee=None, previous_employee=None),
+                         status_event(2.0, "WORKING", "WORKING", employee=7, previous_employee=None),
+                         status_event(3.0, "IDLE", "WORKING", employee=7, previous_employee=7),
+                         status_event(4.0, "WORKING", "IDLE", employee=8, previous_employee=7))
+        self.assertEqual(rows, [(1.0, "camera:0", "WORKING"), (2.0, "camera:0", "IDLE"), (2.0, 7, "WORKING"),
+                                (3.0, 7, "IDLE"), (4.0, 7, "IDLE"), (4.0, 8, "WORKING")])
+
+    def test_stopped_camera_ends_its_intervals(self):
+        rows = self.emit(status_event(1.0, "WORKING", None, employee=7, previous_employee=None),
+                         status_event(2.0, "WORKING", "WORKING", employee=8, previous_employee=7),
+                         {"event": "stopped", "ts": 5.0, "camera": 0, "reason": "End of stream"},
+                         {"event": "stopped", "ts": 6.0, "camera": 1, "reason": "Could not open source"})
+        self.assertEqual(rows[-2:], [(5.0, 7, None), (5.0, 8, None)])
+        self.assertEqual(len(rows), 5)
+
+    def test_stopped_camera_leaves_employees_seen_elsewhere(self):
+        first = status_event(1.0, "WORKING", None, employee=7, previous_employee=None)
+        moved = dict(status_event(2.0, "WORKING", None, employee=7, previous_employee=None), camera=1)
+        rows = self.emit(first, moved, {"event": "stopped", "ts": 5.0, "camera": 0, "reason": "End of stream"})
+        self.assertEqual(rows, [(1.0, 7, "WORKING"), (2.0, 7, "WORKING")])
+
+class RunTest(unittest.TestCase):
+    def test_pool_workers_need_batching(self):
+        with self.assertRaises(ValueError):
+            run(["missing.avi"], batch=False, pool_workers=2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import glob
+import os
+import unittest
+import cv2
+import numpy as np
+from detection.face_detector import FaceDetector
+from detection.identity import IdentityIndex, LbpEmbedder, Recognizer
+
+PUBLIC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "public")
+
+def unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+class MatchTest(unittest.TestCase):
+    def test_single_enrollee_needs_threshold_plus_margin(self):
+        index = IdentityIndex(2)
+        index.add(1, "Alice", [unit([1.0, 0.0])])
+        angle = lambda score: unit([score, np.sqrt(1 - score ** 2)])
+        close, clear = index.match([angle(0.87), angle(0.9)], threshold=0.86, margin=0.02)
+        self.assertIsNone(close.employee)
+        self.assertEqual(clear.employee, 1)
+
+    def test_runner_up_within_margin_is_rejected(self):
+        index = IdentityIndex(2)
+        index.add(1, "Alice", [unit([1.0, 0.0])])
+        index.add(2, "Bob", [unit([0.0, 1.0])])
+        between, alice = index.match([unit([1.0, 0.98]), unit([1.0, 0.2])], threshold=0.5, margin=0.02)
+        self.assertIsNone(between.employee)
+        self.assertEqual(alice.employee, 1)
+
+class FaceTest(unittest.TestCase):
+    # Faces from the concept images shipped in public/
+    @classmethod
+    def setUpClass(cls):
+        detector = FaceDetector(min_neighbors=6)
+        cls.faces = []
+        for path in sorted(glob.glob(os.path.join(PUBLIC, "*.png"))):
+            image = cv2.imread(path)
+            cls.faces.extend((image, tuple(box)) for box in detector.detect(image, bgr=True)[1])
+        cls.embedder = LbpEmbedder()
+
+    def embed(self, face, shift=0, gain=1.0):
+        image, (x, y, w, h) = face
+        image = np.clip(image.astype(np.float32) * gain, 0, 255).astype(np.uint8)
+        return self.embedder.embed(image, [(x + shift, y + shift, w, h)], bgr=True)[0]
+
+    def test_two_identities(self):
+        self.assertGreaterEqual(len(self.faces), 3)
+        alice, bob, stranger = self.faces[:3]
+        index = IdentityIndex(self.embedder.dim)
+        index.add(1, "Alice", [self.embed(alice)])
+        index.add(2, "Bob", [self.embed(bob)])
+        recognizer = Recognizer(index, self.embedder)
+        queries = [self.embed(alice, shift=2, gain=1.1), self.embed(bob, shift=-2, gain=0.9), self.embed(stranger)]
+        found = index.match(queries, recognizer.threshold, recognizer.margin)
+        self.assertEqual([identity.employee for identity in found], [1, 2, None])
+
+    def test_strangers_do_not_match_a_single_enrollee(self):
+        recognizer = Recognizer(IdentityIndex(self.embedder.dim), self.embedder)
+        recognizer.index.add(1, "Alice", [self.embed(self.faces[0])])
+        others = [self.embed(face) for face in self.faces[1:]]
+        found = recognizer.index.match(others, recognizer.threshold, recognizer.margin)
+        self.assertEqual([identity.employee for identity in found], [None] * len(others))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from storage.ledger import StatusLedger
+
+class Clock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class StatusLedgerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.ledger = StatusLedger(capacity=2, clock=self.clock)
+
+    def test_banks_time_on_each_change(self):
+        self.assertTrue(self.ledger.set_status(1, "WORKING"))
+        self.clock.now = 30.0
+        self.assertFalse(self.ledger.set_status(1, "WORKING"))
+        self.assertTrue(self.ledger.set_status(1, "IDLE"))
+        self.clock.now = 50.0
+        times = self.ledger.totals(1)
+        self.assertEqual((times["WORKING"], times["IDLE"], times["SLEEPING"]), (30.0, 20.0, 0.0))
+        self.assertEqual(self.ledger.status(1), "IDLE")
+        self.assertEqual(self.ledger.changed_at(1), 30.0)
+
+    def test_all_totals_match_per_employee_totals(self):
+        # More employees than the initial capacity, and a status nobody declared
+        for employee in range(5):
+            self.ledger.set_status(employee, "WORKING", now=float(employee))
+        self.ledger.apply([(0, "IDLE"), (3, "ON_CALL"), (4, "WORKING")], now=10.0)
+        everyone = self.ledger.all_totals(now=20.0)
+        self.assertEqual(len(self.ledger), 5)
+        for employee in range(5):
+            self.assertEqual(everyone[employee], self.ledger.totals(employee, now=20.0))
+        self.assertEqual(everyone[0]["WORKING"], 10.0)
+        self.assertEqual(everyone[0]["IDLE"], 10.0)
+        self.assertEqual(everyone[3]["ON_CALL"], 10.0)
+        self.assertEqual(everyone[4]["WORKING"], 16.0)
+
+    def test_apply_returns_changed_employees(self):
+        self.ledger.set_status(1, "WORKING", now=0.0)
+        self.assertEqual(self.ledger.apply([(1, "WORKING"), (2, "IDLE")], now=5.0), [2])
+
+    def test_unknown_employee(self):
+        self.assertIsNone(self.ledger.status(9))
+        self.assertIsNone(self.ledger.changed_at(9))
+        self.assertEqual(set(self.ledger.totals(9).values()), {0.0})
+
+    def test_reset_starts_over(self):
+        self.ledger.set_status(1, "WORKING", now=0.0)
+        self.ledger.reset(1, "IDLE", now=100.0)
+        self.assertEqual(self.ledger.totals(1, now=110.0)["WORKING"], 0.0)
+        self.assertEqual(self.ledger.totals(1, now=110.0)["IDLE"], 10.0)
+        self.ledger.reset(1)
+        self.assertIsNone(self.ledger.status(1))
+        self.assertEqual(set(self.ledger.totals(1, now=200.0).values()), {0.0})
+
+if __name__ == "__main__":
+    unittest.main()
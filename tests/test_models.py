@@ -0,0 +1,133 @@
+import contextlib
+import io
+import threading
+import unittest
+import numpy as np
+from detection.face_detector import FaceDetector
+from detection.models import ModelRegistry
+
+class FakeModel:
+    color = False
+    batched = False
+
+    def __init__(self, box):
+        self.box = box
+
+    def detect(self, image, min_size, **params):
+        return np.array([self.box])
+
+    def detect_batch(self, images, min_size, **params):
+        return [self.detect(image, min_size) for image in images]
+
+    def warm_up(self):
+        pass
+
+class FakeBackend:
+    # Factory with a load counter; loads fail while failing is set and wait for release
+    def __init__(self, box):
+        self.box = box
+        self.loads = 0
+        self.failing = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, path):
+        self.loads += 1
+        self.release.wait(5.0)
+        if self.failing:
+            raise FileNotFoundError(f"no model at {path}")
+        return FakeModel(self.box)
+
+FRAME = np.zeros((120, 160, 3), dtype=np.uint8)
+
+class ModelRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.a = FakeBackend((10, 10, 30, 30))
+        self.b = FakeBackend((50, 50, 40, 40))
+        self.models = ModelRegistry({"a": self.a, "b": self.b}, {"backend": "a"})
+
+    def test_model_is_loaded_once_and_shared(self):
+        first = self.models.get("a")
+        self.assertIs(self.models.get("a"), first)
+        self.assertIs(self.models.active()[0], first)
+        self.assertEqual(self.a.loads, 1)
+        self.assertIsNot(self.models.get("a", instance=1), first)
+        self.assertEqual(self.models.loaded(), [("a", None, None), ("a", None, 1)])
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            self.models.get("c")
+        with self.assertRaises(ValueError):
+            self.models.configure(backend="c")
+
+    def test_failed_load_is_kept_until_retried(self):
+        self.a.failing = True
+        with self.assertRaises(FileNotFoundError):
+            self.models.get("a")
+        # preload() hands back the failed handle instead of loading again
+        with self.assertRaises(FileNotFoundError):
+            self.models.preload("a").wait(1.0)
+        self.assertEqual(self.a.loads, 1)
+        self.a.failing = False
+        self.assertIsNotNone(self.models.get("a").model)
+        self.assertEqual(self.a.loads, 2)
+
+    def test_active_resets_the_path_for_another_backend(self):
+        self.models.configure(path="custom.xml")
+        handle, params = self.models.active(backend="b")
+        self.assertEqual(handle.key, ("b", None, None))
+        self.assertNotIn("path", params)
+        self.assertEqual(self.models.active()[0].key, ("a", "custom.xml", None))
+
+    def test_unload_keeps_handles_in_use_working(self):
+        handle = self.models.get("a")
+        self.models.unload("a")
+        self.assertEqual(self.models.loaded(), [])
+        self.assertEqual(handle.detect(FRAME, (24, 24)).tolist(), [[10, 10, 30, 30]])
+
+class HotSwapTest(unittest.TestCase):
+    def setUp(self):
+        self.a = FakeBackend((10, 10, 30, 30))
+        self.b = FakeBackend((50, 50, 40, 40))
+        self.models = ModelRegistry({"a": self.a, "b": self.b}, {"backend": "a"})
+        self.detector = FaceDetector(models=self.models)
+
+    def boxes(self):
+        return self.detector.detect(FRAME, bgr=True)[1].tolist()
+
+    def test_detector_switches_once_the_new_model_is_ready(self):
+        self.assertEqual(self.boxes(), [[10, 10, 30, 30]])
+        self.b.release.clear()
+        handle = self.models.configure(backend="b")
+        # Still loading: frames keep going through the old model rather than waiting
+        self.assertEqual(self.boxes(), [[10, 10, 30, 30]])
+        self.b.release.set()
+        handle.wait(5.0)
+        self.assertEqual(self.boxes(), [[50, 50, 40, 40]])
+        self.assertEqual(self.detector.backend, "b")
+
+    def test_failed_swap_keeps_the_previous_model_and_can_be_retried(self):
+        self.b.failing = True
+        self.models.configure(backend="b").ready.wait(5.0)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(self.boxes(), [[10, 10, 30, 30]])
+        self.assertIn("keeping the previous model", stderr.getvalue())
+        self.b.failing = False
+        self.models.configure(backend="b").wait(5.0)
+        self.assertEqual(self.boxes(), [[50, 50, 40, 40]])
+        self.assertEqual(self.b.loads, 2)
+
+    def test_pinned_detector_ignores_swaps(self):
+        pinned = FaceDetector(backend="a", models=self.models)
+        self.models.configure(backend="b").wait(5.0)
+        self.assertEqual(pinned.detect(FRAME, bgr=True)[1].tolist(), [[10, 10, 30, 30]])
+        self.assertEqual(self.boxes(), [[50, 50, 40, 40]])
+
+    def test_first_model_failing_to_load_raises(self):
+        self.b.failing = True
+        with self.assertRaises(FileNotFoundError):
+            FaceDetector(backend="b", models=self.models)
+
+if __name__ == "__main__":
+    unittest.main()
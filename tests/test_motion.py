@@ -0,0 +1,105 @@
+import unittest
+import numpy as np
+from detection.motion import GatedDetector, MotionGate
+
+def scene(square_at=None):
+    frame = np.full((240, 320, 3), 90, dtype=np.uint8)
+    if square_at is not None:
+        x, y = square_at
+        frame[y:y + 60, x:x + 60] = 230
+    return frame
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class CountingDetector:
+    camera = "test"
+
+    def __init__(self):
+        self.calls = 0
+        self.resets = 0
+
+    def detect(self, frame, bgr=False):
+        self.calls += 1
+        return True, [(self.calls, 0, 10, 10)]
+
+    def reset(self):
+        self.resets += 1
+
+class MotionGateTest(unittest.TestCase):
+    def setUp(self):
+        self.gate = MotionGate(min_refresh=2.0, hold=1.0)
+
+    def test_static_scene_detects_only_on_refresh(self):
+        frame = scene((100, 100))
+        due = [self.gate.should_detect(frame, bgr=True, now=0.25 * i) for i in range(20)]
+        # The first frame has nothing to compare with: it counts as motion and is held
+        # for a second, after which only the 2 s refresh gets through
+        self.assertEqual([i for i, d in enumerate(due) if d], [0, 1, 2, 3, 11, 19])
+        self.assertEqual((self.gate.checked, self.gate.passed), (20, 6))
+
+    def test_motion_passes_and_holds(self):
+        still, moved = scene((100, 100)), scene((130, 100))
+        self.gate.should_detect(still, bgr=True, now=0.0)
+        self.assertFalse(self.gate.should_detect(still, bgr=True, now=1.5))
+        self.assertTrue(self.gate.should_detect(moved, bgr=True, now=1.75))
+        self.assertGreater(self.gate.changed, self.gate.min_changed)
+        # Still within hold after the motion stopped
+        self.assertTrue(self.gate.should_detect(moved, bgr=True, now=2.5))
+        self.assertFalse(self.gate.should_detect(moved, bgr=True, now=3.0))
+
+    def test_sensor_noise_is_not_motion(self):
+        rng = np.random.default_rng(0)
+        base = scene((100, 100))
+        self.gate.should_detect(base, bgr=True, now=0.0)
+        for i in range(5):
+            noisy = np.clip(base + rng.integers(-4, 5, base.shape), 0, 255).astype(np.uint8)
+            self.assertFalse(self.gate.should_detect(noisy, bgr=True, now=1.25 + 0.1 * i))
+
+    def test_reset_forces_detection(self):
+        frame = scene()
+        self.gate.should_detect(frame, bgr=True, now=0.0)
+        self.assertFalse(self.gate.should_detect(frame, bgr=True, now=1.5))
+        self.gate.reset()
+        self.assertTrue(self.gate.should_detect(frame, bgr=True, now=1.75))
+
+class GatedDetectorTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.inner = CountingDetector()
+        self.detector = GatedDetector(self.inner, MotionGate(min_refresh=2.0, hold=0.0, clock=self.clock))
+
+    def test_reuses_the_last_result_while_static(self):
+        frame = scene((100, 100))
+        results = []
+        for _ in range(5):
+            self.clock.now += 0.1
+            results.append(self.detector.detect(frame, bgr=True))
+        self.assertEqual(self.inner.calls, 1)
+        self.assertEqual(results, [results[0]] * 5)
+        self.assertEqual(self.detector.skipped, 4)
+
+    def test_batched_callers_remember_their_result(self):
+        frame = scene((100, 100))
+        self.assertTrue(self.detector.needs_detection(frame, bgr=True))
+        self.detector.remember((True, [(1, 2, 3, 4)]))
+        self.clock.now += 0.1
+        self.assertFalse(self.detector.needs_detection(frame, bgr=True))
+        self.assertEqual(self.detector.last, (True, [(1, 2, 3, 4)]))
+        self.assertEqual(self.inner.calls, 0)
+
+    def test_reset_and_delegation(self):
+        frame = scene()
+        self.detector.detect(frame, bgr=True)
+        self.detector.reset()
+        self.assertEqual(self.inner.resets, 1)
+        self.detector.detect(frame, bgr=True)
+        self.assertEqual(self.inner.calls, 2)
+        self.assertEqual(self.detector.camera, "test")
+
+if __name__ == "__main__":
+    unittest.main()
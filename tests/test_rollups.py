@@ -0,0 +1,72 @@
+import contextlib
+import io
+import os
+import tempfile
+import json
+import unittest
+from reporting import reports
+from reporting.rollups import RollupEngine, day_of
+
+# 2026-10-12 09:00 local time
+NINE = 1_791_795_600.0
+
+class SnapshotTest(unittest.TestCase):
+    def test_open_interval_survives_save_and_load(self):
+        engine = RollupEngine()
+        engine.observe(NINE, 0, "WORKING")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "rollups.npz")
+            engine.save(path)
+            engine = RollupEngine.load(path)
+        engine.observe(NINE + 3600, 0, "IDLE")
+        report = engine.daily_report(day_of(NINE))
+        self.assertEqual(list(report), [0])
+        self.assertAlmostEqual(report[0]["WORKING"], 3600.0)
+
+    def test_none_status_ends_the_open_interval(self):
+        engine = RollupEngine()
+        engine.observe_event({"ts": NINE, "camera": 0, "employee": 0, "status": "WORKING"})
+        engine.observe_event({"ts": NINE + 600, "camera": 0, "employee": 0, "status": None})
+        engine.advance(NINE + 3600)
+        self.assertAlmostEqual(engine.daily_report(day_of(NINE))[0]["WORKING"], 600.0)
+
+def write_segment(directory, name, events):
+    with open(os.path.join(directory, name), "a") as f:
+        for ts, employee, status in events:
+            f.write(json.dumps({"ts": ts, "camera": 0, "employee": employee, "status": status}) + "\n")
+
+class CatchUpTest(unittest.TestCase):
+    def test_reads_only_new_events(self):
+        with tempfile.TemporaryDirectory() as directory:
+            write_segment(directory, "events-20261012-090000-0000.jsonl", [(NINE, 0, "WORKING")])
+            write_segment(directory, "events-20261012-093000-0001.jsonl", [(NINE + 1800, 1, "WORKING")])
+            engine = RollupEngine()
+            self.assertEqual(engine.catch_up(directory), 2)
+            # Already read: neither segment may be parsed again
+            with open(os.path.join(directory, "events-20261012-090000-0000.jsonl"), "w") as f:
+                f.write("not json\n")
+            write_segment(directory, "events-20261012-093000-0001.jsonl", [(NINE + 3600, 0, "IDLE")])
+            write_segment(directory, "events-20261012-100000-0002.jsonl", [(NINE + 3600, 1, "IDLE")])
+            path = os.path.join(directory, "rollups.npz")
+            engine.save(path)
+            engine = RollupEngine.load(path)
+            self.assertEqual(engine.catch_up(directory), 2)
+            self.assertEqual(engine.catch_up(directory), 0)
+        report = engine.daily_report(day_of(NINE))
+        self.assertAlmostEqual(report[0]["WORKING"], 3600.0)
+        self.assertAlmostEqual(report[1]["WORKING"], 1800.0)
+
+class ReportTest(unittest.TestCase):
+    def test_live_report_does_not_persist_the_advance(self):
+        with tempfile.TemporaryDirectory() as directory:
+            write_segment(directory, "events-20261012-090000-0000.jsonl", [(NINE, 0, "WORKING")])
+            path = os.path.join(directory, "rollups.npz")
+            with contextlib.redirect_stdout(io.StringIO()):
+                reports.main(["--log-dir", directory, "--state", path, "--live"])
+            write_segment(directory, "events-20261012-090000-0000.jsonl", [(NINE + 3600, 0, "IDLE")])
+            engine = RollupEngine.load(path)
+            engine.catch_up(directory)
+        self.assertAlmostEqual(engine.daily_report(day_of(NINE))[0]["WORKING"], 3600.0)
+
+if __name__ == "__main__":
+    unittest.main()
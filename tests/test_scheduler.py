@@ -0,0 +1,42 @@
+import unittest
+from collections import namedtuple
+import numpy as np
+from detection.scheduler import BatchScheduler
+
+Frame = namedtuple("Frame", ["frame_id", "timestamp", "image"])
+
+class Camera:
+    def __init__(self):
+        self.frame = None
+
+class Subscription:
+    # One owner's handle on a shared camera, like camera.registry.Subscription
+    def __init__(self, camera):
+        self.camera = camera
+
+    def latest(self, after_id=-1):
+        frame = self.camera.frame
+        return frame if frame is not None and frame.frame_id > after_id else None
+
+class Detector:
+    def detect_batch(self, frames, bgr=False):
+        return [(False, np.zeros((0, 4), dtype=np.int32)) for _ in frames]
+
+class SharedCameraTest(unittest.TestCase):
+    def test_camera_stays_until_last_owner_removes_it(self):
+        scheduler = BatchScheduler(Detector())
+        camera = Camera()
+        first, second = Subscription(camera), Subscription(camera)
+        scheduler.add_source(0, first)
+        scheduler.add_source(0, second)
+        scheduler.remove_camera(0, first)
+        camera.frame = Frame(1, 0.0, np.zeros((4, 4, 3), dtype=np.uint8))
+        batch = scheduler.tick()
+        self.assertEqual(list(batch.results), [0])
+        scheduler.remove_camera(0, second)
+        camera.frame = Frame(2, 0.0, camera.frame.image)
+        self.assertIsNone(scheduler.tick())
+        self.assertIsNone(scheduler.result(0))
+
+if __name__ == "__main__":
+    unittest.main()
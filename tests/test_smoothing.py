@@ -0,0 +1,41 @@
+import unittest
+from detection.smoothing import HysteresisSmoother, StatusSmoother
+
+# A recording timestamped long before the run (2001-09-09), one observation per second
+PAST = 1_000_000_000.0
+
+class StatusSmootherTest(unittest.TestCase):
+    def test_switches_on_past_timestamps(self):
+        smoother = StatusSmoother(initial="IDLE")
+        statuses = [smoother.update("WORKING", PAST + i) for i in range(10)]
+        self.assertEqual(statuses[5], "IDLE")
+        self.assertEqual(statuses[6], "WORKING")
+
+    def test_dwell_counts_from_first_update(self):
+        smoother = StatusSmoother(initial="IDLE", min_dwell=8.0)
+        statuses = [smoother.update("WORKING", PAST + i) for i in range(10)]
+        self.assertEqual(statuses[7], "IDLE")
+        self.assertEqual(statuses[8], "WORKING")
+
+    def test_reset_forgets_dwell_start(self):
+        smoother = StatusSmoother(initial="IDLE", min_dwell=1.0)
+        smoother.update("IDLE", PAST)
+        smoother.reset("IDLE")
+        statuses = [smoother.update("WORKING", PAST - 3600 + i) for i in range(7)]
+        self.assertEqual(statuses[-1], "WORKING")
+
+class HysteresisSmootherTest(unittest.TestCase):
+    def test_switches_on_past_timestamps(self):
+        smoother = HysteresisSmoother(("WORKING", "IDLE"), initial="IDLE")
+        results = [smoother.update({"a": "WORKING", "b": "IDLE"}, PAST + i) for i in range(10)]
+        self.assertEqual(results[5]["a"], "IDLE")
+        self.assertEqual(results[6], {"a": "WORKING", "b": "IDLE"})
+
+    def test_dwell_counts_from_first_update(self):
+        smoother = HysteresisSmoother(("WORKING", "IDLE"), initial="IDLE", min_dwell={"IDLE": 8.0})
+        results = [smoother.update({"a": "WORKING"}, PAST + i)["a"] for i in range(10)]
+        self.assertEqual(results[7], "IDLE")
+        self.assertEqual(results[8], "WORKING")
+
+if __name__ == "__main__":
+    unittest.main()
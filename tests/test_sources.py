@@ -0,0 +1,136 @@
+import os
+import tempfile
+import time
+import unittest
+import cv2
+import numpy as np
+from camera.capture import SyncCapture
+from camera.sources import DeviceSource, ImageDirSource, VideoFileSource, open_source
+
+START = 1_000_000_000.0
+
+def gray(level):
+    return np.full((24, 32, 3), level, dtype=np.uint8)
+
+def read_all(source):
+    frames = []
+    while True:
+        result = source.read()
+        if result is None:
+            return frames
+        frames.append(result)
+
+class VideoFileSourceTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "clip.avi")
+        writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*"MJPG"), 10.0, (32, 24))
+        for i in range(5):
+            writer.write(gray(i * 40))
+        writer.release()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_timestamps_follow_the_recording(self):
+        source = VideoFileSource(self.path, realtime=False, start_time=START)
+        self.assertTrue(source.open())
+        self.assertEqual(source.frame_count, 5)
+        frames = read_all(source)
+        source.close()
+        self.assertEqual([round(ts - START, 3) for _, ts in frames], [0.0, 0.1, 0.2, 0.3, 0.4])
+        self.assertAlmostEqual(frames[2][0].mean(), 80, delta=3)
+
+    def test_start_time_defaults_to_modification_time_minus_duration(self):
+        os.utime(self.path, (START, START))
+        source = VideoFileSource(self.path, realtime=False)
+        source.open()
+        self.assertAlmostEqual(source.read()[1], START - 0.5)
+        source.close()
+
+    def test_seek(self):
+        source = VideoFileSource(self.path, realtime=False, start_time=START)
+        source.open()
+        source.seek(3)
+        image, ts = source.read()
+        source.close()
+        self.assertAlmostEqual(ts, START + 0.3)
+        self.assertAlmostEqual(image.mean(), 120, delta=3)
+
+    def test_realtime_keeps_the_recorded_pace(self):
+        source = VideoFileSource(self.path, realtime=True, start_time=START)
+        source.open()
+        started = time.perf_counter()
+        self.assertEqual(len(read_all(source)), 5)
+        source.close()
+        self.assertGreaterEqual(time.perf_counter() - started, 0.35)
+
+    def test_missing_file_does_not_open(self):
+        self.assertFalse(VideoFileSource(os.path.join(self._tmp.name, "missing.avi")).open())
+
+class ImageDirSourceTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+        for name, level in (("b.png", 100), ("a.png", 50), ("c.jpg", 150)):
+            cv2.imwrite(os.path.join(self.directory, name), gray(level))
+        with open(os.path.join(self.directory, "broken.png"), "wb") as f:
+            f.write(b"not an image")
+        with open(os.path.join(self.directory, "notes.txt"), "w") as f:
+            f.write("ignored")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_name_order_skipping_unreadable_files(self):
+        source = ImageDirSource(self.directory, fps=4.0, realtime=False, start_time=START)
+        self.assertTrue(source.open())
+        self.assertEqual(source.frame_count, 4)
+        frames = read_all(source)
+        self.assertEqual([round(image.mean()) for image, _ in frames], [50, 100, 150])
+        # broken.png keeps its slot in the timeline
+        self.assertEqual([ts - START for _, ts in frames], [0.0, 0.25, 0.75])
+
+    def test_seek(self):
+        source = ImageDirSource(self.directory, realtime=False, start_time=START)
+        source.open()
+        source.seek(1)
+        self.assertEqual(round(source.read()[0].mean()), 100)
+
+    def test_empty_directory_does_not_open(self):
+        with tempfile.TemporaryDirectory() as empty:
+            self.assertFalse(ImageDirSource(empty).open())
+
+class OpenSourceTest(unittest.TestCase):
+    def test_picks_the_source_type(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertIsInstance(open_source(directory), ImageDirSource)
+            self.assertIsInstance(open_source(os.path.join(directory, "clip.avi")), VideoFileSource)
+        self.assertIsInstance(open_source(0), DeviceSource)
+        self.assertIsInstance(open_source("1"), DeviceSource)
+        source = ImageDirSource("frames")
+        self.assertIs(open_source(source), source)
+
+    def test_file_options_are_passed_on(self):
+        source = open_source("clip.avi", realtime=False, start_time=START)
+        self.assertEqual((source.realtime, source.start_time), (False, START))
+
+class SyncCaptureTest(unittest.TestCase):
+    def test_delivers_every_frame_then_fails(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for i in range(3):
+                cv2.imwrite(os.path.join(directory, f"{i}.png"), gray(i))
+            capture = SyncCapture(directory)
+            frames = [capture.latest() for _ in range(4)]
+            capture.close()
+        self.assertEqual([f.frame_id for f in frames[:3]], [0, 1, 2])
+        self.assertIsNone(frames[3])
+        self.assertEqual((capture.failed, capture.error), (True, "End of stream"))
+
+    def test_missing_source(self):
+        capture = SyncCapture("missing.avi")
+        self.assertEqual((capture.failed, capture.error), (True, "Could not open source"))
+        self.assertIsNone(capture.latest())
+
+if __name__ == "__main__":
+    unittest.main()
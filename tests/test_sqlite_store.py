@@ -0,0 +1,92 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from storage import sqlite_store
+from storage.sqlite_store import SQLiteStore
+
+class BulkImportTest(unittest.TestCase):
+    def test_bulk_rows_go_through_the_writer_thread(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = SQLiteStore(os.path.join(directory, "worktime.db"))
+            # Connections opened after the store's own: only readers are expected
+            opened = []
+            connect = sqlite_store.connect
+            def record(path, readonly=False):
+                opened.append(readonly)
+                return connect(path, readonly)
+            sqlite_store.connect = record
+            try:
+                store.append(100.0, 0, 1, "WORKING")
+                store.add_intervals([(2, 0, "IDLE", 0.0, 50.0), (2, 0, "WORKING", 50.0, 80.0)])
+                store.append(200.0, 0, 1, "IDLE")
+                store.flush()
+                self.assertEqual(store.status_times(2, 0.0, 100.0), {"IDLE": 50.0, "WORKING": 30.0})
+                self.assertEqual([row[2:] for row in store.intervals(1, 0.0, 300.0)],
+                                 [("WORKING", 100.0, 200.0), ("IDLE", 200.0, None)])
+            finally:
+                sqlite_store.connect = connect
+                store.close()
+            self.assertNotIn(False, opened)
+
+class IntervalTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "worktime.db")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_close_ends_open_intervals(self):
+        store = SQLiteStore(self.path)
+        store.append(0.0, 0, 1, "WORKING")
+        store.close(now=100.0)
+        # Restarted a day later: the downtime is not credited to WORKING
+        store = SQLiteStore(self.path)
+        self.assertEqual(store.status_times(1, 0.0, 86400.0, now=86400.0), {"WORKING": 100.0})
+        store.close()
+
+    def test_crashed_run_ends_at_last_written_ts(self):
+        # A writer process that dies without close()
+        script = ("import os, sys; from storage.sqlite_store import SQLiteStore; store = SQLiteStore(sys.argv[1]); "
+                  "store.append(0.0, 0, 1, 'WORKING'); store.append(40.0, 0, 2, 'IDLE'); store.flush(); os._exit(0)")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run([sys.executable, "-c", script, self.path], cwd=root, check=True)
+        store = SQLiteStore(self.path)
+        self.assertEqual(store.intervals(1, 0.0, 100.0, now=86400.0), [("1", 0, "WORKING", 0.0, 40.0)])
+        self.assertEqual(store.intervals(2, 0.0, 100.0, now=86400.0), [("2", 0, "IDLE", 40.0, 40.0)])
+        store.close()
+
+    def test_range_skips_intervals_ending_before_the_window(self):
+        store = SQLiteStore(self.path)
+        store.add_intervals([(1, 0, "WORKING", 0.0, 10.0), (1, 0, "IDLE", 120.0, 130.0)])
+        self.assertEqual(store.intervals(1, 50.0, 100.0), [])
+        self.assertEqual(store.status_times(1, 50.0, 100.0), {})
+        store.close()
+
+    def test_overlapping_bulk_rows(self):
+        store = SQLiteStore(self.path)
+        store.add_intervals([(1, 0, "WORKING", 0.0, 100.0), (1, 0, "EATING", 20.0, 25.0)])
+        self.assertEqual(store.status_times(1, 50.0, 60.0), {"WORKING": 10.0})
+        self.assertEqual([row[2] for row in store.intervals(1, 10.0, 80.0)], ["WORKING", "EATING"])
+        store.close()
+
+    def test_open_interval_older_than_any_closed_one(self):
+        store = SQLiteStore(self.path)
+        store.append(0.0, 0, 1, "WORKING")
+        store.add_intervals([(2, 0, "IDLE", 0.0, 5.0)])
+        self.assertEqual(store.status_times(1, 1000.0, 1010.0, now=2000.0), {"WORKING": 10.0})
+        store.close(now=2000.0)
+
+    def test_none_status_only_ends_the_interval(self):
+        store = SQLiteStore(self.path)
+        store.append(0.0, 0, 1, "WORKING")
+        store.append(30.0, 0, 1, None, reason="End of stream")
+        store.flush(timeout=2.0)
+        self.assertEqual(store.written, 2)
+        self.assertEqual(store.intervals(1, 0.0, 100.0, now=100.0), [("1", 0, "WORKING", 0.0, 30.0)])
+        store.close(now=100.0)
+
+if __name__ == "__main__":
+    unittest.main()
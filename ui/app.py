@@ -1,10 +1,35 @@
+import argparse
 import sys
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QFont
 from ui.main_window import MainWindow
+from metrics.startup import startup
+
+def parse_args(argv):
+    # Our own options; anything else is left for Qt
+    parser = argparse.ArgumentParser(prog="main.py", add_help=False)
+    parser.add_argument("--metrics-overlay", action="store_true", help="show fps and stage latency on the video")
+    parser.add_argument("--metrics-port", type=int, default=None, help="serve Prometheus metrics on 127.0.0.1")
+    parser.add_argument("--metrics-file", default=None, help="write Prometheus metrics to this file")
+    parser.add_argument("--detector", default=None, help="face detector backend (haar or dnn)")
+    parser.add_argument("--model", default=None, help="model file for the detector backend")
+    return parser.parse_known_args(argv)
 
 def run_app():
-    app = QApplication(sys.argv)
+    startup.mark("imports")
+    args, qt_args = parse_args(sys.argv[1:])
+    # cv2 and http.server are only imported here when their options are used
+    if args.metrics_overlay:
+        from ui.components.camera_feeds import CameraFeeds
+        CameraFeeds.metrics_overlay = True
+    if args.detector or args.model:
+        from detection.models import registry
+        registry.configure(backend=args.detector or registry.config["backend"], path=args.model)
+    exporters = []
+    if args.metrics_port is not None or args.metrics_file:
+        from metrics.export import start_exporters
+        exporters = start_exporters(args.metrics_port, args.metrics_file)
+    app = QApplication(sys.argv[:1] + qt_args)
     # Set application style
     app.setStyle('Fusion')
     # Enhanced font
@@ -12,8 +37,12 @@ def run_app():
     font.setHintingPreference(QFont.PreferFullHinting)
     app.setFont(font)
     window = MainWindow()
+    startup.mark("window")
     window.show()
-    sys.exit(app.exec_())
+    code = app.exec_()
+    for exporter in exporters:
+        exporter.close()
+    sys.exit(code)
 
 if __name__ == "__main__":
     run_app()
\ No newline at end of file
@@ -1,30 +1,53 @@
-from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout, QGridLayout, QFrame, QLabel
+from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout, QGridLayout, QFrame, QLabel, QShortcut
 from PyQt5.QtCore import Qt, QTimer, QTime
-from PyQt5.QtGui import QImage, QPixmap, QPainter, QPainterPath, QColor
+from PyQt5.QtGui import QKeySequence
+import threading
 import qtawesome as qta
-import cv2
-import numpy as np
-from collections import deque
-from ui.style import PADDING, GAP, ACCENT, TEXT_MAIN, TEXT_SUB, STATUS_SUCCESS, STATUS_INFO, STATUS_ERROR, STATUS_WARNING
+from ui.style import PADDING, GAP, ACCENT, TEXT_MAIN, TEXT_SUB, STATUS_SUCCESS, STATUS_INFO, STATUS_ERROR, STATUS_WARNING, STATUS_BREAK
 from ui.components.card import CardFrame
+from ui.components.video_view import VideoLabel, hex_to_rgb
 from detection.face_detector import FaceDetector
+from detection.tracker import TrackingDetector
+from detection.motion import GatedDetector
+from detection.activity import ActivityClassifier
+from detection.drowsiness import EyeStateChecker
+from camera.registry import acquire
+from metrics.timers import metrics
+from metrics.startup import startup
 
 STATUS_COLORS = {
     "WORKING": STATUS_SUCCESS,
     "IDLE": STATUS_INFO,
     "SLEEPING": STATUS_ERROR,
+    "EATING": STATUS_BREAK,
     "WALKING": STATUS_WARNING,
 }
+STATUS_RGB = {status: hex_to_rgb(color) for status, color in STATUS_COLORS.items()}
+
+# Stages shown in the fps/latency overlay, in pipeline order
+OVERLAY_STAGES = ("read", "motion", "convert", "detect", "track", "identify", "eyes", "activity", "scale", "overlay", "paint")
 
 class CameraFeeds(CardFrame):
-    def __init__(self):
+    # Start with the fps/latency overlay on (F3 toggles it at runtime)
+    metrics_overlay = False
+
+    def __init__(self, camera=0, recognizer=None):
         super().__init__()
-        self.cap = None
+        self.camera = camera
+        # Names each new track once (see detection.identity); None without enrolled employees
+        self.recognizer = recognizer
+        self.capture = None
+        self.last_frame_id = -1
         self.timer = None
-        self.detector = FaceDetector()
-        self.last_faces = []
-        self.face_buffer = deque(maxlen=5)  # Smoothing buffer for faces
-        self.employee_statuses = None  # To be set externally
+        # The cascade loads on a background thread; frames are shown without faces until it is ready
+        self.detector = None
+        self.tracking = None
+        self.eyes = None
+        threading.Thread(target=self._load_detector, name=f"detector-{camera}", daemon=True).start()
+        self.last_tracks = []
+        # Sets track.activity on every tracked face, all tracks in one call per frame
+        self.activity = ActivityClassifier(camera=camera)
+        self.employee_statuses = None  # {track_id: status}, set externally
         layout = QVBoxLayout()
         layout.setContentsMargins(PADDING, PADDING, PADDING, PADDING)
         layout.setSpacing(GAP)
@@ -55,13 +78,16 @@ class CameraFeeds(CardFrame):
         video_grid.setContentsMargins(0, 0, 0, 0)
         video_grid.setSpacing(0)
         # Video label
-        self.video_label = QLabel()
+        self.video_label = VideoLabel(radius=14, camera=camera)
         self.video_label.setAlignment(Qt.AlignCenter)
         self.video_label.setStyleSheet(f"background: #000; border-radius: 14px; color: {TEXT_SUB}; font-size: 14px;")
         self.video_label.setMinimumSize(460, 300)
         video_grid.addWidget(self.video_label, 0, 0, alignment=Qt.AlignCenter)
         layout.addWidget(self.video_container, stretch=1, alignment=Qt.AlignCenter)
         self.setLayout(layout)
+        self.show_metrics = self.metrics_overlay
+        self._stats_refreshed = 0
+        QShortcut(QKeySequence("F3"), self, self.toggle_metrics)
         self.start_camera()
         # Start clock timer
         self.clock_timer = QTimer(self)
@@ -69,84 +95,104 @@ class CameraFeeds(CardFrame):
         self.clock_timer.start(1000)
         self.update_clock()
 
+    def _load_detector(self):
+        # Skips detection while nothing in view moves (see detection.motion)
+        detector = GatedDetector(FaceDetector(detect_width=640, roi=True, camera=self.camera))
+        self.detector = detector
+        # Full detection every few frames, Kalman prediction in between
+        self.tracking = TrackingDetector(detector, detect_every=3)
+        # Eyes-closed time per track for the SLEEPING rule, looked for inside the face boxes only
+        self.eyes = EyeStateChecker(camera=self.camera)
+
     def update_clock(self):
         self.clock_label.setText(QTime.currentTime().toString('hh:mm:ss'))
 
     def set_employee_statuses(self, statuses):
         self.employee_statuses = statuses
 
+    def toggle_metrics(self):
+        self.show_metrics = not self.show_metrics
+        if not self.show_metrics:
+            self.video_label.stats_text = None
+
+    def _refresh_stats_text(self):
+        # Percentiles are recomputed every 15 frames, not per frame
+        self._stats_refreshed = self.last_frame_id
+        summary = metrics.summary(self.camera)
+        frame = summary.get("frame", {})
+        lines = [f"{frame.get('rate') or 0:.1f} fps  frame p95 {frame.get('p95_ms', 0):.1f} ms"]
+        lines += [f"{stage:<8} p50 {summary[stage]['p50_ms']:6.2f}  p95 {summary[stage]['p95_ms']:6.2f} ms"
+                  for stage in OVERLAY_STAGES if summary.get(stage, {}).get("count")]
+        self.video_label.stats_text = "\n".join(lines)
+
     def start_camera(self):
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
-            self.video_label.setText("Camera not available")
-            return
+        # Frames are read on a shared background capture; the timer only picks up the newest one
+        self.capture = acquire(self.camera)
+        self.last_frame_id = -1
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_frame)
         self.timer.start(30)
 
     def update_frame(self):
-        if self.cap:
-            ret, frame = self.cap.read()
-            if ret:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                # Detect all faces
-                _, faces = self.detector.detect(frame_rgb)
-                self.face_buffer.append(faces)
-                # Smoothing: use the most common set of faces in the buffer
-                faces_smoothed = self._smooth_faces()
-                self.last_faces = faces_smoothed
-                # Draw rectangles for each face, colored by status if available
-                draw_frame = frame_rgb.copy()
-                for i, (x, y, w, h) in enumerate(faces_smoothed):
-                    status = None
-                    color = (0, 212, 170)
-                    if self.employee_statuses and i < len(self.employee_statuses):
-                        status = self.employee_statuses[i]
-                        color_hex = STATUS_COLORS.get(status, STATUS_INFO)
-                        color = QColor(color_hex)
-                        color = (color.red(), color.green(), color.blue())
-                    cv2.rectangle(draw_frame, (x, y), (x + w, y + h), color, 2)
-                    label = status if status else f"Person {i+1}"
-                    cv2.putText(draw_frame, label, (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-                h, w, ch = draw_frame.shape
-                bytes_per_line = ch * w
-                qt_image = QImage(draw_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-                pixmap = QPixmap.fromImage(qt_image)
-                # Enhanced rounded corners
-                radius = 14
-                rounded = QPixmap(pixmap.size())
-                rounded.fill(Qt.transparent)
-                painter = QPainter(rounded)
-                painter.setRenderHint(QPainter.Antialiasing, True)
-                painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
-                path = QPainterPath()
-                path.addRoundedRect(0, 0, pixmap.width(), pixmap.height(), radius, radius)
-                painter.setClipPath(path)
-                painter.drawPixmap(0, 0, pixmap)
-                painter.end()
-                self.video_label.setPixmap(rounded.scaled(
-                    self.video_label.width(), self.video_label.height(), 
-                    Qt.KeepAspectRatio, Qt.SmoothTransformation))
-            else:
-                self.video_label.setText("Stream error")
+        if self.capture:
+            if self.capture.failed:
+                self.video_label.setText("Camera not available" if self.last_frame_id < 0 else "Stream error")
+                self.stop_camera()
+                # No first frame is coming; report what startup got to
+                startup.report()
+                return
+            latest = self.capture.latest(self.last_frame_id)
+            if latest is None:
+                # No new frame since the last tick
+                return
+            with metrics.timer("frame", self.camera):
+                self._process(latest)
 
-    def _smooth_faces(self):
-        # Use the most common face set in the buffer, or the last one
-        if not self.face_buffer:
-            return []
-        # For simplicity, use the last faces (could be improved with tracking)
-        return self.face_buffer[-1]
+    def _process(self, latest):
+        self.last_frame_id = latest.frame_id
+        # Detect and track all faces straight from the BGR frame
+        if self.tracking is not None:
+            with metrics.timer("track", self.camera):
+                self.last_tracks = self.tracking.process(latest.image, bgr=True)
+            if self.recognizer is not None:
+                self.recognizer.identify(latest.image, self.last_tracks, bgr=True)
+            if self.eyes is not None:
+                self.eyes.check(latest.image, self.last_tracks, latest.timestamp, bgr=True,
+                                gray=self.detector.gray_for(latest.image))
+            self.activity.classify(latest.image, self.last_tracks, bgr=True)
+        # Overlay each tracked face, colored by status if available
+        overlays = []
+        for track in self.last_tracks:
+            status = None
+            color = (0, 212, 170)
+            if self.employee_statuses and track.id in self.employee_statuses:
+                status = self.employee_statuses[track.id]
+                color = STATUS_RGB.get(status, STATUS_RGB["IDLE"])
+            identity = track.identity
+            if identity is not None and identity.employee is not None:
+                label = f"{identity.name}: {status}" if status else identity.name
+            else:
+                label = status if status else f"Person {track.id}"
+            overlays.append((track.box, color, label))
+        if self.show_metrics and self.last_frame_id - self._stats_refreshed >= 15:
+            self._refresh_stats_text()
+        # Scaled, overlaid and rounded in place; skipped while the screen is not shown
+        if self.video_label.show_frame(latest.image, overlays):
+            startup.mark("first_frame")
 
     def get_latest_faces(self):
-        return self.last_faces
+        return [track.box for track in self.last_tracks]
+
+    def get_latest_tracks(self):
+        return self.last_tracks
 
     def stop_camera(self):
         if self.timer:
             self.timer.stop()
             self.timer = None
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        if self.capture:
+            self.capture.close()
+            self.capture = None
     def closeEvent(self, event):
         self.stop_camera()
         event.accept() 
\ No newline at end of file
@@ -1,26 +1,30 @@
 from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout, QLabel, QFrame, QPushButton, QSizePolicy, QSpacerItem, QGridLayout
-from PyQt5.QtCore import Qt, QTimer, QTime
-from PyQt5.QtGui import QPixmap, QImage
+from PyQt5.QtCore import Qt, QTimer
 from ui.components.card import CardFrame
-from ui.style import ACCENT, STATUS_SUCCESS, STATUS_ERROR, STATUS_INFO, STATUS_WARNING, TEXT_MAIN, TEXT_SUB, PADDING, GAP
+from ui.components.video_view import VideoLabel
+from ui.style import ACCENT, STATUS_SUCCESS, STATUS_ERROR, STATUS_INFO, STATUS_WARNING, STATUS_BREAK, TEXT_MAIN, TEXT_SUB, PADDING, GAP
 from detection.face_detector import FaceDetector
-import cv2
+from detection.smoothing import StatusSmoother
+from detection.motion import GatedDetector
+from detection.activity import ActivityClassifier
+from camera.registry import acquire
+from storage.ledger import ledger as shared_ledger
 import numpy as np
-from collections import deque
 
 class EmployeeCard(CardFrame):
-    def __init__(self, employee, camera_index=0):
+    def __init__(self, employee, camera_index=0, ledger=shared_ledger):
         super().__init__()
         self.employee = employee
+        # Status times are kept in the ledger, keyed by employee id
+        self.ledger = ledger
         self.camera_index = camera_index
-        self.detector = FaceDetector()
-        self.status_buffer = deque(maxlen=10)
+        self.detector = GatedDetector(FaceDetector(detect_width=640, roi=True))
+        self.activity = ActivityClassifier()
+        self.smoother = StatusSmoother(window=10, threshold=7, initial="WORKING")
         self.current_status = None
-        self.status_changed_time = None
-        self.status_times = {s: 0 for s in ["WORKING", "IDLE", "SLEEPING", "WALKING"]}
-        self.last_update_time = None
         self.expanded = False
-        self.cap = None
+        self.capture = None
+        self.last_frame_id = -1
         self.timer = None
         self._build_ui()
         self.start_camera()
@@ -45,7 +49,7 @@ class EmployeeCard(CardFrame):
         header.addWidget(self.expand_btn)
         layout.addLayout(header)
         # Camera feed
-        self.video_label = QLabel()
+        self.video_label = VideoLabel()
         self.video_label.setAlignment(Qt.AlignCenter)
         self.video_label.setMinimumSize(200, 120)
         self.video_label.setStyleSheet(f"background: #000; border-radius: 12px; color: {TEXT_SUB}; font-size: 14px;")
@@ -70,6 +74,8 @@ class EmployeeCard(CardFrame):
             return f"background: {STATUS_INFO}; color: white; font-weight: 600; padding: 4px 16px; border-radius: 12px;"
         elif status == "SLEEPING":
             return f"background: {STATUS_ERROR}; color: white; font-weight: 600; padding: 4px 16px; border-radius: 12px;"
+        elif status == "EATING":
+            return f"background: {STATUS_BREAK}; color: white; font-weight: 600; padding: 4px 16px; border-radius: 12px;"
         elif status == "WALKING":
             return f"background: {STATUS_WARNING}; color: white; font-weight: 600; padding: 4px 16px; border-radius: 12px;"
         return f"background: #444; color: white; font-weight: 600; padding: 4px 16px; border-radius: 12px;"
@@ -80,71 +86,57 @@ class EmployeeCard(CardFrame):
         self.expand_btn.setText("Details ▲" if self.expanded else "Details ▼")
 
     def start_camera(self):
-        self.cap = cv2.VideoCapture(self.camera_index)
-        if not self.cap.isOpened():
-            self.video_label.setText("Camera not available")
-            return
-        self.last_update_time = QTime.currentTime()
-        self.status_buffer.clear()
+        # Cards on the same camera index share one device and one decode
+        self.capture = acquire(self.camera_index)
+        self.last_frame_id = -1
+        self.smoother.reset("WORKING")
+        self.activity.reset()
         self.current_status = 'WORKING'
-        self.status_changed_time = QTime.currentTime()
-        self.status_times = {s: 0 for s in ["WORKING", "IDLE", "SLEEPING", "WALKING"]}
+        self.ledger.set_status(self.employee["id"], self.current_status)
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_frame)
         self.timer.start(30)
 
     def update_frame(self):
-        if self.cap:
-            ret, frame = self.cap.read()
-            if ret:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                # Detection logic: face = WORKING, no face = IDLE, stub SLEEPING/WALKING
-                face_present, faces = self.detector.detect(frame_rgb)
-                # Simulate SLEEPING if no face for >10s, WALKING if face moves a lot (stub)
-                status = "WORKING" if face_present else "IDLE"
-                # Smoothing
-                self.status_buffer.append(status)
-                if self.status_buffer.count("WORKING") >= 7:
-                    smoothed_status = "WORKING"
-                elif self.status_buffer.count("IDLE") >= 7:
-                    smoothed_status = "IDLE"
-                else:
-                    smoothed_status = self.current_status or "IDLE"
-                # Time tracking
-                now = QTime.currentTime()
-                if self.last_update_time:
-                    elapsed = self.last_update_time.msecsTo(now) / 1000.0
-                    self.status_times[self.current_status] += elapsed
-                self.last_update_time = now
-                # Only update status if changed
+        if self.capture:
+            if self.capture.failed:
+                self.video_label.setText("Camera not available" if self.last_frame_id < 0 else "Stream error")
+                self.stop_camera()
+                return
+            latest = self.capture.latest(self.last_frame_id)
+            if latest is not None:
+                self.last_frame_id = latest.frame_id
+                frame = latest.image
+                # Detection logic: no face = IDLE, otherwise the activity of the largest face
+                face_present, faces = self.detector.detect(frame, bgr=True)
+                faces = list(faces) if face_present else []
+                largest = [max(faces, key=lambda box: box[2] * box[3])] if faces else []
+                activities = self.activity.update(frame, ["face"] * len(largest), largest, bgr=True)
+                status = activities[0] if activities else "IDLE"
+                # Smoothing: 7 of the last 10 frames to switch
+                smoothed_status = self.smoother.update(status, latest.timestamp)
+                # Only update status if changed; the ledger banks the time
                 if smoothed_status != self.current_status:
                     self.current_status = smoothed_status
-                    self.status_changed_time = now
+                    self.ledger.set_status(self.employee["id"], smoothed_status)
                 # Update badge
                 self.status_badge.setText(self.current_status)
                 self.status_badge.setStyleSheet(self._status_style(self.current_status))
-                # Draw face rectangles
-                draw_frame = frame_rgb.copy()
-                for (x, y, w, h) in faces:
-                    cv2.rectangle(draw_frame, (x, y), (x + w, y + h), (0, 212, 170), 2)
-                h, w, ch = draw_frame.shape
-                bytes_per_line = ch * w
-                qt_image = QImage(draw_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-                pixmap = QPixmap.fromImage(qt_image)
-                self.video_label.setPixmap(pixmap.scaled(self.video_label.width(), self.video_label.height(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+                # Draw face rectangles on the label-sized frame (skipped while hidden)
+                self.video_label.show_frame(frame, [(box, (0, 212, 170), None) for box in faces])
                 # Update stats
-                self.stats_label.setText(
-                    f"Work: {int(self.status_times['WORKING'])}s | Idle: {int(self.status_times['IDLE'])}s | Sleep: {int(self.status_times['SLEEPING'])}s | Walk: {int(self.status_times['WALKING'])}s"
-                )
-            else:
-                self.video_label.setText("Stream error")
+                if self.expanded:
+                    times = self.ledger.totals(self.employee["id"])
+                    self.stats_label.setText(
+                        f"Work: {int(times['WORKING'])}s | Idle: {int(times['IDLE'])}s | Sleep: {int(times['SLEEPING'])}s | Eat: {int(times['EATING'])}s | Walk: {int(times['WALKING'])}s"
+                    )
     def stop_camera(self):
         if self.timer:
             self.timer.stop()
             self.timer = None
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        if self.capture:
+            self.capture.close()
+            self.capture = None
     def closeEvent(self, event):
         self.stop_camera()
         event.accept() 
\ No newline at end of file
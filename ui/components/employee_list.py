@@ -1,7 +1,8 @@
 from PyQt5.QtWidgets import QVBoxLayout, QWidget, QLabel, QPushButton, QFrame, QHBoxLayout, QSizePolicy, QScrollArea
-from PyQt5.QtCore import Qt, QTime
-from ui.style import STATUS_SUCCESS, STATUS_INFO, STATUS_ERROR, STATUS_WARNING, TEXT_MAIN, TEXT_SUB
-import time
+from PyQt5.QtCore import Qt
+from ui.style import STATUS_SUCCESS, STATUS_INFO, STATUS_ERROR, STATUS_WARNING, STATUS_BREAK, TEXT_MAIN, TEXT_SUB
+from storage.ledger import ledger as shared_ledger, STATUSES
+from detection.smoothing import HysteresisSmoother
 
 # Demo employee data
 EMPLOYEES = [
@@ -14,20 +15,22 @@ STATUS_COLORS = {
     "WORKING": STATUS_SUCCESS,
     "IDLE": STATUS_INFO,
     "SLEEPING": STATUS_ERROR,
+    "EATING": STATUS_BREAK,
     "WALKING": STATUS_WARNING,
 }
 
-ALL_STATUSES = ["WORKING", "IDLE", "SLEEPING", "WALKING"]
+ALL_STATUSES = list(STATUSES)
 
 class EmployeeStatusItem(QFrame):
-    def __init__(self, employee):
+    def __init__(self, employee, ledger=shared_ledger):
         super().__init__()
         self.employee = employee
-        self.status = "IDLE"
+        # Time accounting lives in the ledger; this widget only displays it
+        self.ledger = ledger
+        if ledger.status(employee["id"]) is None:
+            ledger.set_status(employee["id"], "IDLE")
+        self.status = ledger.status(employee["id"])
         self.expanded = False
-        self.status_times = {s: 0.0 for s in ALL_STATUSES}
-        self.last_status = self.status
-        self.last_update = time.time()
         self._build_ui()
 
     def _build_ui(self):
@@ -68,27 +71,22 @@ class EmployeeStatusItem(QFrame):
         color = STATUS_COLORS.get(status, STATUS_INFO)
         return f"background: {color}; color: white; font-weight: 600; padding: 2px 12px; border-radius: 10px;"
 
+    @property
+    def last_update(self):
+        return self.ledger.changed_at(self.employee["id"])
+
     def set_status(self, status):
-        now = time.time()
-        # Increment time for previous status
-        if self.last_status in self.status_times:
-            self.status_times[self.last_status] += now - self.last_update
-        self.last_update = now
-        self.last_status = status
+        self.ledger.set_status(self.employee["id"], status)
         self.status = status
         self.status_badge.setText(status)
         self.status_badge.setStyleSheet(self._status_style(status))
         self.update_stats_label()
 
-    def update_stats_label(self):
-        # Show time spent in each status
-        lines = []
-        for s in ALL_STATUSES:
-            t = self.status_times[s]
-            if s == self.status:
-                # Add current ongoing time
-                t += time.time() - self.last_update
-            lines.append(f"{s.title()}: {int(t)}s")
+    def update_stats_label(self, times=None):
+        # Show time spent in each status, including the ongoing one
+        if times is None:
+            times = self.ledger.totals(self.employee["id"])
+        lines = [f"{s.title()}: {int(times.get(s, 0.0))}s" for s in ALL_STATUSES]
         self.stats_label.setText("  |  ".join(lines))
 
     def toggle_expand(self):
@@ -98,10 +96,21 @@ class EmployeeStatusItem(QFrame):
         self.update_stats_label()
 
 class EmployeeList(QWidget):
-    def __init__(self, employees=EMPLOYEES):
+    def __init__(self, employees=EMPLOYEES, event_log=None, camera=0, ledger=shared_ledger, by_identity=False):
         super().__init__()
         self.employees = employees
+        # by_identity: bind tracks by track.identity (detection.identity) instead of in order
+        self.by_identity = by_identity
+        self.ledger = ledger
+        # Status transitions are appended here when set (see storage.event_log)
+        self.event_log = event_log
+        self.camera = camera
         self.items = []
+        self.track_items = {}  # track_id -> EmployeeStatusItem
+        # One smoother for every employee, updated in a single call per tick; 2 of the
+        # last 3 ticks (1-1.5s) so a track dropping for one tick does not flip the status
+        self.smoother = HysteresisSmoother(ALL_STATUSES, window=3, enter=2, initial="IDLE",
+                                           capacity=max(len(employees), 1))
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(12)
@@ -112,7 +121,7 @@ class EmployeeList(QWidget):
         vbox.setContentsMargins(0, 0, 0, 0)
         vbox.setSpacing(12)
         for emp in employees:
-            item = EmployeeStatusItem(emp)
+            item = EmployeeStatusItem(emp, ledger)
             vbox.addWidget(item)
             self.items.append(item)
         vbox.addStretch()
@@ -121,13 +130,55 @@ class EmployeeList(QWidget):
         layout.addWidget(scroll)
         self.setLayout(layout)
 
-    def update_statuses(self, detected_faces):
-        # Map detected faces to employees by order (left-to-right)
-        for i, item in enumerate(self.items):
-            if i < len(detected_faces):
-                item.set_status("WORKING")
-            else:
-                item.set_status("IDLE")
+    def update_statuses(self, tracks):
+        if self.by_identity:
+            self._bind_by_identity(tracks)
+        else:
+            self._bind_in_order(tracks)
+        item_tracks = {item: track_id for track_id, item in self.track_items.items()}
+        # A bound employee takes their track's activity (detection.activity), IDLE otherwise
+        activities = {track.id: track.activity or "WORKING" for track in tracks}
+        smoothed = self.smoother.update({item.employee["id"]: activities.get(item_tracks[item], "WORKING")
+                                         if item in item_tracks else "IDLE" for item in self.items})
+        for item in self.items:
+            status = smoothed[item.employee["id"]]
+            if status != item.status:
+                item.set_status(status)
+                if self.event_log:
+                    self.event_log.append(item.last_update, self.camera, item.employee["id"], status,
+                                          track=item_tracks.get(item))
+        # One ledger read for everyone; only expanded items show their times
+        expanded = [item for item in self.items if item.expanded]
+        if expanded:
+            totals = self.ledger.all_totals()
+            for item in expanded:
+                item.update_stats_label(totals.get(item.employee["id"], {}))
+
+    def _bind_in_order(self, tracks):
+        # Keep each track bound to the same employee for as long as it lives
+        live_ids = {track.id for track in tracks}
+        for track_id in list(self.track_items):
+            if track_id not in live_ids:
+                del self.track_items[track_id]
+        free_items = [item for item in self.items if item not in self.track_items.values()]
+        for track in sorted(tracks, key=lambda t: t.id):
+            if track.id not in self.track_items and free_items:
+                self.track_items[track.id] = free_items.pop(0)
+
+    def _bind_by_identity(self, tracks):
+        # Recognized tracks go to their employee (the best-scoring track if two claim one);
+        # unrecognized tracks are not bound to anyone
+        by_employee = {item.employee["id"]: item for item in self.items}
+        claims = {}
+        for track in tracks:
+            identity = track.identity
+            item = by_employee.get(identity.employee) if identity is not None else None
+            if item is not None and (item not in claims or identity.score > claims[item].identity.score):
+                claims[item] = track
+        self.track_items = {track.id: item for item, track in claims.items()}
 
     def get_status_list(self):
-        return [item.status for item in self.items] 
\ No newline at end of file
+        return [item.status for item in self.items]
+
+    def get_track_statuses(self):
+        return {track_id: item.status for track_id, item in self.track_items.items()} 
\ No newline at end of file
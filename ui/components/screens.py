@@ -5,7 +5,9 @@ from ui.components.camera_feeds import CameraFeeds
 from ui.components.activity import ActivityDetection
 from ui.components.analytics import AnalyticsCard
 from ui.components.timeline import TimelineCard
-from ui.components.employee_list import EmployeeList
+from ui.components.employee_list import EmployeeList, EMPLOYEES
+from storage.event_log import EventLog
+from detection.identity import Recognizer
 
 class DashboardScreen(QWidget):
     def __init__(self):
@@ -13,13 +15,19 @@ class DashboardScreen(QWidget):
         main_layout = QHBoxLayout(self)
         main_layout.setContentsMargins(GAP, GAP, GAP, GAP)
         main_layout.setSpacing(GAP)
+        # Employees enrolled with `python main.py enroll` replace the demo list and are
+        # recognized by face; without an index tracks are handed out in order
+        self.recognizer = Recognizer.load()
+        employees = self.recognizer.index.employee_list() if self.recognizer else EMPLOYEES
         # Left: Camera feed
-        self.camera_feeds = CameraFeeds()
+        self.camera_feeds = CameraFeeds(recognizer=self.recognizer)
         main_layout.addWidget(self.camera_feeds, stretch=2)
         # Right: Employee status panel
         right_panel = QVBoxLayout()
         right_panel.setSpacing(GAP)
-        self.employee_list = EmployeeList()
+        self.event_log = EventLog()
+        self.employee_list = EmployeeList(employees, event_log=self.event_log,
+                                          by_identity=self.recognizer is not None)
         right_panel.addWidget(self.employee_list)
         right_panel.addStretch()
         main_layout.addLayout(right_panel, stretch=1)
@@ -29,10 +37,10 @@ class DashboardScreen(QWidget):
         self.status_timer.start(500)
 
     def update_employee_statuses(self):
-        faces = self.camera_feeds.get_latest_faces()
-        self.employee_list.update_statuses(faces)
-        # Pass current statuses to camera feed for coloring
-        self.camera_feeds.set_employee_statuses(self.employee_list.get_status_list())
+        tracks = self.camera_feeds.get_latest_tracks()
+        self.employee_list.update_statuses(tracks)
+        # Pass current statuses, keyed by track id, to camera feed for coloring
+        self.camera_feeds.set_employee_statuses(self.employee_list.get_track_statuses())
 
 class UsersScreen(QWidget):
     def __init__(self):
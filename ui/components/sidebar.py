@@ -1,9 +1,16 @@
 from PyQt5.QtWidgets import QFrame, QVBoxLayout, QPushButton, QGraphicsDropShadowEffect
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QColor
-import qtawesome as qta
+from PyQt5.QtGui import QColor, QIcon
 from ui.style import PADDING, CARD_RADIUS, SIDEBAR_BTN_BG_ACTIVE, SIDEBAR_BTN_BG_HOVER, ACCENT, TEXT_MAIN
 
+# (qtawesome icon, tooltip) per screen, in stacked-widget order
+NAV_ITEMS = [
+    ('fa5s.tachometer-alt', 'Dashboard'),
+    ('fa5s.users', 'Users'),
+    ('fa5s.chart-line', 'Analytics'),
+    ('fa5s.cog', 'Settings'),
+]
+
 class SidebarButton(QPushButton):
     def __init__(self, icon, tooltip, index, parent=None):
         super().__init__(parent)
@@ -77,15 +84,9 @@ class Sidebar(QFrame):
         layout.addWidget(brand_label)
         
         self.buttons = []
-        icons = [
-            (qta.icon('fa5s.tachometer-alt', color=TEXT_MAIN), 'Dashboard'),
-            (qta.icon('fa5s.users', color=TEXT_MAIN), 'Users'),
-            (qta.icon('fa5s.chart-line', color=TEXT_MAIN), 'Analytics'),
-            (qta.icon('fa5s.cog', color=TEXT_MAIN), 'Settings')
-        ]
-        
-        for i, (icon, tooltip) in enumerate(icons):
-            btn = SidebarButton(icon, tooltip, i)
+        # Icons are filled in by load_icons() once the window is on screen
+        for i, (_, tooltip) in enumerate(NAV_ITEMS):
+            btn = SidebarButton(QIcon(), tooltip, i)
             btn.clicked.connect(lambda checked, idx=i: on_nav(idx))
             layout.addWidget(btn, alignment=Qt.AlignHCenter)
             self.buttons.append(btn)
@@ -98,4 +99,10 @@ class Sidebar(QFrame):
         for i, btn in enumerate(self.buttons):
             btn.setChecked(i == idx)
 
+    def load_icons(self):
+        # Importing qtawesome and loading its font takes ~0.1 s, so it is kept off the first paint
+        import qtawesome as qta
+        for btn, (icon, _) in zip(self.buttons, NAV_ITEMS):
+            btn.setIcon(qta.icon(icon, color=TEXT_MAIN))
+
 from PyQt5.QtWidgets import QLabel  # Needed for brand_label 
\ No newline at end of file
@@ -1,9 +1,8 @@
 from PyQt5.QtWidgets import QFrame, QHBoxLayout, QLabel, QGraphicsDropShadowEffect
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QColor
+from PyQt5.QtGui import QColor, QIcon
 from ui.style import PADDING, TOPBAR_HEIGHT, ACCENT, TEXT_MAIN, TEXT_SUB, STATUS_ERROR
 from ui.components.modern_button import ModernButton
-import qtawesome as qta
 
 class CustomTopBar(QFrame):
     def __init__(self, parent=None):
@@ -53,9 +52,10 @@ class CustomTopBar(QFrame):
         layout.addWidget(self.company)
         
         # Enhanced window controls
-        self.min_btn = ModernButton(qta.icon('fa5s.window-minimize', color=TEXT_SUB), 'Minimize')
-        self.max_btn = ModernButton(qta.icon('fa5s.square', color=TEXT_SUB), 'Maximize/Restore')
-        self.close_btn = ModernButton(qta.icon('fa5s.times', color=STATUS_ERROR), 'Close', accent_color=STATUS_ERROR)
+        # Icons are set in load_icons(), after the first paint
+        self.min_btn = ModernButton(QIcon(), 'Minimize')
+        self.max_btn = ModernButton(QIcon(), 'Maximize/Restore')
+        self.close_btn = ModernButton(QIcon(), 'Close', accent_color=STATUS_ERROR)
         
         layout.addWidget(self.min_btn)
         layout.addWidget(self.max_btn)
@@ -71,6 +71,12 @@ class CustomTopBar(QFrame):
         self._parent = parent
         self._drag_pos = None
     
+    def load_icons(self):
+        import qtawesome as qta
+        self.min_btn.setIcon(qta.icon('fa5s.window-minimize', color=TEXT_SUB))
+        self.max_btn.setIcon(qta.icon('fa5s.square', color=TEXT_SUB))
+        self.close_btn.setIcon(qta.icon('fa5s.times', color=STATUS_ERROR))
+
     def _minimize(self):
         if self._parent:
             self._parent.showMinimized()
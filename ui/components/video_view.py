@@ -0,0 +1,100 @@
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPainter, QPainterPath, QColor
+import cv2
+import numpy as np
+from metrics.timers import metrics
+
+def hex_to_rgb(color_hex):
+    color = QColor(color_hex)
+    return (color.red(), color.green(), color.blue())
+
+class VideoLabel(QLabel):
+    # QLabel that paints camera frames itself. Frames are scaled to the label size
+    # before any per-pixel work, overlays are drawn on the scaled image, and the
+    # image buffers and rounded-corner clip are reused until the size changes.
+    # Text (e.g. "Camera not available") still works through setText().
+    def __init__(self, radius=0, parent=None, camera=None):
+        super().__init__(parent)
+        self.radius = radius
+        # Label for the stage timers; stats_text, when set, is drawn in the top-left corner
+        self.camera = camera
+        self.stats_text = None
+        self._scaled = None
+        self._rgb = None
+        self._image = None
+        self._clip = None
+        self._showing_frame = False
+        self.rendered = 0
+        self.skipped = 0
+
+    def is_showing(self):
+        # False when hidden, on a non-current stacked screen, or fully covered
+        return self.isVisible() and not self.visibleRegion().isEmpty()
+
+    def show_frame(self, frame, overlays=()):
+        # frame: BGR numpy array; overlays: ((x, y, w, h), rgb_color, text) in frame coordinates
+        if not self.is_showing():
+            self.skipped += 1
+            return False
+        fh, fw = frame.shape[:2]
+        scale = min(self.width() / fw, self.height() / fh)
+        tw, th = max(int(fw * scale), 1), max(int(fh * scale), 1)
+        if self._rgb is None or self._rgb.shape[:2] != (th, tw):
+            self._allocate(tw, th)
+        with metrics.timer("scale", self.camera):
+            cv2.resize(frame, (tw, th), dst=self._scaled,
+                       interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+            cv2.cvtColor(self._scaled, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        with metrics.timer("overlay", self.camera):
+            for (x, y, w, h), color, text in overlays:
+                x0, y0 = int(x * scale), int(y * scale)
+                x1, y1 = int((x + w) * scale), int((y + h) * scale)
+                cv2.rectangle(self._rgb, (x0, y0), (x1, y1), color, 2)
+                if text:
+                    cv2.putText(self._rgb, text, (x0, max(y0 - 8, 12)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1,
+                                cv2.LINE_AA)
+            if self.stats_text:
+                self._draw_stats(self.stats_text)
+        if not self._showing_frame:
+            self.clear()
+            self._showing_frame = True
+        self.rendered += 1
+        self.update()
+        return True
+
+    def _draw_stats(self, text):
+        # Dark band behind the text so it stays readable on any frame
+        for i, line in enumerate(text.split("\n")):
+            y = 8 + 16 * i
+            (w, _), _ = cv2.getTextSize(line, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)
+            band = self._rgb[y:y + 16, 6:min(14 + w, self._rgb.shape[1])]
+            band //= 3
+            cv2.putText(self._rgb, line, (10, y + 12), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (230, 230, 230), 1, cv2.LINE_AA)
+
+    def _allocate(self, width, height):
+        self._scaled = np.empty((height, width, 3), dtype=np.uint8)
+        self._rgb = np.empty((height, width, 3), dtype=np.uint8)
+        # Wraps self._rgb without copying; the array outlives the image
+        self._image = QImage(self._rgb.data, width, height, 3 * width, QImage.Format_RGB888)
+        self._clip = None
+        if self.radius:
+            self._clip = QPainterPath()
+            self._clip.addRoundedRect(0, 0, width, height, self.radius, self.radius)
+
+    def setText(self, text):
+        self._showing_frame = False
+        super().setText(text)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._showing_frame or self._image is None:
+            return
+        with metrics.timer("paint", self.camera):
+            painter = QPainter(self)
+            painter.setRenderHint(QPainter.Antialiasing, True)
+            painter.translate((self.width() - self._image.width()) // 2, (self.height() - self._image.height()) // 2)
+            if self._clip is not None:
+                painter.setClipPath(self._clip)
+            painter.drawImage(0, 0, self._image)
+            painter.end()
@@ -1,7 +1,12 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QStackedWidget
 from ui.style import BG_MAIN, GAP
 from ui.components.sidebar import Sidebar
-from ui.components.screens import DashboardScreen, UsersScreen, AnalyticsScreen, SettingsScreen
+
+def _screen_class(idx):
+    # ui.components.screens pulls in cv2, numpy and the detectors, so it is imported
+    # the first time a screen is built rather than at startup
+    from ui.components import screens
+    return (screens.DashboardScreen, screens.UsersScreen, screens.AnalyticsScreen, screens.SettingsScreen)[idx]
 
 class Dashboard(QWidget):
     def __init__(self):
@@ -25,19 +30,24 @@ class Dashboard(QWidget):
         self.stacked = QStackedWidget()
         self.sidebar = Sidebar(self.on_nav)
         main_layout.addWidget(self.sidebar)
-        # Add screens to stacked widget
-        self.screens = [
-            DashboardScreen(),
-            UsersScreen(),
-            AnalyticsScreen(),
-            SettingsScreen()
-        ]
-        for screen in self.screens:
-            self.stacked.addWidget(screen)
+        # Screens are built on first navigation; until then their page is an empty placeholder
+        self.screens = [None] * len(self.sidebar.buttons)
+        for _ in self.screens:
+            self.stacked.addWidget(QWidget())
         main_layout.addWidget(self.stacked)
         # Add layouts to outer layout
         outer_layout.addSpacing(0)
         outer_layout.addLayout(main_layout)
+    def screen(self, idx):
+        # The screen at idx, built (and swapped in for its placeholder) on first use
+        if self.screens[idx] is None:
+            screen = self.screens[idx] = _screen_class(idx)()
+            placeholder = self.stacked.widget(idx)
+            self.stacked.insertWidget(idx, screen)
+            self.stacked.removeWidget(placeholder)
+            placeholder.deleteLater()
+        return self.screens[idx]
+
     def on_nav(self, idx):
         self.sidebar.set_active(idx)
-        self.stacked.setCurrentIndex(idx) 
\ No newline at end of file
+        self.stacked.setCurrentWidget(self.screen(idx)) 
\ No newline at end of file
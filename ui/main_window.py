@@ -1,8 +1,9 @@
 from PyQt5.QtWidgets import QMainWindow
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from ui.style import BG_MAIN
 from ui.dashboard import Dashboard
 from ui.components.topbar import CustomTopBar
+from metrics.startup import startup
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -23,4 +24,20 @@ class MainWindow(QMainWindow):
         self.topbar = CustomTopBar(self)
         self.central.topbar = self.topbar
         layout = self.central.layout() or self.central.children()[0]
-        layout.insertWidget(0, self.topbar) 
\ No newline at end of file
+        layout.insertWidget(0, self.topbar)
+        self._painted = False
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            startup.mark("first_paint")
+            # Icons and the dashboard screen are loaded once the window is up
+            QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self):
+        self.central.sidebar.load_icons()
+        self.topbar.load_icons()
+        startup.mark("icons")
+        self.central.on_nav(0)
+        startup.mark("dashboard")
@@ -18,6 +18,7 @@ STATUS_SUCCESS = "#10B981"  # Green
 STATUS_WARNING = "#F59E0B"  # Amber
 STATUS_ERROR = "#EF4444"    # Red
 STATUS_INFO = "#3B82F6"     # Blue
+STATUS_BREAK = "#A855F7"    # Purple
 
 # --- Enhanced Spacing & Sizing ---
 PADDING = 28